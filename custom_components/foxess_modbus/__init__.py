@@ -17,6 +17,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.typing import UNDEFINED
 from slugify import slugify
 
+from .bus_scheduler import BusScheduler
 from .client.modbus_client import ModbusClient
 from .common.types import HassData
 from .common.types import HassDataEntry
@@ -32,8 +33,11 @@ from .const import INVERTERS
 from .const import MAX_READ
 from .const import MODBUS_SLAVE
 from .const import MODBUS_TYPE
+from .const import PIPELINE_WINDOW
 from .const import PLATFORMS
 from .const import POLL_RATE
+from .const import READ_REGISTER_COST
+from .const import READ_ROUND_TRIP_COST
 from .const import RTU_OVER_TCP
 from .const import SERIAL
 from .const import STARTUP_MESSAGE
@@ -43,6 +47,8 @@ from .const import UNIQUE_ID_PREFIX
 from .inverter_adapters import ADAPTERS
 from .inverter_profiles import inverter_connection_type_profile_from_config
 from .modbus_controller import ModbusController
+from .read_planner import ReadCost
+from .services import poll_metrics_service
 from .services import read_registers_service
 from .services import update_charge_period_service
 from .services import websocket_api
@@ -65,10 +71,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Create this before throwing ConfigEntryAuthFailed, so the sensors, etc, platforms don't fail
     hass.data.setdefault(DOMAIN, HassData()).setdefault(
-        entry.entry_id, HassDataEntry(controllers=[], modbus_clients=[])
+        entry.entry_id, HassDataEntry(controllers=[], modbus_clients=[], bus_schedulers=[])
     )
 
-    def create_controller(client: ModbusClient, inverter: dict[str, Any]) -> None:
+    def create_controller(client: ModbusClient, bus_scheduler: BusScheduler, inverter: dict[str, Any]) -> None:
         controller = ModbusController(
             hass,
             client,
@@ -77,13 +83,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             inverter[MODBUS_SLAVE],
             inverter[POLL_RATE],
             inverter[MAX_READ],
+            ReadCost(round_trip=inverter[READ_ROUND_TRIP_COST], per_register=inverter[READ_REGISTER_COST]),
+            entry.entry_id,
         )
         controllers.append(controller)
+        bus_scheduler.add_controller(controller)
 
     controllers: list[ModbusController] = []
 
     # {(modbus_type, host): client}
     clients: dict[tuple[str, str], ModbusClient] = {}
+    # {(modbus_type, host): scheduler for the client}
+    bus_schedulers: dict[tuple[str, str], BusScheduler] = {}
     for inverter_id, inverter in entry_data[INVERTERS].items():
         # Remember that there might not be any options
         options = entry_options.get(INVERTERS, {}).get(inverter_id, {})
@@ -111,18 +122,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 params = {"port": inverter[HOST], "baudrate": 9600}
             else:
                 raise AssertionError()
-            client = ModbusClient(hass, inverter[MODBUS_TYPE], adapter, params)
+            # If several inverters share a connection, the first one's options decide whether it's pipelined
+            client = ModbusClient(hass, inverter[MODBUS_TYPE], adapter, params, inverter[PIPELINE_WINDOW])
             clients[client_key] = client
-        create_controller(client, inverter)
+            bus_schedulers[client_key] = BusScheduler(hass, client)
+        create_controller(client, bus_schedulers[client_key], inverter)
+
+    for bus_scheduler in bus_schedulers.values():
+        bus_scheduler.start()
 
     read_registers_service.register(hass, controllers)
     write_registers_service.register(hass, controllers)
     update_charge_period_service.register(hass, controllers)
+    poll_metrics_service.register(hass, controllers)
     websocket_api.register(hass)
 
     hass_data: HassData = hass.data[DOMAIN]
     hass_data[entry.entry_id]["controllers"] = controllers
     hass_data[entry.entry_id]["modbus_clients"] = list(clients.values())
+    hass_data[entry.entry_id]["bus_schedulers"] = list(bus_schedulers.values())
     hass_data[entry.entry_id]["unload"] = entry.add_update_listener(async_reload_entry)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -254,6 +272,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         controllers = hass_data[entry.entry_id]["controllers"]
         for controller in controllers:
             controller.unload()
+        for bus_scheduler in hass_data[entry.entry_id]["bus_schedulers"]:
+            bus_scheduler.unload()
 
         clients = hass_data[entry.entry_id]["modbus_clients"]
         await asyncio.gather(*[client.close() for client in clients])
@@ -0,0 +1,140 @@
+"""Schedules the polls of all of the inverters which share a ModbusClient"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_track_time_interval
+
+from .client.modbus_client import ModbusClient
+from .common.unload_controller import UnloadController
+from .const import DOMAIN
+from .modbus_controller import ModbusController
+
+_LOGGER = logging.getLogger(__name__)
+
+# How often we work out how much of the bus's time each inverter is using
+_USAGE_INTERVAL = timedelta(minutes=5)
+# If the inverters between them are using more than this fraction of the bus's time, polls are going to start running
+# into each other
+_USAGE_WARNING_THRESHOLD = 0.9
+
+# The poll loops' clock, which tests replace with a fake one
+_monotonic = time.monotonic
+_sleep = asyncio.sleep
+
+
+class BusScheduler(UnloadController):
+    """
+    Owns the poll timers of every ModbusController which shares a ModbusClient (e.g. several inverters on one RS485
+    bridge).
+
+    Each controller still polls at its own poll rate, but their polls are staggered so that they're spread evenly
+    across the poll interval, rather than all starting at once and queueing for the bus. Where polls do overlap, the
+    ModbusClient interleaves their requests. Each controller's polls are paced by a loop rather than a timer, so a slow
+    poll delays the next one rather than overlapping it.
+
+    We also keep track of how much of the bus's time each inverter is using. This is reported in each controller's poll
+    metrics (if they're turned on), and we warn if the bus is close to saturated.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: ModbusClient) -> None:
+        UnloadController.__init__(self)
+        self._hass = hass
+        self._client = client
+        self._controllers: list[ModbusController] = []
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def add_controller(self, controller: ModbusController) -> None:
+        self._controllers.append(controller)
+
+    def start(self) -> None:
+        """Starts polling. Call once all controllers on this bus have been added"""
+        num_controllers = len(self._controllers)
+        for i, controller in enumerate(self._controllers):
+            phase_secs = controller.poll_rate * i / num_controllers
+            _LOGGER.debug(
+                "%s %s: polling every %ss, offset by %.1fs",
+                self._client,
+                controller.slave,
+                controller.poll_rate,
+                phase_secs,
+            )
+            task = self._hass.async_create_background_task(
+                self._poll_loop(controller, phase_secs), f"{DOMAIN} poll {self._client} {controller.slave}"
+            )
+            self._tasks.append(task)
+
+        self._client.take_bus_time()
+        self._unload_listeners.append(async_track_time_interval(self._hass, self._check_usage, _USAGE_INTERVAL))
+
+    def unload(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        super().unload()
+
+    async def _poll_loop(self, controller: ModbusController, phase_secs: float) -> None:
+        """
+        Polls the controller every poll_rate seconds, offset by phase_secs.
+
+        A poll is never started while the last one is still running. If a poll takes longer than the poll interval, the
+        polls which were due while it was running are skipped, and the next one starts straight away. We then carry on
+        from there at the original cadence, so that the controllers stay staggered.
+        """
+        interval_secs = controller.poll_rate
+        due_at = _monotonic() + phase_secs + interval_secs
+        warned_about_overrun = False
+        while True:
+            await _sleep(max(due_at - _monotonic(), 0))
+
+            started_at = _monotonic()
+            if controller.poll_metrics is not None:
+                controller.poll_metrics.record_lateness(started_at - due_at)
+            try:
+                await controller.refresh()
+            except Exception:
+                _LOGGER.exception("%s %s: poll failed", self._client, controller.slave)
+
+            due_at += interval_secs
+            overrun_secs = _monotonic() - due_at
+            if overrun_secs > 0:
+                skipped = int(overrun_secs // interval_secs)
+                due_at += skipped * interval_secs
+                if skipped > 0:
+                    if controller.poll_metrics is not None:
+                        controller.poll_metrics.record_skipped_poll(skipped)
+                    # Only warn once: the poll metrics keep count after that
+                    _LOGGER.log(
+                        logging.DEBUG if warned_about_overrun else logging.WARNING,
+                        "%s %s: poll took %.1fs, skipping %s poll(s). Is your poll rate '%s' too high?",
+                        self._client,
+                        controller.slave,
+                        _monotonic() - started_at,
+                        skipped,
+                        controller.poll_rate,
+                    )
+                    warned_about_overrun = True
+
+    async def _check_usage(self, _now: datetime) -> None:
+        interval_secs = _USAGE_INTERVAL.total_seconds()
+        bus_time = self._client.take_bus_time()
+        bus_usage = sum(bus_time.values()) / interval_secs
+
+        for controller in self._controllers:
+            usage = bus_time.get(controller.slave, 0.0) / interval_secs
+            _LOGGER.debug("%s %s: using %.0f%% of the bus", self._client, controller.slave, usage * 100)
+            if controller.poll_metrics is not None:
+                controller.poll_metrics.record_bus_usage(usage, bus_usage)
+
+        if bus_usage > _USAGE_WARNING_THRESHOLD:
+            _LOGGER.warning(
+                "%s is busy %.0f%% of the time (%s). Polls are likely to be delayed or skipped. Consider increasing "
+                "the poll interval of the inverters on it",
+                self._client,
+                bus_usage * 100,
+                ", ".join(f"slave {slave}: {secs / interval_secs:.0%}" for slave, secs in sorted(bus_time.items())),
+            )
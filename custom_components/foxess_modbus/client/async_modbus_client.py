@@ -0,0 +1,227 @@
+"""Modbus client for network connections which runs entirely on the event loop"""
+
+import asyncio
+import logging
+from typing import Any
+from typing import Callable
+
+from pymodbus.exceptions import ConnectionException
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ModbusRequest
+from pymodbus.pdu import ModbusResponse
+
+from .modbus_framing import ModbusFramer
+from .modbus_framing import decode_response_pdu
+from .modbus_framing import response_matches_request
+
+_LOGGER = logging.getLogger(__name__)
+
+# This mirrors pymodbus's default, which is what we used before
+_DEFAULT_TIMEOUT = 3
+
+
+class ResponseMismatchError(ModbusIOException):
+    """Raised when the remote device sends a response which we can't match up to a request"""
+
+
+class AsyncModbusClient:
+    """
+    Modbus client for TCP, UDP and RTU over TCP, using asyncio transports rather than pymodbus's sync clients.
+
+    This means that we don't need to go through the executor for each request. Requests and responses are still
+    pymodbus types: we just do the framing and the matching of responses to requests.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        framer: type[ModbusFramer],
+        delay_on_connect: int | None = None,
+        datagram: bool = False,
+        timeout: float = _DEFAULT_TIMEOUT,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._framer = framer()
+        self._delay_on_connect = delay_on_connect
+        self._datagram = datagram
+        self._timeout = timeout
+
+        self._transport: asyncio.BaseTransport | None = None
+        self._protocol: _ModbusProtocol | None = None
+        self._buffer = bytearray()
+        self._transaction_id = 0
+        # Transaction ID -> (request, future for its response)
+        self._pending: dict[int, tuple[ModbusRequest, asyncio.Future[ModbusResponse]]] = {}
+
+    @property
+    def connected(self) -> bool:
+        return self._transport is not None
+
+    async def connect(self) -> None:
+        """Opens the connection, if it isn't already open"""
+        if self._transport is not None:
+            return
+
+        _LOGGER.debug("Connecting to %s", self)
+        loop = asyncio.get_running_loop()
+        protocol = _ModbusProtocol(
+            self._datagram_received if self._datagram else self._data_received, self._connection_lost
+        )
+        try:
+            # asyncio disables Nagle's algorithm on TCP connections for us
+            transport: asyncio.BaseTransport
+            if self._datagram:
+                transport, _protocol = await asyncio.wait_for(
+                    loop.create_datagram_endpoint(lambda: protocol, remote_addr=(self._host, self._port)),
+                    self._timeout,
+                )
+            else:
+                transport, _protocol = await asyncio.wait_for(
+                    loop.create_connection(lambda: protocol, self._host, self._port), self._timeout
+                )
+        except (OSError, asyncio.TimeoutError) as ex:
+            raise ConnectionException(f"Failed to connect to {self}: {ex!r}") from ex
+
+        self._transport = transport
+        self._protocol = protocol
+        self._buffer.clear()
+
+        # Delaying after establishing a connection seems to help inverter stability. Other requests will queue up
+        # behind this in ModbusClient
+        if self._delay_on_connect is not None:
+            await asyncio.sleep(self._delay_on_connect)
+
+    def close(self) -> None:
+        """Closes the connection, failing any requests which are still waiting for a response"""
+        if self._transport is not None:
+            assert self._protocol is not None
+            # The transport will tell the protocol that it's closed at some point in the future, by which time we might
+            # have opened a new connection. Make sure it doesn't affect us.
+            self._protocol.detach()
+            self._transport.close()
+            self._transport = None
+            self._protocol = None
+        self._fail_pending(ConnectionException(f"Connection to {self} closed"))
+
+    async def execute(self, requests: list[ModbusRequest]) -> list[ModbusResponse]:
+        """
+        Sends the given requests and waits for their responses, which are returned in the same order as the requests.
+
+        If the framing allows responses to be matched up with requests, all requests are sent before waiting for any
+        responses. Otherwise they're sent one at a time.
+
+        If anything goes wrong, the connection is closed, as we can't tell what else might still be in flight.
+        """
+        if self._framer.supports_pipelining:
+            return await self._send_and_wait(requests)
+
+        responses = []
+        for request in requests:
+            responses.extend(await self._send_and_wait([request]))
+        return responses
+
+    async def _send_and_wait(self, requests: list[ModbusRequest]) -> list[ModbusResponse]:
+        if self._transport is None:
+            raise ConnectionException(f"Not connected to {self}")
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for request in requests:
+            self._transaction_id = (self._transaction_id + 1) & 0xFFFF
+            future: asyncio.Future[ModbusResponse] = loop.create_future()
+            self._pending[self._transaction_id] = (request, future)
+            futures.append(future)
+            frame = self._framer.build_frame(self._transaction_id, request)
+            if self._datagram:
+                self._transport.sendto(frame)  # type: ignore[attr-defined]
+            else:
+                self._transport.write(frame)  # type: ignore[attr-defined]
+
+        try:
+            return list(await asyncio.wait_for(asyncio.gather(*futures), self._timeout))
+        except asyncio.TimeoutError as ex:
+            self.close()
+            raise ModbusIOException(f"No response received from {self} after {self._timeout}s") from ex
+        except Exception:
+            self.close()
+            raise
+
+    def _data_received(self, data: bytes) -> None:
+        self._buffer.extend(data)
+        try:
+            while (frame := self._framer.next_frame(self._buffer)) is not None:
+                self._frame_received(frame.transaction_id, frame.slave, frame.pdu)
+        except ModbusIOException as ex:
+            self._fail_pending(ex)
+            self.close()
+
+    def _datagram_received(self, data: bytes) -> None:
+        # Each datagram is a single frame. Don't let a bad one affect the next
+        self._buffer.clear()
+        self._data_received(data)
+
+    def _frame_received(self, transaction_id: int, slave: int, pdu: bytes) -> None:
+        # RTU frames don't have a transaction ID, but we only have one request in flight at a time
+        if not self._framer.supports_pipelining and len(self._pending) == 1:
+            transaction_id = next(iter(self._pending))
+
+        pending = self._pending.get(transaction_id)
+        if pending is None:
+            raise ResponseMismatchError(f"Received response with unknown transaction ID {transaction_id}")
+        request, future = pending
+
+        # If this fails, the request is left in _pending so it gets failed along with everything else
+        response = decode_response_pdu(pdu)
+        if response is None or slave != request.slave_id or not response_matches_request(response, request):
+            raise ResponseMismatchError(f"Received response {response} (slave {slave}) for {request}")
+
+        del self._pending[transaction_id]
+        if not future.done():
+            future.set_result(response)
+
+    def _connection_lost(self, ex: Exception | None) -> None:
+        self._fail_pending(ConnectionException(f"Connection to {self} lost: {ex!r}"))
+        self.close()
+
+    def _fail_pending(self, ex: Exception) -> None:
+        pending = self._pending
+        self._pending = {}
+        for _request, future in pending.values():
+            if not future.done():
+                future.set_exception(ex)
+
+    def __str__(self) -> str:
+        return f"{self._host}:{self._port}"
+
+
+class _ModbusProtocol(asyncio.Protocol, asyncio.DatagramProtocol):
+    """Passes events from a single asyncio connection back to AsyncModbusClient, until detached"""
+
+    def __init__(
+        self, data_received: Callable[[bytes], None], connection_lost: Callable[[Exception | None], None]
+    ) -> None:
+        self._data_received: Callable[[bytes], None] | None = data_received
+        self._connection_lost: Callable[[Exception | None], None] | None = connection_lost
+
+    def detach(self) -> None:
+        self._data_received = None
+        self._connection_lost = None
+
+    def data_received(self, data: bytes) -> None:
+        if self._data_received is not None:
+            self._data_received(data)
+
+    def datagram_received(self, data: bytes, addr: tuple[str | Any, int]) -> None:  # noqa: ARG002
+        if self._data_received is not None:
+            self._data_received(data)
+
+    def error_received(self, exc: Exception) -> None:
+        # For UDP, e.g. ICMP port unreachable
+        if self._connection_lost is not None:
+            self._connection_lost(exc)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if self._connection_lost is not None:
+            self._connection_lost(exc)
@@ -3,55 +3,67 @@
 import asyncio
 import logging
 import os
+import time
+from functools import partial
 from typing import Any
-from typing import Callable
+from typing import Sequence
 from typing import Type
-from typing import TypeVar
 from typing import cast
 
 import serial
 from homeassistant.core import HomeAssistant
 from pymodbus.client import ModbusSerialClient
-from pymodbus.client import ModbusUdpClient
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse
+from pymodbus.pdu import ModbusRequest
 from pymodbus.pdu import ModbusResponse
+from pymodbus.register_read_message import ReadHoldingRegistersRequest
 from pymodbus.register_read_message import ReadHoldingRegistersResponse
+from pymodbus.register_read_message import ReadInputRegistersRequest
 from pymodbus.register_read_message import ReadInputRegistersResponse
+from pymodbus.register_write_message import WriteMultipleRegistersRequest
 from pymodbus.register_write_message import WriteMultipleRegistersResponse
+from pymodbus.register_write_message import WriteSingleRegisterRequest
 from pymodbus.register_write_message import WriteSingleRegisterResponse
 from pymodbus.transaction import ModbusRtuFramer
-from pymodbus.transaction import ModbusSocketFramer
 
 from .. import client
 from ..common.types import ConnectionType
 from ..common.types import RegisterType
+from ..common.types import RequestPriority
 from ..const import RTU_OVER_TCP
 from ..const import SERIAL
 from ..const import TCP
 from ..const import UDP
 from ..inverter_adapters import InverterAdapter
-from .custom_modbus_tcp_client import CustomModbusTcpClient
+from ..poll_metrics import PollMetrics
+from .async_modbus_client import AsyncModbusClient
+from .async_modbus_client import ResponseMismatchError
+from .modbus_framing import MbapFramer
+from .modbus_framing import RtuFramer
+from .priority_lock import PriorityLock
 
 _LOGGER = logging.getLogger(__name__)
 
-T = TypeVar("T")
-
 
+# Network connections use our own asyncio client. Serial connections still go through pymodbus's sync client, in the
+# executor.
 _CLIENTS: dict[str, dict[str, Any]] = {
     SERIAL: {
         "client": ModbusSerialClient,
         "framer": ModbusRtuFramer,
     },
     TCP: {
-        "client": CustomModbusTcpClient,
-        "framer": ModbusSocketFramer,
+        "client": AsyncModbusClient,
+        "framer": MbapFramer,
     },
     UDP: {
-        "client": ModbusUdpClient,
-        "framer": ModbusSocketFramer,
+        "client": partial(AsyncModbusClient, datagram=True),
+        "framer": MbapFramer,
     },
     RTU_OVER_TCP: {
-        "client": CustomModbusTcpClient,
-        "framer": ModbusRtuFramer,
+        "client": AsyncModbusClient,
+        "framer": RtuFramer,
     },
 }
 
@@ -61,13 +73,32 @@ serial.protocol_handler_packages.append(client.__name__)
 class ModbusClient:
     """Modbus"""
 
-    def __init__(self, hass: HomeAssistant, protocol: str, adapter: InverterAdapter, config: dict[str, Any]) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        protocol: str,
+        adapter: InverterAdapter,
+        config: dict[str, Any],
+        pipeline_window: int = 1,
+    ) -> None:
         """Init"""
         self._hass = hass
         self._config = config
-        self._lock = asyncio.Lock()
+        # Requests take this one at a time, so that more urgent requests (e.g. writes) can go before the next request
+        # of a long poll
+        self._lock = PriorityLock()
+        # slave -> seconds the bus has spent on that slave's requests (which didn't raise), since take_bus_time was last
+        # called
+        self._bus_time_by_slave: dict[int, float] = {}
         self._protocol = protocol
 
+        # How many read requests we'll send before waiting for responses. Only TCP has transaction IDs, which we need
+        # to match responses to requests.
+        if pipeline_window > 1 and protocol != TCP:
+            _LOGGER.warning("Pipelined reads are only supported over TCP, not %s. Disabling", protocol)
+            pipeline_window = 1
+        self._pipeline_window = pipeline_window
+
         client = _CLIENTS[protocol]
 
         # Delaying for a second after establishing a connection seems to help the inverter stability,
@@ -95,7 +126,11 @@ class ModbusClient:
     async def close(self) -> None:
         """Close connection"""
         _LOGGER.debug("Closing connection to modbus on %s", self)
-        await self._async_pymodbus_call(self._client.close, auto_connect=False)
+        async with self._lock.hold(RequestPriority.WRITE):
+            if isinstance(self._client, AsyncModbusClient):
+                self._client.close()
+            else:
+                await self._hass.async_add_executor_job(self._client.close)
 
     async def read_registers(
         self,
@@ -103,28 +138,98 @@ class ModbusClient:
         num_registers: int,
         register_type: RegisterType,
         slave: int,
-    ) -> list[int]:
+        metrics: PollMetrics | None = None,
+        priority: RequestPriority = RequestPriority.POLL,
+    ) -> Sequence[int]:
         """Read registers"""
-        expected_response_type: Type[Any]
-        if register_type == RegisterType.HOLDING:
-            response = await self._async_pymodbus_call(
-                self._client.read_holding_registers,
-                start_address,
-                num_registers,
-                slave,
-            )
-            expected_response_type = ReadHoldingRegistersResponse
-        elif register_type == RegisterType.INPUT:
-            response = await self._async_pymodbus_call(
-                self._client.read_input_registers,
-                start_address,
-                num_registers,
-                slave,
-            )
-            expected_response_type = ReadInputRegistersResponse
-        else:
-            raise AssertionError()
+        request, expected_response_type = _read_request(start_address, num_registers, register_type, slave)
+        (response,) = await self._execute([request], metrics, priority)
+        return self._check_read_response(
+            response, expected_response_type, start_address, num_registers, register_type, slave
+        )
 
+    async def read_register_ranges(
+        self,
+        read_ranges: list[tuple[int, int]],
+        register_type: RegisterType,
+        slave: int,
+        metrics: PollMetrics | None = None,
+        priority: RequestPriority = RequestPriority.POLL,
+    ) -> list[tuple["Sequence[int] | ModbusClientFailedError", float]]:
+        """
+        Read several ranges of registers, given as (start_address, num_registers). If pipelining is enabled, several
+        requests are sent before waiting for their responses.
+
+        If the inverter rejects a range with an exception response (e.g. illegal address), its values are replaced by
+        the ModbusClientFailedError, and we carry on with the other ranges. Anything else (a timeout, a garbled
+        response, failing to connect, etc.) means that there's no point trying the other ranges, so it's raised.
+
+        The bus is released between each request (or window of requests), so that more urgent requests can go first.
+
+        :returns: For each range, the values read (or the error), and when the response arrived (from time.monotonic())
+        """
+        results: list[tuple[Sequence[int] | ModbusClientFailedError, float]] = []
+        if self._pipeline_window <= 1:
+            for start_address, num_registers in read_ranges:
+                result: Sequence[int] | ModbusClientFailedError
+                try:
+                    result = await self.read_registers(
+                        start_address, num_registers, register_type, slave, metrics, priority
+                    )
+                except ModbusClientFailedError as ex:
+                    if not ex.is_exception_response:
+                        raise
+                    result = ex
+                results.append((result, time.monotonic()))
+            return results
+
+        # Release the lock between each window's worth of requests, so that writes can get in
+        for i in range(0, len(read_ranges), self._pipeline_window):
+            window = read_ranges[i : i + self._pipeline_window]
+            requests = [
+                _read_request(start_address, num_registers, register_type, slave)
+                for start_address, num_registers in window
+            ]
+            try:
+                responses = await self._execute(
+                    [request for request, _expected_response_type in requests], metrics, priority
+                )
+            except ModbusClientFailedError as ex:
+                if isinstance(ex.response, ResponseMismatchError):
+                    _LOGGER.warning(
+                        "%s: adapter does not appear to support pipelined requests (%s). Falling back to sending one "
+                        "request at a time",
+                        self,
+                        ex.response,
+                    )
+                    self._pipeline_window = 1
+                raise
+
+            # The whole window's responses arrive together
+            received_at = time.monotonic()
+            for (start_address, num_registers), (_request, expected_response_type), response in zip(
+                window, requests, responses, strict=True
+            ):
+                try:
+                    result = self._check_read_response(
+                        response, expected_response_type, start_address, num_registers, register_type, slave
+                    )
+                except ModbusClientFailedError as ex:
+                    if not ex.is_exception_response:
+                        raise
+                    result = ex
+                results.append((result, received_at))
+        return results
+
+    def _check_read_response(
+        self,
+        response: ModbusResponse,
+        expected_response_type: Type[Any],
+        start_address: int,
+        num_registers: int,
+        register_type: RegisterType,
+        slave: int,
+    ) -> Sequence[int]:
         if response.isError():
             message = (
                 f"Error reading registers. Type: {register_type}; start: {start_address}; count: {num_registers}; "
@@ -151,28 +256,29 @@ class ModbusClient:
                 response,
             )
 
-        return cast(list[int], response.registers)
+        # This is an array rather than a list if we decoded the response ourselves, see modbus_framing
+        registers = cast(Sequence[int], response.registers)
+        # Storing a short response would leave some registers with values from a previous poll, or none at all
+        if len(registers) != num_registers:
+            message = (
+                f"Error reading registers. Type: {register_type}; start: {start_address}; count: {num_registers}; "
+                f"slave: {slave}. Received {len(registers)} registers"
+            )
+            raise ModbusClientFailedError(message, self, response, truncated=True)
+        return registers
 
     async def write_registers(self, register_address: int, register_values: list[int], slave: int) -> None:
         """Write registers"""
+        request: ModbusRequest
         expected_response_type: Type[Any]
         if len(register_values) > 1:
             register_values = [int(i) for i in register_values]
-            response = await self._async_pymodbus_call(
-                self._client.write_registers,
-                register_address,
-                register_values,
-                slave,
-            )
+            request = WriteMultipleRegistersRequest(register_address, register_values, slave=slave)
             expected_response_type = WriteMultipleRegistersResponse
         else:
-            response = await self._async_pymodbus_call(
-                self._client.write_register,
-                register_address,
-                int(register_values[0]),
-                slave,
-            )
+            request = WriteSingleRegisterRequest(register_address, int(register_values[0]), slave=slave)
             expected_response_type = WriteSingleRegisterResponse
+        (response,) = await self._execute([request], priority=RequestPriority.WRITE)
 
         if response.isError():
             message = f"Error writing registers. Start: {register_address}; values: {register_values}; slave: {slave}"
@@ -195,27 +301,58 @@ class ModbusClient:
                 response,
             )
 
-    async def _async_pymodbus_call(self, call: Callable[..., T], *args: Any, auto_connect: bool = True) -> T:
-        """Convert async to sync pymodbus call."""
-
-        def _call() -> T:
-            # pymodbus 3.4.1 removes automatic reconnections for the sync modbus client.
-            # However, in versions prior to 4.3.0, the ModbusUdpClient didn't have a connected property.
-            # When using pollserial://, connected calls into serial.serial_for_url, which calls importlib.import_module,
-            # which HA doesn't like (see https://github.com/nathanmarlor/foxess_modbus/issues/618).
-            # Therefore we need to do this check inside the executor job
-            if auto_connect and hasattr(self._client, "connected") and not self._client.connected:
-                self._client.connect()
-            # If the connection failed, this call will throw an appropriate error
-            return call(*args)
-
-        async with self._lock:
-            result = await self._hass.async_add_executor_job(_call)
+    async def _execute(
+        self,
+        requests: list[ModbusRequest],
+        metrics: PollMetrics | None = None,
+        priority: RequestPriority = RequestPriority.POLL,
+    ) -> list[ModbusResponse]:
+        """
+        Sends the given requests, connecting first if necessary, and returns their responses. If metrics is given, the
+        time spent waiting and the round-trip time are recorded there.
+
+        If other requests are waiting for the bus, the ones with the most urgent priority go first.
+        """
+        queued_at = time.monotonic()
+        async with self._lock.hold(priority):
+            if isinstance(self._client, AsyncModbusClient):
+                started_at = time.monotonic()
+                try:
+                    await self._client.connect()
+                    responses = await self._client.execute(requests)
+                except ModbusIOException as ex:
+                    # pymodbus's sync clients return these as the response, rather than raising
+                    message = f"Error sending {'; '.join(str(request) for request in requests)}"
+                    raise ModbusClientFailedError(message, self, ex) from ex
+            else:
+                started_at, responses = await self._hass.async_add_executor_job(self._execute_sync, requests)
+            round_trip_secs = time.monotonic() - started_at
+            slave = requests[0].slave_id
+            self._bus_time_by_slave[slave] = self._bus_time_by_slave.get(slave, 0.0) + round_trip_secs
+            if metrics is not None:
+                metrics.record_wait(started_at - queued_at)
+                metrics.record_round_trip(requests, round_trip_secs)
             # This seems to be required for serial devices, otherwise subsequent reads fail
             # The HA modbus integration does the same
             if self._poll_delay > 0:
                 await asyncio.sleep(self._poll_delay)
-            return result
+            return responses
+
+    def take_bus_time(self) -> dict[int, float]:
+        """Returns slave -> seconds the bus has spent on that slave's requests since this was last called"""
+        bus_time, self._bus_time_by_slave = self._bus_time_by_slave, {}
+        return bus_time
+
+    def _execute_sync(self, requests: list[ModbusRequest]) -> tuple[float, list[ModbusResponse]]:
+        started_at = time.monotonic()
+        # pymodbus 3.4.1 removes automatic reconnections for the sync modbus client.
+        # When using pollserial://, connected calls into serial.serial_for_url, which calls importlib.import_module,
+        # which HA doesn't like (see https://github.com/nathanmarlor/foxess_modbus/issues/618).
+        # Therefore we need to do this check inside the executor job
+        if not self._client.connected:
+            self._client.connect()
+        # If the connection failed, this will throw an appropriate error
+        return started_at, [self._client.execute(request) for request in requests]
 
     def __str__(self) -> str:
         if self._protocol == SERIAL:
@@ -223,14 +360,43 @@ class ModbusClient:
         return f"{self._protocol}://{self._config['host']}:{self._config['port']}"
 
 
+def _read_request(
+    start_address: int, num_registers: int, register_type: RegisterType, slave: int
+) -> tuple[ModbusRequest, Type[Any]]:
+    """Creates the request to read the given registers, and the type of response we expect"""
+    if register_type == RegisterType.HOLDING:
+        return ReadHoldingRegistersRequest(start_address, num_registers, slave=slave), ReadHoldingRegistersResponse
+    if register_type == RegisterType.INPUT:
+        return ReadInputRegistersRequest(start_address, num_registers, slave=slave), ReadInputRegistersResponse
+    raise AssertionError()
+
+
 class ModbusClientFailedError(Exception):
     """Raised when the ModbusClient fails to read/write"""
 
-    def __init__(self, message: str, client: ModbusClient, response: ModbusResponse | Exception) -> None:
+    def __init__(
+        self, message: str, client: ModbusClient, response: ModbusResponse | Exception, *, truncated: bool = False
+    ) -> None:
         super().__init__(f"{message} from {client}: {response}")
         self.message = message
         self.client = client
         self.response = response
+        self._truncated = truncated
+
+    @property
+    def is_exception_response(self) -> bool:
+        """Whether the remote device answered with an exception response, rather than the request going wrong"""
+        return isinstance(self.response, ExceptionResponse)
+
+    @property
+    def is_size_related(self) -> bool:
+        """
+        Whether the request might have succeeded if it had been smaller: it timed out, or the response was garbled or
+        truncated. An exception response (e.g. an illegal address), or a response to a different request, isn't
+        """
+        if isinstance(self.response, ResponseMismatchError):
+            return False
+        return self._truncated or isinstance(self.response, ModbusIOException)
 
     def __str__(self) -> str:
         return f"{self.message} from {self.client}: {self.response}"
@@ -0,0 +1,189 @@
+"""
+Modbus framing for AsyncModbusClient: MBAP for TCP and UDP, and RTU (with its CRC) for RTU over TCP.
+
+We build request frames and split response frames out of the incoming bytes. Encoding the request PDUs is left to
+pymodbus. We decode the responses we see most ourselves (reads and writes of holding/input registers), as pymodbus
+decodes register values one at a time, but we still return pymodbus response types so that the rest of ModbusClient sees
+the same types regardless of which client is in use.
+"""
+
+import struct
+import sys
+from abc import ABC
+from abc import abstractmethod
+from array import array
+from dataclasses import dataclass
+from typing import cast
+
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.factory import ClientDecoder
+from pymodbus.pdu import ModbusRequest
+from pymodbus.pdu import ModbusResponse
+from pymodbus.register_read_message import ReadHoldingRegistersResponse
+from pymodbus.register_read_message import ReadInputRegistersResponse
+from pymodbus.register_write_message import WriteMultipleRegistersResponse
+from pymodbus.register_write_message import WriteSingleRegisterResponse
+from pymodbus.utilities import checkCRC
+from pymodbus.utilities import computeCRC
+
+# Transaction ID, protocol ID (always 0), length of the rest of the frame (including the unit ID), unit ID
+_MBAP_HEADER = struct.Struct(">HHHB")
+# The longest PDU allowed by the spec is 253 bytes, plus the unit ID
+_MBAP_MAX_LENGTH = 254
+
+# Slave, function code
+_RTU_HEADER = struct.Struct(">BB")
+_RTU_CRC = struct.Struct(">H")
+
+_EXCEPTION_MASK = 0x80
+
+# Function codes which have fixed-length responses (in RTU framing, including slave, function code and CRC)
+_RTU_FIXED_RESPONSE_LENGTHS = {
+    0x06: 8,  # Write single register: slave, fc, address, value, CRC
+    0x10: 8,  # Write multiple registers: slave, fc, address, count, CRC
+}
+# Function codes whose responses contain a byte count after the function code
+_RTU_BYTE_COUNT_FUNCTION_CODES = {0x03, 0x04}
+# Slave, function code, exception code, CRC
+_RTU_EXCEPTION_RESPONSE_LENGTH = 5
+
+_DECODER = ClientDecoder()
+
+# Function code -> response type, for responses containing a byte count followed by register values
+_READ_RESPONSE_TYPES: dict[int, type[ReadHoldingRegistersResponse] | type[ReadInputRegistersResponse]] = {
+    0x03: ReadHoldingRegistersResponse,
+    0x04: ReadInputRegistersResponse,
+}
+# Function code, address, value (write single register) or count (write multiple registers)
+_WRITE_RESPONSE = struct.Struct(">BHH")
+# array("H") is 16 bits on every platform we care about, but check
+assert array("H").itemsize == 2
+
+
+@dataclass(frozen=True)
+class ResponseFrame:
+    """A single response, split out of the incoming data"""
+
+    transaction_id: int
+    slave: int
+    pdu: bytes
+
+
+class ModbusFramer(ABC):
+    """Turns requests into bytes to send, and received bytes into responses"""
+
+    # Whether responses carry enough information to match them up to requests, meaning that we can have multiple
+    # requests in flight at once
+    supports_pipelining: bool
+
+    @abstractmethod
+    def build_frame(self, transaction_id: int, request: ModbusRequest) -> bytes:
+        """Builds the complete frame to send for the given request"""
+
+    @abstractmethod
+    def next_frame(self, buffer: bytearray) -> ResponseFrame | None:
+        """
+        Removes the first complete response frame from the start of the buffer and returns it, or returns None if the
+        buffer doesn't contain a complete frame yet.
+
+        Raises ModbusIOException if the buffer contains something which isn't a valid frame. The buffer contents are
+        undefined afterwards.
+        """
+
+
+class MbapFramer(ModbusFramer):
+    """Framing used by Modbus TCP and Modbus UDP"""
+
+    supports_pipelining = True
+
+    def build_frame(self, transaction_id: int, request: ModbusRequest) -> bytes:
+        pdu = bytes((request.function_code,)) + cast(bytes, request.encode())
+        return _MBAP_HEADER.pack(transaction_id, 0, len(pdu) + 1, request.slave_id) + pdu
+
+    def next_frame(self, buffer: bytearray) -> ResponseFrame | None:
+        if len(buffer) < _MBAP_HEADER.size:
+            return None
+
+        transaction_id, protocol_id, length, slave = _MBAP_HEADER.unpack_from(buffer)
+        if protocol_id != 0 or not 2 <= length <= _MBAP_MAX_LENGTH:
+            raise ModbusIOException(f"Invalid MBAP header: {bytes(buffer[:_MBAP_HEADER.size]).hex()}")
+
+        # The length includes the unit ID, which is part of the header
+        frame_end = _MBAP_HEADER.size - 1 + length
+        if len(buffer) < frame_end:
+            return None
+
+        pdu = bytes(buffer[_MBAP_HEADER.size : frame_end])
+        del buffer[:frame_end]
+        return ResponseFrame(transaction_id=transaction_id, slave=slave, pdu=pdu)
+
+
+class RtuFramer(ModbusFramer):
+    """Framing used by Modbus RTU, and RTU over TCP"""
+
+    # RTU frames don't have a transaction ID, so we have to rely on responses coming back in order
+    supports_pipelining = False
+
+    def build_frame(self, transaction_id: int, request: ModbusRequest) -> bytes:  # noqa: ARG002
+        # RTU frames don't have a transaction ID
+        frame = _RTU_HEADER.pack(request.slave_id, request.function_code) + cast(bytes, request.encode())
+        return frame + _RTU_CRC.pack(computeCRC(frame))
+
+    def next_frame(self, buffer: bytearray) -> ResponseFrame | None:
+        # RTU frames don't say how long they are, so we have to work it out from the function code
+        if len(buffer) < _RTU_HEADER.size:
+            return None
+
+        function_code = buffer[1]
+        if function_code & _EXCEPTION_MASK:
+            frame_length = _RTU_EXCEPTION_RESPONSE_LENGTH
+        elif function_code in _RTU_BYTE_COUNT_FUNCTION_CODES:
+            if len(buffer) < _RTU_HEADER.size + 1:
+                return None
+            frame_length = _RTU_HEADER.size + 1 + buffer[2] + _RTU_CRC.size
+        elif (fixed_length := _RTU_FIXED_RESPONSE_LENGTHS.get(function_code)) is not None:
+            frame_length = fixed_length
+        else:
+            raise ModbusIOException(f"Unexpected function code {function_code} in RTU response")
+
+        if len(buffer) < frame_length:
+            return None
+
+        frame = bytes(buffer[:frame_length])
+        del buffer[:frame_length]
+        (crc,) = _RTU_CRC.unpack_from(frame, frame_length - _RTU_CRC.size)
+        if not checkCRC(frame[: -_RTU_CRC.size], crc):
+            raise ModbusIOException(f"CRC mismatch in RTU response: {frame.hex()}")
+
+        return ResponseFrame(transaction_id=0, slave=frame[0], pdu=frame[1 : -_RTU_CRC.size])
+
+
+def decode_response_pdu(pdu: bytes) -> ModbusResponse | None:
+    """Decodes a response PDU, returning None if it isn't a response we recognise"""
+    function_code = pdu[0]
+
+    read_response_type = _READ_RESPONSE_TYPES.get(function_code)
+    if read_response_type is not None and len(pdu) >= 2 and len(pdu) == 2 + pdu[1] and pdu[1] % 2 == 0:
+        # Decode all of the registers in one go, straight from the PDU. Registers are big-endian
+        registers = array("H")
+        registers.frombytes(memoryview(pdu)[2:])
+        if sys.byteorder == "little":
+            registers.byteswap()
+        return read_response_type(registers)
+
+    if len(pdu) == _WRITE_RESPONSE.size:
+        if function_code == 0x06:
+            _function_code, address, value = _WRITE_RESPONSE.unpack(pdu)
+            return WriteSingleRegisterResponse(address, value)
+        if function_code == 0x10:
+            _function_code, address, count = _WRITE_RESPONSE.unpack(pdu)
+            return WriteMultipleRegistersResponse(address, count)
+
+    # Anything else (including exception responses, and anything malformed) goes through pymodbus
+    response: ModbusResponse | None = _DECODER.decode(pdu)
+    return response
+
+
+def response_matches_request(response: ModbusResponse, request: ModbusRequest) -> bool:
+    """Determines whether the given response (which may be an exception response) was sent for the given request"""
+    return bool(response.function_code & ~_EXCEPTION_MASK == request.function_code)
@@ -0,0 +1,59 @@
+"""A lock which is handed to the most urgent waiter first"""
+
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from ..common.types import RequestPriority
+
+
+class PriorityLock:
+    """
+    An asyncio lock where waiters are woken in order of priority, then in the order they started waiting.
+
+    When the lock's released, it's handed straight to the next waiter, so something else can't jump in front of it.
+    """
+
+    def __init__(self) -> None:
+        self._locked = False
+        self._waiters: list[tuple[RequestPriority, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+
+    def locked(self) -> bool:
+        return self._locked
+
+    @asynccontextmanager
+    async def hold(self, priority: RequestPriority) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: RequestPriority) -> None:
+        if not self._locked:
+            self._locked = True
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # If we were cancelled after being handed the lock, pass it on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        assert self._locked, "Lock is not acquired"
+        while self._waiters:
+            _priority, _count, future = heapq.heappop(self._waiters)
+            # Skip waiters which have been cancelled
+            if not future.done():
+                # Hand the lock over, leaving it locked
+                future.set_result(None)
+                return
+        self._locked = False
@@ -3,11 +3,17 @@
 import logging
 from abc import ABC
 from abc import abstractmethod
+from datetime import timedelta
 from enum import Enum
 from typing import Any
+from typing import Callable
 
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
 
+from ..derived_values import Derivation
+from ..derived_values import ValueSource
+from ..poll_metrics import PollMetrics
 from .types import RegisterPollType
 
 _LOGGER = logging.getLogger(__name__)
@@ -25,6 +31,39 @@ class ModbusControllerEntity(ABC):
     def register_poll_type(self) -> RegisterPollType:
         return RegisterPollType.PERIODICALLY
 
+    @property
+    def notify_on_every_update(self) -> bool:
+        """
+        Whether update_callback should be called for every update, rather than only when one of addresses changes.
+        This must not change while the entity is registered with the controller.
+        """
+        return False
+
+    @property
+    def heartbeat_interval(self) -> timedelta | None:
+        """
+        If set, update_callback is called as if all of addresses had changed at least this often (subject to the poll
+        rate), even if their values haven't changed. This must not change while the entity is registered with the
+        controller.
+        """
+        return None
+
+    @property
+    def value_source(self) -> ValueSource | None:
+        """
+        If set, derived values can use this entity's value, decoded from its addresses. This must not change while the
+        entity is registered with the controller.
+        """
+        return None
+
+    @property
+    def derivation(self) -> Derivation | None:
+        """
+        If set, the controller computes this derived value (see derived_value) after each poll, and calls
+        update_callback whenever it changes. This must not change while the entity is registered with the controller.
+        """
+        return None
+
     @abstractmethod
     def update_callback(self, changed_addresses: set[int]) -> None:
         """Notify listeners that the given addresses have changed"""
@@ -99,6 +138,11 @@ class EntityController(ABC):
     def current_connection_error(self) -> str | None:
         """Returns the current connection error, or None if there is no connection error"""
 
+    @property
+    @abstractmethod
+    def poll_metrics(self) -> PollMetrics | None:
+        """Fetch the poll metrics, if the user has turned them on"""
+
     @property
     @abstractmethod
     def remote_control_manager(self) -> EntityRemoteControlManager | None:
@@ -114,6 +158,15 @@ class EntityController(ABC):
     def inverter_details(self) -> dict[str, Any]:
         """Fetches the inverter details"""
 
+    @abstractmethod
+    def schedule_state_write(self, entity: Entity) -> None:
+        """
+        Asks for the entity's state to be written to HA. Use this instead of schedule_update_ha_state.
+
+        While the controller is telling entities about a poll, the writes are collected and all done together once
+        every entity has been told. Otherwise this is the same as schedule_update_ha_state.
+        """
+
     @abstractmethod
     def register_modbus_entity(self, listener: ModbusControllerEntity) -> None:
         """Register a modbus entity with the ModbusController"""
@@ -133,3 +186,25 @@ class EntityController(ABC):
     @abstractmethod
     def read(self, address: int | list[int], *, signed: bool) -> int | None:
         """Fetch the last-read value for the given address, or None if none is avaiable"""
+
+    @abstractmethod
+    def reader(self, address: int | list[int], *, signed: bool) -> Callable[[], int | None]:
+        """
+        Creates a function which does the same as read(address, signed=signed), but is specialised for the given
+        address(es). Use this for values which are read often
+        """
+
+    @abstractmethod
+    def derived_value(self, key: str) -> Any:
+        """Fetch the current value of the derived value with the given key, or None if it doesn't have a value"""
+
+    @abstractmethod
+    def data_age(self, addresses: list[int]) -> float | None:
+        """
+        Fetch the number of seconds since the least recently read of the given addresses was read, or None if any of
+        them haven't been read
+        """
+
+    @abstractmethod
+    def is_stale(self, addresses: list[int]) -> bool:
+        """Returns whether any of the given addresses has gone too long without being read (if the user enabled this)"""
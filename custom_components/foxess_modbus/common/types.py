@@ -12,6 +12,7 @@ from typing import TypeAlias
 from typing import TypedDict
 
 if TYPE_CHECKING:
+    from ..bus_scheduler import BusScheduler
     from ..client.modbus_client import ModbusClient
     from ..modbus_controller import ModbusController
 
@@ -83,14 +84,38 @@ class Inv(Flag):
 class RegisterPollType(IntEnum):
     """Describes when a register should be polled"""
 
-    # These must be ordered from least frequent to most frequent
+    # These must be ordered from least frequent to most frequent. If a register has multiple poll types, the most
+    # frequent wins.
     ON_CONNECTION = 0
-    PERIODICALLY = 1
+    # Things which change slowly, or only when we write them, e.g. energy totals and configuration
+    SLOW = 1
+    # Things which change, but which nothing needs to react to quickly, e.g. voltages and temperatures
+    MEDIUM = 2
+    # Every poll, e.g. power flows
+    PERIODICALLY = 3
+
+
+class RequestPriority(IntEnum):
+    """
+    How urgently a request to the inverter needs sending. When several requests are waiting for the bus, the most urgent
+    goes first.
+    """
+
+    # These must be ordered from most urgent to least urgent
+    # Writes, e.g. from remote control or from the user changing a setting
+    WRITE = 0
+    # Polls whose values feed back into remote control
+    CONTROL_READ = 1
+    # Normal polls
+    POLL = 2
+    # Reads which nothing's waiting on, e.g. from services or probing
+    DIAGNOSTIC = 3
 
 
 class HassDataEntry(TypedDict):
     controllers: list["ModbusController"]
     modbus_clients: list["ModbusClient"]
+    bus_schedulers: list["BusScheduler"]
     unload: NotRequired[Callable[[], None]]
 
 
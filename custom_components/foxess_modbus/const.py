@@ -39,8 +39,16 @@ MODBUS_TYPE = "modbus_type"  # TCP, UDP, SERIAL, RTU_OVER_TCP
 MODBUS_SERIAL_BAUD = "modbus_serial_baud"
 POLL_RATE = "poll_rate"
 MAX_READ = "max_read"
+# Used by the read planner, see ReadCost. Set by the adapter, and not currently user-configurable
+READ_ROUND_TRIP_COST = "read_round_trip_cost"
+READ_REGISTER_COST = "read_register_cost"
 ADAPTER_ID = "adapter_id"
+PIPELINE_WINDOW = "pipeline_window"
 ROUND_SENSOR_VALUES = "round_sensor_values"
+POLL_METRICS = "poll_metrics"
+AUTO_TUNE_READS = "auto_tune_reads"
+LEARN_REGISTER_MAP = "learn_register_map"
+STALE_DATA_TTL = "stale_data_ttl"
 # Used as a key in the inverter config to indicate that the adapter was migrated from config version 1
 ADAPTER_WAS_MIGRATED = "adapter_was_migrated"
 
@@ -0,0 +1,169 @@
+"""Values which are computed from other values, such as the total PV power"""
+
+from dataclasses import dataclass
+from graphlib import TopologicalSorter
+from typing import Any
+from typing import Callable
+
+# Decodes a source's value from the registers it's read from
+ValueDecoder = Callable[[], float | int | None]
+# Computes a derived value from the values of its sources, in order
+DerivedValueMethod = Callable[[list[float]], Any]
+
+
+@dataclass(frozen=True)
+class ValueSource:
+    """A value which derived values can use, decoded from registers"""
+
+    key: str
+    decode: ValueDecoder
+
+
+@dataclass(frozen=True)
+class Derivation:
+    """How to compute a derived value from other values (sources or other derived values), identified by key"""
+
+    key: str
+    sources: list[str]
+    method: DerivedValueMethod
+
+
+class DerivedValues:
+    """
+    A graph of named values. Sources are decoded from registers. Derived values are computed from other values, which
+    may be sources or other derived values.
+
+    After each poll, update is given the addresses which changed. Only the sources which use those addresses (and which
+    something depends on) are decoded again, and only the derived values downstream of a source which changed are
+    recomputed. They're recomputed in dependency order, so each derived value is computed once per poll, from inputs
+    read in that poll.
+
+    If any of a derived value's sources doesn't exist or doesn't have a value, neither does the derived value. Sources
+    which are deliberately missing (e.g. because the user disabled that sensor) should be left out of the Derivation.
+    """
+
+    def __init__(self) -> None:
+        self._sources: dict[str, ValueSource] = {}
+        self._source_addresses: dict[str, list[int]] = {}
+        self._sources_by_address: dict[int, set[str]] = {}
+        self._derivations: dict[str, Derivation] = {}
+        # Derived values, in an order where each one comes after everything it depends on
+        self._order: list[str] = []
+        # Keys of everything which derived values depend on
+        self._used: set[str] = set()
+        # Values of all derived values, and of sources which are used
+        self._values: dict[str, Any] = {}
+
+    def value(self, key: str) -> Any:
+        return self._values.get(key)
+
+    def add_source(self, source: ValueSource, addresses: list[int]) -> set[str]:
+        """Adds a source value, returning the keys of the derived values which changed as a result"""
+        self._check_not_added(source.key)
+        self._sources[source.key] = source
+        self._source_addresses[source.key] = addresses
+        for address in addresses:
+            self._sources_by_address.setdefault(address, set()).add(source.key)
+        if source.key not in self._used:
+            return set()
+        self._values[source.key] = source.decode()
+        return self._recompute({source.key})
+
+    def remove_source(self, key: str) -> set[str]:
+        """Removes a source value, returning the keys of the derived values which changed as a result"""
+        del self._sources[key]
+        for address in self._source_addresses.pop(key):
+            keys = self._sources_by_address[address]
+            keys.discard(key)
+            if not keys:
+                del self._sources_by_address[address]
+        self._values.pop(key, None)
+        return self._recompute({key})
+
+    def add_derived(self, derivation: Derivation) -> set[str]:
+        """
+        Adds a derived value, and computes it. Raises graphlib.CycleError if it depends on itself.
+
+        :returns: The keys of other derived values which changed as a result
+        """
+        self._check_not_added(derivation.key)
+        self._derivations[derivation.key] = derivation
+        try:
+            self._update_order()
+        except Exception:
+            del self._derivations[derivation.key]
+            self._update_order()
+            raise
+
+        # We don't keep the values of sources which nothing uses up to date
+        for key in derivation.sources:
+            source = self._sources.get(key)
+            if source is not None:
+                self._values[key] = source.decode()
+        self._values[derivation.key] = self._compute(derivation)
+        return self._recompute({derivation.key})
+
+    def remove_derived(self, key: str) -> set[str]:
+        """Removes a derived value, returning the keys of the derived values which changed as a result"""
+        del self._derivations[key]
+        del self._values[key]
+        self._update_order()
+        return self._recompute({key})
+
+    def update(self, changed_addresses: set[int]) -> set[str]:
+        """
+        Decodes the sources which use any of the given addresses, and recomputes what depends on them.
+
+        :returns: The keys of the derived values which changed
+        """
+        changed_sources: set[str] = set()
+        for address in changed_addresses:
+            keys = self._sources_by_address.get(address)
+            if keys is not None:
+                changed_sources.update(keys)
+        changed_sources &= self._used
+        if not changed_sources:
+            return set()
+
+        changed = set()
+        for key in changed_sources:
+            value = self._sources[key].decode()
+            if value != self._values[key]:
+                self._values[key] = value
+                changed.add(key)
+        return self._recompute(changed)
+
+    def _recompute(self, changed: set[str]) -> set[str]:
+        """Recomputes the derived values downstream of the given keys, returning those which changed"""
+        if not changed:
+            return set()
+
+        changed = set(changed)
+        changed_derived = set()
+        for key in self._order:
+            derivation = self._derivations[key]
+            if changed.isdisjoint(derivation.sources):
+                continue
+            value = self._compute(derivation)
+            if value != self._values[key]:
+                self._values[key] = value
+                changed.add(key)
+                changed_derived.add(key)
+        return changed_derived
+
+    def _compute(self, derivation: Derivation) -> Any:
+        inputs = []
+        for key in derivation.sources:
+            value = self._values.get(key)
+            if value is None:
+                return None
+            inputs.append(float(value))
+        return derivation.method(inputs) if inputs else None
+
+    def _update_order(self) -> None:
+        graph = {key: derivation.sources for key, derivation in self._derivations.items()}
+        self._order = [key for key in TopologicalSorter(graph).static_order() if key in self._derivations]
+        self._used = {key for derivation in self._derivations.values() for key in derivation.sources}
+
+    def _check_not_added(self, key: str) -> None:
+        assert key not in self._sources and key not in self._derivations, f"Value '{key}' already added"
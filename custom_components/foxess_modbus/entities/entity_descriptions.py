@@ -1,6 +1,7 @@
 """Holds all entity descriptions for all entities across all inverters"""
 
 import itertools
+from datetime import timedelta
 from typing import Iterable
 
 from homeassistant.components.number import NumberDeviceClass
@@ -10,6 +11,7 @@ from homeassistant.components.sensor import SensorStateClass
 from homeassistant.const import UnitOfTime
 
 from ..common.types import Inv
+from ..common.types import RegisterPollType
 from ..common.types import RegisterType
 from .charge_period_descriptions import CHARGE_PERIODS
 from .entity_factory import EntityFactory
@@ -32,12 +34,21 @@ from .modbus_sensor import ModbusSensorDescription
 from .modbus_version_sensor import ModbusVersionSensorDescription
 from .modbus_work_mode_select import ModbusWorkModeSelectDescription
 from .remote_control_description import REMOTE_CONTROL_DESCRIPTION
+from .reporting_policy import ReportingPolicy
 from .validation import Min
 from .validation import Range
 
 # hass type hints are messed up, and mypy doesn't see inherited dataclass properties on the EntityDescriptions
 # mypy: disable-error-code="call-arg"
 
+# Power, voltage and current wander around from one poll to the next. Only report changes which are big enough to
+# matter, and make sure that the recorder sees a value at least every few minutes. These only apply if the user turns on
+# ROUND_SENSOR_VALUES.
+# Sensors which are the source of a ModbusIntegrationSensor mustn't have one of these: the integration works from the
+# source's reported state, so it would carry on integrating the old value while a change was held back
+_POWER_REPORTING = ReportingPolicy(deadband=0.01, deadband_percent=1, max_silence=timedelta(minutes=5))  # kW
+_VOLTAGE_REPORTING = ReportingPolicy(deadband=1, max_silence=timedelta(minutes=5))  # V
+_CURRENT_REPORTING = ReportingPolicy(deadband=0.1, deadband_percent=1, max_silence=timedelta(minutes=5))  # A
 
 BMS_CONNECT_STATE_ADDRESS = [
     ModbusAddressSpec(input=11058, models=Inv.H1_G1 | Inv.KH_PRE119),
@@ -131,6 +142,8 @@ def _pv_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=name,
             device_class=SensorDeviceClass.VOLTAGE,
+            reporting_policy=_VOLTAGE_REPORTING,
+            poll_type=RegisterPollType.MEDIUM,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="V",
             scale=0.1,
@@ -144,6 +157,7 @@ def _pv_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=name,
             device_class=SensorDeviceClass.CURRENT,
+            reporting_policy=_CURRENT_REPORTING,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="A",
             scale=scale,
@@ -383,6 +397,7 @@ def _pv_entities() -> Iterable[EntityFactory]:
         method=sum,
         name="PV Power",
         device_class=SensorDeviceClass.POWER,
+        reporting_policy=_POWER_REPORTING,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="kW",
         icon="mdi:solar-power-variant-outline",
@@ -399,6 +414,7 @@ def _pv_entities() -> Iterable[EntityFactory]:
         method=sum,
         name="PV Power",
         device_class=SensorDeviceClass.POWER,
+        reporting_policy=_POWER_REPORTING,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="kW",
         icon="mdi:solar-power-variant-outline",
@@ -431,6 +447,8 @@ def _h1_current_voltage_power_entities() -> Iterable[EntityFactory]:
         entity_registry_enabled_default=False,
         name="Grid Voltage",
         device_class=SensorDeviceClass.VOLTAGE,
+        reporting_policy=_VOLTAGE_REPORTING,
+        poll_type=RegisterPollType.MEDIUM,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="V",
         scale=0.1,
@@ -446,6 +464,7 @@ def _h1_current_voltage_power_entities() -> Iterable[EntityFactory]:
         ],
         name="Inverter Current",
         device_class=SensorDeviceClass.CURRENT,
+        reporting_policy=_CURRENT_REPORTING,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="A",
         scale=0.1,
@@ -461,6 +480,7 @@ def _h1_current_voltage_power_entities() -> Iterable[EntityFactory]:
         ],
         name="Inverter Power",
         device_class=SensorDeviceClass.POWER,
+        reporting_policy=_POWER_REPORTING,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="kW",
         icon="mdi:export",
@@ -512,6 +532,8 @@ def _h1_current_voltage_power_entities() -> Iterable[EntityFactory]:
         entity_registry_enabled_default=False,
         name="EPS Voltage",
         device_class=SensorDeviceClass.VOLTAGE,
+        reporting_policy=_VOLTAGE_REPORTING,
+        poll_type=RegisterPollType.MEDIUM,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="V",
         scale=0.1,
@@ -528,6 +550,7 @@ def _h1_current_voltage_power_entities() -> Iterable[EntityFactory]:
         entity_registry_enabled_default=False,
         name="EPS Current",
         device_class=SensorDeviceClass.CURRENT,
+        reporting_policy=_CURRENT_REPORTING,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="A",
         scale=0.1,
@@ -544,6 +567,7 @@ def _h1_current_voltage_power_entities() -> Iterable[EntityFactory]:
         entity_registry_enabled_default=False,
         name="EPS Power",
         device_class=SensorDeviceClass.POWER,
+        reporting_policy=_POWER_REPORTING,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="kW",
         icon="mdi:power-socket",
@@ -595,6 +619,7 @@ def _h1_current_voltage_power_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Grid CT",
             device_class=SensorDeviceClass.POWER,
+            reporting_policy=_POWER_REPORTING,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="kW",
             icon="mdi:meter-electric-outline",
@@ -650,6 +675,7 @@ def _h1_current_voltage_power_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="CT2 Meter",
             device_class=SensorDeviceClass.POWER,
+            reporting_policy=_POWER_REPORTING,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="kW",
             icon="mdi:meter-electric-outline",
@@ -682,6 +708,8 @@ def _h3_current_voltage_power_entities() -> Iterable[EntityFactory]:
             entity_registry_enabled_default=False,
             name=f"Grid Voltage {phase}",
             device_class=SensorDeviceClass.VOLTAGE,
+            reporting_policy=_VOLTAGE_REPORTING,
+            poll_type=RegisterPollType.MEDIUM,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="V",
             scale=0.1,
@@ -718,6 +746,7 @@ def _h3_current_voltage_power_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=f"Inverter Current {phase}",
             device_class=SensorDeviceClass.CURRENT,
+            reporting_policy=_CURRENT_REPORTING,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="A",
             scale=scale,
@@ -757,6 +786,7 @@ def _h3_current_voltage_power_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=f"Inverter Power{name_suffix}",
             device_class=SensorDeviceClass.POWER,
+            reporting_policy=_POWER_REPORTING,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="kW",
             scale=scale,
@@ -851,6 +881,8 @@ def _h3_current_voltage_power_entities() -> Iterable[EntityFactory]:
             entity_registry_enabled_default=False,
             name=f"EPS Voltage_{phase}",
             device_class=SensorDeviceClass.VOLTAGE,
+            reporting_policy=_VOLTAGE_REPORTING,
+            poll_type=RegisterPollType.MEDIUM,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="V",
             scale=0.1,
@@ -870,6 +902,7 @@ def _h3_current_voltage_power_entities() -> Iterable[EntityFactory]:
             entity_registry_enabled_default=False,
             name=f"EPS Current {phase}",
             device_class=SensorDeviceClass.CURRENT,
+            reporting_policy=_CURRENT_REPORTING,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="A",
             scale=0.001,
@@ -888,6 +921,7 @@ def _h3_current_voltage_power_entities() -> Iterable[EntityFactory]:
             entity_registry_enabled_default=False,
             name=f"EPS Power {phase}",
             device_class=SensorDeviceClass.POWER,
+            reporting_policy=_POWER_REPORTING,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="kW",
             icon="mdi:power-socket",
@@ -927,6 +961,7 @@ def _h3_current_voltage_power_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=f"Grid CT{name_suffix}",
             device_class=SensorDeviceClass.POWER,
+            reporting_policy=_POWER_REPORTING,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="kW",
             icon="mdi:meter-electric-outline",
@@ -939,6 +974,8 @@ def _h3_current_voltage_power_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=f"Feed-in{name_suffix}",
             device_class=SensorDeviceClass.POWER,
+            # The total (but not each phase) is the source of an integration sensor
+            reporting_policy=_POWER_REPORTING if phase is not None else None,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="kW",
             icon="mdi:transmission-tower-import",
@@ -952,6 +989,7 @@ def _h3_current_voltage_power_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=f"Grid Consumption{name_suffix}",
             device_class=SensorDeviceClass.POWER,
+            reporting_policy=_POWER_REPORTING if phase is not None else None,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="kW",
             icon="mdi:transmission-tower-export",
@@ -1020,6 +1058,7 @@ def _h3_current_voltage_power_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=f"CT2 Meter{name_suffix}",
             device_class=SensorDeviceClass.POWER,
+            reporting_policy=_POWER_REPORTING,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="kW",
             icon="mdi:meter-electric-outline",
@@ -1043,6 +1082,8 @@ def _h3_current_voltage_power_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=f"Load Power{name_suffix}",
             device_class=SensorDeviceClass.POWER,
+            # The total (but not each phase) is the source of an integration sensor
+            reporting_policy=_POWER_REPORTING if phase is not None else None,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="kW",
             icon="mdi:home-lightning-bolt-outline",
@@ -1089,6 +1130,8 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=f"Inverter Battery{name_infix} Voltage",
             device_class=SensorDeviceClass.VOLTAGE,
+            reporting_policy=_VOLTAGE_REPORTING,
+            poll_type=RegisterPollType.MEDIUM,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="V",
             scale=0.1,
@@ -1114,6 +1157,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=f"Inverter Battery{name_infix} Current",
             device_class=SensorDeviceClass.CURRENT,
+            reporting_policy=_CURRENT_REPORTING,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="A",
             scale=scale,
@@ -1144,6 +1188,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=f"Inverter Battery{name_infix} Power",
             device_class=SensorDeviceClass.POWER,
+            reporting_policy=_POWER_REPORTING,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="kW",
             scale=0.001,
@@ -1155,6 +1200,8 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=f"Battery{name_infix} Discharge",
             device_class=SensorDeviceClass.POWER,
+            # The total (but not each battery) is the source of an integration sensor
+            reporting_policy=_POWER_REPORTING if index is not None else None,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="kW",
             icon="mdi:battery-arrow-down-outline",
@@ -1168,6 +1215,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name=f"Battery{name_infix} Charge",
             device_class=SensorDeviceClass.POWER,
+            reporting_policy=_POWER_REPORTING if index is not None else None,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="kW",
             icon="mdi:battery-arrow-up-outline",
@@ -1216,6 +1264,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
         entity_registry_enabled_default=False,
         name="Grid Frequency",
         device_class=SensorDeviceClass.FREQUENCY,
+        poll_type=RegisterPollType.MEDIUM,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="Hz",
         scale=0.01,
@@ -1233,6 +1282,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
         entity_registry_enabled_default=False,
         name="EPS Frequency",
         device_class=SensorDeviceClass.FREQUENCY,
+        poll_type=RegisterPollType.MEDIUM,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="Hz",
         scale=0.01,
@@ -1250,6 +1300,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
         ],
         name="Inverter Temp",
         device_class=SensorDeviceClass.TEMPERATURE,
+        poll_type=RegisterPollType.MEDIUM,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="°C",
         scale=0.1,
@@ -1265,6 +1316,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
         ],
         name="Ambient Temp",
         device_class=SensorDeviceClass.TEMPERATURE,
+        poll_type=RegisterPollType.MEDIUM,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="°C",
         scale=0.1,
@@ -1281,6 +1333,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
         bms_connect_state_address=BMS_CONNECT_STATE_ADDRESS,
         name="BMS Charge Rate",
         device_class=SensorDeviceClass.CURRENT,
+        reporting_policy=_CURRENT_REPORTING,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="A",
         scale=0.1,
@@ -1297,6 +1350,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
         bms_connect_state_address=BMS_CONNECT_STATE_ADDRESS,
         name="BMS Discharge Rate",
         device_class=SensorDeviceClass.CURRENT,
+        reporting_policy=_CURRENT_REPORTING,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="A",
         scale=0.1,
@@ -1324,6 +1378,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
         entity_registry_enabled_default=False,
         name="BMS Energy Throughput",
         device_class=SensorDeviceClass.ENERGY,
+        poll_type=RegisterPollType.SLOW,
         state_class=SensorStateClass.TOTAL,
         native_unit_of_measurement="kWh",
         scale=0.001,
@@ -1402,6 +1457,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Solar Generation Total",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL,
             native_unit_of_measurement="kWh",
             icon="mdi:solar-power",
@@ -1424,6 +1480,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Solar Generation Today",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL_INCREASING,
             native_unit_of_measurement="kWh",
             icon="mdi:solar-power",
@@ -1446,6 +1503,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Battery Charge Total",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL,
             native_unit_of_measurement="kWh",
             icon="mdi:battery-arrow-up-outline",
@@ -1482,6 +1540,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Battery Charge Today",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL_INCREASING,
             native_unit_of_measurement="kWh",
             icon="mdi:battery-arrow-up-outline",
@@ -1503,6 +1562,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Battery Discharge Total",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL,
             native_unit_of_measurement="kWh",
             icon="mdi:battery-arrow-down-outline",
@@ -1539,6 +1599,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Battery Discharge Today",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL_INCREASING,
             native_unit_of_measurement="kWh",
             icon="mdi:battery-arrow-down-outline",
@@ -1560,6 +1621,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Feed-in Total",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL,
             native_unit_of_measurement="kWh",
             icon="mdi:transmission-tower-import",
@@ -1596,6 +1658,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Feed-in Today",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL_INCREASING,
             native_unit_of_measurement="kWh",
             icon="mdi:transmission-tower-import",
@@ -1617,6 +1680,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Grid Consumption Total",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL,
             native_unit_of_measurement="kWh",
             icon="mdi:transmission-tower-export",
@@ -1653,6 +1717,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Grid Consumption Today",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL_INCREASING,
             native_unit_of_measurement="kWh",
             icon="mdi:transmission-tower-export",
@@ -1674,6 +1739,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Yield Total",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL,
             native_unit_of_measurement="kWh",
             icon="mdi:export",
@@ -1696,6 +1762,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Yield Today",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL_INCREASING,
             native_unit_of_measurement="kWh",
             icon="mdi:export",
@@ -1718,6 +1785,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Input Energy Total",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL,
             native_unit_of_measurement="kWh",
             icon="mdi:import",
@@ -1740,6 +1808,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Input Energy Today",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL_INCREASING,
             native_unit_of_measurement="kWh",
             icon="mdi:import",
@@ -1762,6 +1831,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Load Energy Total",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL,
             native_unit_of_measurement="kWh",
             icon="mdi:home-lightning-bolt-outline",
@@ -1805,6 +1875,7 @@ def _inverter_entities() -> Iterable[EntityFactory]:
             addresses=addresses,
             name="Load Energy Today",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL_INCREASING,
             native_unit_of_measurement="kWh",
             icon="mdi:home-lightning-bolt-outline",
@@ -1844,6 +1915,8 @@ def _bms_entities() -> Iterable[EntityFactory]:
             addresses=batvolt,
             name=f"Battery{name_infix} Voltage",
             device_class=SensorDeviceClass.VOLTAGE,
+            reporting_policy=_VOLTAGE_REPORTING,
+            poll_type=RegisterPollType.MEDIUM,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="V",
             scale=0.1,
@@ -1855,6 +1928,7 @@ def _bms_entities() -> Iterable[EntityFactory]:
             addresses=bat_current,
             name=f"Battery{name_infix} Current",
             device_class=SensorDeviceClass.CURRENT,
+            reporting_policy=_CURRENT_REPORTING,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="A",
             scale=0.1,
@@ -1878,6 +1952,7 @@ def _bms_entities() -> Iterable[EntityFactory]:
             bms_connect_state_address=bms_connect_state_address,
             name=f"Battery{name_infix} Temp",
             device_class=SensorDeviceClass.TEMPERATURE,
+            poll_type=RegisterPollType.MEDIUM,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="°C",
             scale=0.1,
@@ -1889,6 +1964,7 @@ def _bms_entities() -> Iterable[EntityFactory]:
             bms_connect_state_address=bms_connect_state_address,
             name=f"BMS{name_infix} Cell Temp High",
             device_class=SensorDeviceClass.TEMPERATURE,
+            poll_type=RegisterPollType.MEDIUM,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="°C",
             scale=0.1,
@@ -1900,6 +1976,7 @@ def _bms_entities() -> Iterable[EntityFactory]:
             bms_connect_state_address=bms_connect_state_address,
             name=f"BMS{name_infix} Cell Temp Low",
             device_class=SensorDeviceClass.TEMPERATURE,
+            poll_type=RegisterPollType.MEDIUM,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="°C",
             scale=0.1,
@@ -1911,6 +1988,7 @@ def _bms_entities() -> Iterable[EntityFactory]:
             bms_connect_state_address=bms_connect_state_address,
             name=f"BMS{name_infix} Cell mV High",
             device_class=SensorDeviceClass.VOLTAGE,
+            poll_type=RegisterPollType.MEDIUM,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="mV",
             signed=False,
@@ -1923,6 +2001,7 @@ def _bms_entities() -> Iterable[EntityFactory]:
             bms_connect_state_address=bms_connect_state_address,
             name=f"BMS{name_infix} Cell mV Low",
             device_class=SensorDeviceClass.VOLTAGE,
+            poll_type=RegisterPollType.MEDIUM,
             state_class=SensorStateClass.MEASUREMENT,
             native_unit_of_measurement="mV",
             signed=False,
@@ -1935,6 +2014,7 @@ def _bms_entities() -> Iterable[EntityFactory]:
             bms_connect_state_address=bms_connect_state_address,
             name=f"BMS{name_infix} kWh Remaining",
             device_class=SensorDeviceClass.ENERGY,
+            poll_type=RegisterPollType.SLOW,
             state_class=SensorStateClass.TOTAL,
             native_unit_of_measurement="kWh",
             scale=0.01,
@@ -2043,6 +2123,8 @@ def _configuration_entities() -> Iterable[EntityFactory]:
         ],
         name="Max Charge Current",
         device_class=SensorDeviceClass.CURRENT,
+        reporting_policy=_CURRENT_REPORTING,
+        poll_type=RegisterPollType.SLOW,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="A",
         scale=0.1,
@@ -2075,6 +2157,8 @@ def _configuration_entities() -> Iterable[EntityFactory]:
         ],
         name="Max Discharge Current",
         device_class=SensorDeviceClass.CURRENT,
+        reporting_policy=_CURRENT_REPORTING,
+        poll_type=RegisterPollType.SLOW,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="A",
         scale=0.1,
@@ -2108,6 +2192,7 @@ def _configuration_entities() -> Iterable[EntityFactory]:
         ],
         name="Min SoC",
         device_class=SensorDeviceClass.BATTERY,
+        poll_type=RegisterPollType.SLOW,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:battery-arrow-down",
         native_unit_of_measurement="%",
@@ -2141,6 +2226,7 @@ def _configuration_entities() -> Iterable[EntityFactory]:
         ],
         name="Max SoC",
         device_class=SensorDeviceClass.BATTERY,
+        poll_type=RegisterPollType.SLOW,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="%",
         icon="mdi:battery-arrow-up",
@@ -2174,6 +2260,7 @@ def _configuration_entities() -> Iterable[EntityFactory]:
         ],
         name="Min SoC (On Grid)",
         device_class=SensorDeviceClass.BATTERY,
+        poll_type=RegisterPollType.SLOW,
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement="%",
         icon="mdi:battery-arrow-down",
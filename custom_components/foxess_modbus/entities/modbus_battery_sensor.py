@@ -11,6 +11,7 @@ from homeassistant.helpers.entity import Entity
 from ..common.entity_controller import EntityController
 from ..common.types import Inv
 from ..common.types import RegisterType
+from ..derived_values import ValueSource
 from .entity_factory import ENTITY_DESCRIPTION_KWARGS
 from .inverter_model_spec import ModbusAddressSpec
 from .modbus_sensor import ModbusSensor
@@ -70,14 +71,23 @@ class ModbusBatterySensor(ModbusSensor):
             self._interested_addresses.append(bms_connect_state_address)
 
         self._bms_connect_state_address = bms_connect_state_address
+        # Derived values mustn't use our registers while the BMS is offline either
+        self._value_source = ValueSource(entity_description.key, self._decode_if_bms_connected)
+
+    def _is_bms_connected(self) -> bool:
+        if self._bms_connect_state_address is None:
+            return True
+        bms_connect_state = self._controller.read(self._bms_connect_state_address, signed=False)
+        # 0: Initial state, 1: OK, 2: NG
+        return bms_connect_state == 1
+
+    def _decode_if_bms_connected(self) -> int | float | None:
+        return self._calculate_native_value() if self._is_bms_connected() else None
 
     @property
     def native_value(self) -> Any:
-        if self._bms_connect_state_address is not None:
-            bms_connect_state = self._controller.read(self._bms_connect_state_address, signed=False)
-            # 0: Initial state, 1: OK, 2: NG
-            if bms_connect_state != 1:
-                return None
+        if not self._is_bms_connected():
+            return None
 
         return super().native_value
 
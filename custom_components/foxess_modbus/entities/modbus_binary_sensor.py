@@ -14,6 +14,7 @@ from homeassistant.helpers.entity import Entity
 
 from ..common.entity_controller import EntityController
 from ..common.types import Inv
+from ..common.types import RegisterPollType
 from ..common.types import RegisterType
 from .base_validator import BaseValidator
 from .entity_factory import ENTITY_DESCRIPTION_KWARGS
@@ -30,6 +31,7 @@ class ModbusBinarySensorDescription(BinarySensorEntityDescription, EntityFactory
 
     address: list[InverterModelSpec]
     validate: list[BaseValidator] = field(default_factory=list)
+    poll_type: RegisterPollType = RegisterPollType.PERIODICALLY
     icon_func: Callable[[bool | None], str | None] | None
 
     @property
@@ -95,3 +97,7 @@ class ModbusBinarySensor(ModbusEntityMixin, BinarySensorEntity):
     @property
     def addresses(self) -> list[int]:
         return [self._address]
+
+    @property
+    def register_poll_type(self) -> RegisterPollType:
+        return cast(ModbusBinarySensorDescription, self.entity_description).poll_type
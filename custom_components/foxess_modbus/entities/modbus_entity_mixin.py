@@ -130,7 +130,12 @@ class ModbusEntityMixin(
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._controller.is_connected
+        return self._controller.is_connected and not self._controller.is_stale(self.addresses)
+
+    @property
+    def data_age(self) -> float | None:
+        """How many seconds old the oldest of this entity's register values is, or None if they haven't all been read"""
+        return self._controller.data_age(self.addresses)
 
     async def async_added_to_hass(self) -> None:
         """Add update callback after being added to hass."""
@@ -147,11 +152,11 @@ class ModbusEntityMixin(
             self._address_updated()
 
     def is_connected_changed_callback(self) -> None:
-        self.schedule_update_ha_state()
+        self._controller.schedule_state_write(self)
 
     def _address_updated(self) -> None:
         """Called when the controller reads an updated to any of the addresses in self.addresses"""
-        self.schedule_update_ha_state()
+        self._controller.schedule_state_write(self)
 
     def _get_entity_id(self, platform: Platform) -> str:
         """Gets the entity ID"""
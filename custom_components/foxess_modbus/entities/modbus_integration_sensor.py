@@ -23,6 +23,8 @@ from .entity_factory import EntityFactory
 from .inverter_model_spec import EntitySpec
 from .modbus_entity_mixin import ModbusEntityMixin
 from .modbus_entity_mixin import get_entity_id
+from .reporting_policy import ReportingPolicy
+from .reporting_policy import create_reporting_filter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -49,6 +51,7 @@ class ModbusIntegrationSensorDescription(SensorEntityDescription, EntityFactory)
     round_digits: int | None = None
     source_entity: str
     unit_time: UnitOfTime
+    reporting_policy: ReportingPolicy | None = None
 
     @property
     def entity_type(self) -> type[Entity]:
@@ -111,6 +114,8 @@ class ModbusIntegrationSensor(ModbusEntityMixin, IntegrationSensor):
         self._controller = controller
         self.entity_description = entity_description
         self.entity_id = self._get_entity_id(Platform.SENSOR)
+        self._reporting_filter = create_reporting_filter(controller, entity_description.reporting_policy)
+        self._written_available: bool | None = None
 
         IntegrationSensor.__init__(
             self=self,
@@ -127,6 +132,27 @@ class ModbusIntegrationSensor(ModbusEntityMixin, IntegrationSensor):
         # Use the icon from entity_description
         delattr(self, "_attr_icon")
 
+    def async_write_ha_state(self) -> None:
+        # IntegrationSensor writes its state every time the source changes. Drop writes which the reporting policy
+        # filters out: the integral itself keeps accumulating (and that's what's restored on restart), so nothing is
+        # lost. Availability changes always go through.
+        value = self.native_value
+        available = self.available
+        if available == self._written_available and not self._reporting_filter.should_report(value):
+            return
+        self._reporting_filter.reported(value)
+        self._written_available = available
+        super().async_write_ha_state()
+
+    @property
+    def heartbeat_interval(self) -> timedelta | None:
+        # If the reporting policy held back a change, we need to check again later even if the source doesn't change
+        return self._reporting_filter.heartbeat_interval
+
+    def update_callback(self, changed_addresses: set[int]) -> None:  # noqa: ARG002
+        # We don't have any addresses, so this is only called for heartbeats
+        self._controller.schedule_state_write(self)
+
     @property
     def addresses(self) -> list[int]:
         return []
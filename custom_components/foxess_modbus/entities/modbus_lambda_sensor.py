@@ -1,25 +1,28 @@
-"""Entity which gets its value by applying a lambda to a set of other entities"""
+"""Entity which gets its value by applying a lambda to the values of a set of other sensors"""
 
 import logging
 from dataclasses import dataclass
+from datetime import timedelta
 from typing import Any
 from typing import Callable
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.sensor import SensorEntityDescription
 from homeassistant.const import Platform
-from homeassistant.core import Event
+from homeassistant.helpers import entity_registry
 from homeassistant.helpers.entity import Entity
-from homeassistant.helpers.event import async_track_state_change_event
 
 from ..common.entity_controller import EntityController
 from ..common.types import Inv
 from ..common.types import RegisterType
+from ..derived_values import Derivation
 from .entity_factory import ENTITY_DESCRIPTION_KWARGS
 from .entity_factory import EntityFactory
 from .inverter_model_spec import EntitySpec
 from .modbus_entity_mixin import ModbusEntityMixin
 from .modbus_entity_mixin import get_entity_id
+from .reporting_policy import ReportingPolicy
+from .reporting_policy import create_reporting_filter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,6 +35,7 @@ class ModbusLambdaSensorDescription(SensorEntityDescription, EntityFactory):
     sources: list[str]
     # This might have fewer inputs than there are elements in sources, if some inputs are disabled
     method: Callable[[list[float]], Any]
+    reporting_policy: ReportingPolicy | None = None
 
     @property
     def entity_type(self) -> type[Entity]:
@@ -46,12 +50,10 @@ class ModbusLambdaSensorDescription(SensorEntityDescription, EntityFactory):
         if not self._supports_inverter_model(self.models, inverter_model, register_type):
             return None
 
-        source_entity_ids = [get_entity_id(controller, Platform.SENSOR, x) for x in self.sources]
-
         return ModbusLambdaSensor(
             controller=controller,
             entity_description=self,
-            source_entity_ids=source_entity_ids,
+            sources=self.sources,
             method=self.method,
         )
 
@@ -76,56 +78,50 @@ class ModbusLambdaSensor(ModbusEntityMixin, SensorEntity):
         self,
         controller: EntityController,
         entity_description: ModbusLambdaSensorDescription,
-        source_entity_ids: list[str],
+        sources: list[str],
         method: Callable[[list[float]], Any],
     ) -> None:
         self._controller = controller
         self.entity_description = entity_description
-        self._source_entity_ids = source_entity_ids
-        self._method = method
+        # The controller works out our value from the decoded values of the source sensors, after each poll
+        self._derivation = Derivation(entity_description.key, sources, method)
+        self._reporting_filter = create_reporting_filter(controller, entity_description.reporting_policy)
 
     async def async_added_to_hass(self) -> None:
         """Add update callback after being added to hass."""
+        # If any source sensor doesn't have a value, we don't either. However the user might have disabled some inputs
+        # (e.g. we sum PV1-PV4 and the user disabled PV4), so those are left out. This has to be done before super()
+        # registers us with the controller
+        registry = entity_registry.async_get(self.hass)
+        sources = []
+        for key in self._derivation.sources:
+            entry = registry.async_get(get_entity_id(self._controller, Platform.SENSOR, key))
+            if entry is None or not entry.disabled:
+                sources.append(key)
+        self._derivation = Derivation(self._derivation.key, sources, self._derivation.method)
+
         await super().async_added_to_hass()
+        self._update_value()
 
-        self.async_on_remove(async_track_state_change_event(self.hass, self._source_entity_ids, self._handle_event))
+    def _update_value(self) -> None:
+        # As with ModbusSensor, the reporting policy only decides whether our latest value is written to HA
+        self._attr_native_value = self._controller.derived_value(self._derivation.key)
+        if self._reporting_filter.should_report(self._attr_native_value):
+            self._reporting_filter.reported(self._attr_native_value)
+            self._controller.schedule_state_write(self)
 
-        self._update_value()
+    @property
+    def derivation(self) -> Derivation:
+        return self._derivation
 
-    def _handle_event(self, _event: Event) -> None:
-        self._update_value()
+    @property
+    def heartbeat_interval(self) -> timedelta | None:
+        # If the reporting policy held back a change, we need to check again later even if the sources don't change
+        return self._reporting_filter.heartbeat_interval
 
-    def _update_value(self) -> None:
-        inputs = []
-        new_value = None
-        success = True
-        # If all source sensors are unknown/unavailable, return unknown.
-        # However we might be operating on a number of inputs and the user might have disabled some
-        # (e.g. we sum PV1-PV4 and the user disabled PV4), so if any input is disabled (provided we have
-        # at least one enabled input), we'll keep going.
-        # However, if any input isn't a float, or is unknown/unavailable, we'll abort.
-        for source in self._source_entity_ids:
-            state = self.hass.states.get(source)
-            if state is None:
-                # Disabled
-                continue
-            str_value = state.state
-            if str_value is None or str_value == "unknown" or str_value == "unavailable":
-                success = False
-                break
-            try:
-                float_value = float(str_value)
-                inputs.append(float_value)
-            except ValueError:
-                success = False
-                break
-
-        if success and len(inputs) > 0:
-            new_value = self._method(inputs)
-
-        if new_value != self._attr_native_value:
-            self._attr_native_value = new_value
-            self.schedule_update_ha_state()
+    def update_callback(self, changed_addresses: set[int]) -> None:  # noqa: ARG002
+        # We don't have any addresses, so this is only called when our value changes, or for heartbeats
+        self._update_value()
 
     @property
     def addresses(self) -> list[int]:
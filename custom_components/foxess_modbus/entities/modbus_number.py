@@ -15,6 +15,7 @@ from homeassistant.helpers.entity import Entity
 
 from ..common.entity_controller import EntityController
 from ..common.types import Inv
+from ..common.types import RegisterPollType
 from ..common.types import RegisterType
 from .base_validator import BaseValidator
 from .entity_factory import ENTITY_DESCRIPTION_KWARGS
@@ -34,6 +35,8 @@ class ModbusNumberDescription(NumberEntityDescription, EntityFactory):
     scale: float | None = None
     post_process: Callable[[float], float] | None = None
     validate: list[BaseValidator] = field(default_factory=list)
+    # Configuration normally only changes when we write it, and we re-read everything after a write
+    poll_type: RegisterPollType = RegisterPollType.SLOW
 
     @property
     def entity_type(self) -> type[Entity]:
@@ -120,3 +123,7 @@ class ModbusNumber(ModbusEntityMixin, NumberEntity):
     @property
     def addresses(self) -> list[int]:
         return [self._address]
+
+    @property
+    def register_poll_type(self) -> RegisterPollType:
+        return cast(ModbusNumberDescription, self.entity_description).poll_type
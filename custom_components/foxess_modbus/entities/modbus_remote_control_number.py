@@ -120,7 +120,7 @@ class ModbusRemoteControlNumber(ModbusEntityMixin, RestoreNumber, NumberEntity):
         scaled = int(native_value / entity_description.scale)
         entity_description.value_setter(self._manager, scaled)
 
-        self.schedule_update_ha_state()
+        self._controller.schedule_state_write(self)
 
     @property
     def addresses(self) -> list[int]:
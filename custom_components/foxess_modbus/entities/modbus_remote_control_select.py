@@ -96,9 +96,14 @@ class ModbusRemoteControlSelect(ModbusEntityMixin, SelectEntity):
         await self._manager.set_mode(value)
         self.schedule_update_ha_state()
 
+    @property
+    def notify_on_every_update(self) -> bool:
+        # We don't have any addresses: we just watch the remote control manager's mode
+        return True
+
     def update_callback(self, _changed_addresses: set[int]) -> None:
         if self._manager.mode != self._prev_option:
-            self.schedule_update_ha_state()
+            self._controller.schedule_state_write(self)
 
     @property
     def addresses(self) -> list[int]:
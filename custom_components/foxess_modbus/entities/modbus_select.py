@@ -13,6 +13,7 @@ from homeassistant.helpers.entity import Entity
 
 from ..common.entity_controller import EntityController
 from ..common.types import Inv
+from ..common.types import RegisterPollType
 from ..common.types import RegisterType
 from .base_validator import BaseValidator
 from .entity_factory import ENTITY_DESCRIPTION_KWARGS
@@ -30,6 +31,8 @@ class ModbusSelectDescription(SelectEntityDescription, EntityFactory):
     address: list[ModbusAddressSpec]
     options_map: dict[int, str]
     validate: list[BaseValidator] = field(default_factory=list)
+    # Configuration normally only changes when we write it, and we re-read everything after a write
+    poll_type: RegisterPollType = RegisterPollType.SLOW
 
     @property
     def entity_type(self) -> type[Entity]:
@@ -115,3 +118,7 @@ class ModbusSelect(ModbusEntityMixin, SelectEntity):
     @property
     def addresses(self) -> list[int]:
         return [self._address]
+
+    @property
+    def register_poll_type(self) -> RegisterPollType:
+        return cast(ModbusSelectDescription, self.entity_description).poll_type
@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from dataclasses import field
 from datetime import date
 from datetime import datetime
+from datetime import timedelta
 from decimal import Decimal
 from typing import Any
 from typing import Callable
@@ -19,13 +20,17 @@ from homeassistant.helpers.typing import StateType
 
 from ..common.entity_controller import EntityController
 from ..common.types import Inv
+from ..common.types import RegisterPollType
 from ..common.types import RegisterType
 from ..const import ROUND_SENSOR_VALUES
+from ..derived_values import ValueSource
 from .base_validator import BaseValidator
 from .entity_factory import ENTITY_DESCRIPTION_KWARGS
 from .entity_factory import EntityFactory
 from .inverter_model_spec import ModbusAddressesSpec
 from .modbus_entity_mixin import ModbusEntityMixin
+from .reporting_policy import ReportingPolicy
+from .reporting_policy import create_reporting_filter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,6 +45,8 @@ class ModbusSensorDescription(SensorEntityDescription, EntityFactory):
     post_process: Callable[[float], float] | None = None
     validate: list[BaseValidator] = field(default_factory=list)
     signed: bool = True
+    poll_type: RegisterPollType = RegisterPollType.PERIODICALLY
+    reporting_policy: ReportingPolicy | None = None
 
     @property
     def entity_type(self) -> type[Entity]:
@@ -89,26 +96,52 @@ class ModbusSensor(ModbusEntityMixin, SensorEntity):
         self._addresses = addresses
         self._round_to = round_to
         self._moving_average_filter: deque[float] | None = deque(maxlen=6) if round_to is not None else None
+        self._reporting_filter = create_reporting_filter(controller, entity_description.reporting_policy)
+        self._calculate_native_value = self._create_decoder()
+        # Derived values use our decoded value, before rounding or the reporting policy
+        self._value_source = ValueSource(entity_description.key, self._calculate_native_value)
         self.entity_id = self._get_entity_id(Platform.SENSOR)
 
-    def _calculate_native_value(self) -> int | float | None:
-        """Return the value reported by the sensor."""
+    def _create_decoder(self) -> Callable[[], int | float | None]:
+        """
+        Creates the function which calculates the value reported by the sensor: it reads our registers, then applies
+        scale, post_process and validate. This is done once up front, and specialised for what the description uses, as
+        it's called on every update.
+        """
         entity_description = cast(ModbusSensorDescription, self.entity_description)
-        original = self._controller.read(self._addresses, signed=entity_description.signed)
+        read = self._controller.reader(self._addresses, signed=entity_description.signed)
+        scale = entity_description.scale
+        post_process = entity_description.post_process
+        validators = entity_description.validate
 
-        if original is None:
-            return None
+        if post_process is None and not validators:
+            if scale is None:
+                return read
 
-        value: float | int = original
+            def decode_scaled() -> int | float | None:
+                original = read()
+                return original * scale if original is not None else None
 
-        if entity_description.scale is not None:
-            value = value * entity_description.scale
-        if entity_description.post_process is not None:
-            value = entity_description.post_process(float(value))
-        if not self._validate(entity_description.validate, value, original):
-            return None
+            return decode_scaled
 
-        return value
+        def decode() -> int | float | None:
+            original = read()
+            if original is None:
+                return None
+
+            value: float | int = original
+            if scale is not None:
+                value = value * scale
+            if post_process is not None:
+                value = post_process(float(value))
+            # Only go through _validate (which logs what failed) if something failed
+            if not all(rule.validate(value) for rule in validators):
+                self._validate(validators, value, original)
+                return None
+
+            return value
+
+        return decode
 
     def _round_native_value(self, value: StateType | date | datetime | Decimal) -> Any:
         def nearest_multiple(value: float, round_to: float) -> float:
@@ -156,19 +189,37 @@ class ModbusSensor(ModbusEntityMixin, SensorEntity):
 
         return value
 
-    def update_callback(self, changed_addresses: set[int]) -> None:
+    @property
+    def value_source(self) -> ValueSource:
+        return self._value_source
+
+    @property
+    def notify_on_every_update(self) -> bool:
         # If we're using rounding and a filter, we need to respond to every update, even if the register hasn't changed
+        return self._round_to is not None
+
+    @property
+    def heartbeat_interval(self) -> timedelta | None:
+        # If the reporting policy held back a change, we need to check again later even if the register doesn't change
+        return self._reporting_filter.heartbeat_interval
+
+    def update_callback(self, changed_addresses: set[int]) -> None:
         if self._round_to is None:
             super().update_callback(changed_addresses)
         else:
             self._address_updated()
 
     def _address_updated(self) -> None:
-        new_value = self._round_native_value(self._calculate_native_value())
-        if new_value != self._attr_native_value:
-            self._attr_native_value = new_value
+        # native_value always has the latest value. The reporting policy only decides whether it's written to HA
+        self._attr_native_value = self._round_native_value(self._calculate_native_value())
+        if self._reporting_filter.should_report(self._attr_native_value):
+            self._reporting_filter.reported(self._attr_native_value)
             super()._address_updated()
 
     @property
     def addresses(self) -> list[int]:
         return self._addresses
+
+    @property
+    def register_poll_type(self) -> RegisterPollType:
+        return cast(ModbusSensorDescription, self.entity_description).poll_type
@@ -68,6 +68,11 @@ class ModbusWorkModeSelect(ModbusSelect):
         # explicitly
         self.async_schedule_update_ha_state()
 
+    @property
+    def notify_on_every_update(self) -> bool:
+        # The remote control mode can change without any of our addresses changing
+        return True
+
     def update_callback(self, changed_addresses: set[int]) -> None:
         super().update_callback(changed_addresses)
 
@@ -76,4 +81,4 @@ class ModbusWorkModeSelect(ModbusSelect):
             self._controller.remote_control_manager is not None
             and self._controller.remote_control_manager.mode != self._prev_remote_control_mode
         ):
-            self.schedule_update_ha_state()
+            self._controller.schedule_state_write(self)
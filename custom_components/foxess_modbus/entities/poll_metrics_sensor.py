@@ -0,0 +1,134 @@
+"""Diagnostic sensors which show a controller's poll metrics, if they're turned on"""
+
+from dataclasses import dataclass
+from typing import Any
+from typing import Callable
+
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorEntityDescription
+from homeassistant.components.sensor import SensorStateClass
+from homeassistant.const import PERCENTAGE
+from homeassistant.const import Platform
+from homeassistant.const import UnitOfTime
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.typing import StateType
+
+from ..common.entity_controller import EntityController
+from ..poll_metrics import PollMetrics
+from .modbus_entity_mixin import ModbusEntityMixin
+
+
+def _without(values: dict[str, Any], key: str) -> dict[str, Any]:
+    return {k: v for k, v in values.items() if k != key}
+
+
+@dataclass(frozen=True)
+class PollMetric:
+    """Defines a PollMetricsSensor"""
+
+    description: SensorEntityDescription
+    value: Callable[[PollMetrics], StateType]
+    # These are written to the recorder on every update, so keep them small. The get_poll_metrics service has the detail
+    attributes: Callable[[PollMetrics], dict[str, Any]] | None = None
+
+
+POLL_METRICS = [
+    PollMetric(
+        description=SensorEntityDescription(  # type: ignore
+            key="poll_duration",
+            name="Poll Duration",
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+        value=lambda m: round(m.last_poll_duration_secs * 1000) if m.last_poll_duration_secs is not None else None,
+        attributes=lambda m: _without(m.as_dict()["polls"], "histogram"),
+    ),
+    PollMetric(
+        description=SensorEntityDescription(  # type: ignore
+            key="read_latency",
+            name="Read Latency",
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+        value=lambda m: m.mean_read_latency_ms,
+        attributes=lambda m: _without(m.as_dict()["reads"], "ranges"),
+    ),
+    PollMetric(
+        description=SensorEntityDescription(  # type: ignore
+            key="bus_wait_time",
+            name="Bus Wait Time",
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+        value=lambda m: m.mean_wait_ms,
+        attributes=lambda m: m.as_dict()["wait"],
+    ),
+    PollMetric(
+        description=SensorEntityDescription(  # type: ignore
+            key="read_efficiency",
+            name="Read Efficiency",
+            native_unit_of_measurement=PERCENTAGE,
+            state_class=SensorStateClass.MEASUREMENT,
+        ),
+        value=lambda m: m.read_efficiency,
+        attributes=lambda m: {"registers_read": m.registers_read, "registers_used": m.registers_used},
+    ),
+    PollMetric(
+        description=SensorEntityDescription(  # type: ignore
+            key="skipped_polls",
+            name="Skipped Polls",
+            state_class=SensorStateClass.TOTAL_INCREASING,
+        ),
+        value=lambda m: m.skipped_polls,
+    ),
+    PollMetric(
+        description=SensorEntityDescription(  # type: ignore
+            key="poll_errors",
+            name="Poll Errors",
+            state_class=SensorStateClass.TOTAL_INCREASING,
+        ),
+        value=lambda m: m.error_count,
+        attributes=lambda m: dict(m.errors),
+    ),
+]
+
+
+class PollMetricsSensor(ModbusEntityMixin, SensorEntity):
+    """Shows one of the controller's poll metrics"""
+
+    def __init__(
+        self,
+        controller: EntityController,
+        metric: PollMetric,
+    ) -> None:
+        self.entity_description = metric.description
+        self._metric = metric
+        self._controller = controller
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self.entity_id = self._get_entity_id(Platform.SENSOR)
+
+    @property
+    def native_value(self) -> StateType:
+        metrics = self._controller.poll_metrics
+        assert metrics is not None
+        return self._metric.value(metrics)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        metrics = self._controller.poll_metrics
+        assert metrics is not None
+        return self._metric.attributes(metrics) if self._metric.attributes is not None else None
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @property
+    def should_poll(self) -> bool:
+        # Let HA refresh us on its own schedule, rather than on every poll. This also keeps the error counts up to date
+        # while polls are failing
+        return True
+
+    @property
+    def addresses(self) -> list[int]:
+        return []
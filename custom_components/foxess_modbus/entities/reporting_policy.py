@@ -0,0 +1,83 @@
+"""Limits which changes to a sensor's value get sent to HA, to cut down on the amount of data recorded"""
+
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any
+
+from ..common.entity_controller import EntityController
+from ..const import ROUND_SENSOR_VALUES
+
+
+@dataclass(frozen=True, kw_only=True)
+class ReportingPolicy:
+    """
+    Describes which changes to a sensor's value are reported to HA.
+
+    A change is reported if it's at least the deadband (the larger of deadband, and deadband_percent of the last
+    reported value), and at least min_interval has passed since the last report. A change which was held back is
+    reported anyway once max_silence has passed since the last report. Changes to or from something which isn't a
+    number (such as unknown) are always reported straight away.
+    """
+
+    deadband: float | None = None
+    deadband_percent: float | None = None
+    min_interval: timedelta | None = None
+    max_silence: timedelta | None = None
+
+    @property
+    def recheck_interval(self) -> timedelta | None:
+        """How often a change which was held back needs checking again, so that it's reported eventually"""
+        return min((x for x in (self.min_interval, self.max_silence) if x is not None), default=None)
+
+
+class ReportingFilter:
+    """Applies a ReportingPolicy to the values of a single sensor"""
+
+    def __init__(self, policy: ReportingPolicy | None) -> None:
+        self._policy = policy
+        self._reported_value: Any = None
+        self._reported_at: float | None = None  # From time.monotonic()
+
+    @property
+    def heartbeat_interval(self) -> timedelta | None:
+        """How often the sensor needs to re-check its value, even if nothing's changed"""
+        return self._policy.recheck_interval if self._policy is not None else None
+
+    def should_report(self, value: Any) -> bool:
+        """Determines whether the given value should be reported. Call reported() if it is"""
+        if self._reported_at is None:
+            return True
+        if value == self._reported_value:
+            return False
+        policy = self._policy
+        if policy is None or not _is_number(value) or not _is_number(self._reported_value):
+            return True
+
+        since_reported = time.monotonic() - self._reported_at
+        if policy.min_interval is not None and since_reported < policy.min_interval.total_seconds():
+            return False
+        if policy.max_silence is not None and since_reported >= policy.max_silence.total_seconds():
+            return True
+
+        reported_value = float(self._reported_value)
+        deadband = max(policy.deadband or 0.0, abs(reported_value) * (policy.deadband_percent or 0.0) / 100)
+        return abs(float(value) - reported_value) >= deadband
+
+    def reported(self, value: Any) -> None:
+        """Records that the given value was reported to HA"""
+        self._reported_value = value
+        self._reported_at = time.monotonic()
+
+
+def create_reporting_filter(controller: EntityController, policy: ReportingPolicy | None) -> ReportingFilter:
+    """
+    Creates the ReportingFilter for an entity with the given policy. Policies only apply if the user has asked for
+    sensor values to be rounded and filtered: otherwise every change is reported
+    """
+    return ReportingFilter(policy if controller.inverter_details.get(ROUND_SENSOR_VALUES, False) else None)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, int | float | Decimal) and not isinstance(value, bool)
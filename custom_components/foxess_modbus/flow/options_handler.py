@@ -7,16 +7,23 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.selector import selector
 
 from ..const import ADAPTER_ID
+from ..const import AUTO_TUNE_READS
 from ..const import CONFIG_ENTRY_TITLE
 from ..const import INVERTERS
+from ..const import LEARN_REGISTER_MAP
 from ..const import MAX_READ
 from ..const import MODBUS_TYPE
+from ..const import PIPELINE_WINDOW
+from ..const import POLL_METRICS
 from ..const import POLL_RATE
 from ..const import ROUND_SENSOR_VALUES
+from ..const import STALE_DATA_TTL
 from ..inverter_adapters import ADAPTERS
 from .adapter_flow_segment import AdapterFlowSegment
 from .flow_handler_mixin import FlowHandlerMixin
 
+_MAX_PIPELINE_WINDOW = 16
+
 
 class OptionsHandler(FlowHandlerMixin, config_entries.OptionsFlow):
     """Options flow handler"""
@@ -131,6 +138,28 @@ class OptionsHandler(FlowHandlerMixin, config_entries.OptionsFlow):
                 options[MAX_READ] = max_read
             else:
                 options.pop(MAX_READ, None)
+            pipeline_window = user_input.get("pipeline_window")
+            if pipeline_window is not None:
+                options[PIPELINE_WINDOW] = pipeline_window
+            else:
+                options.pop(PIPELINE_WINDOW, None)
+            if user_input.get("auto_tune_reads", False):
+                options[AUTO_TUNE_READS] = True
+            else:
+                options.pop(AUTO_TUNE_READS, None)
+            if user_input.get("learn_register_map", False):
+                options[LEARN_REGISTER_MAP] = True
+            else:
+                options.pop(LEARN_REGISTER_MAP, None)
+            if user_input.get("poll_metrics", False):
+                options[POLL_METRICS] = True
+            else:
+                options.pop(POLL_METRICS, None)
+            stale_data_ttl = user_input.get("stale_data_ttl")
+            if stale_data_ttl is not None:
+                options[STALE_DATA_TTL] = stale_data_ttl
+            else:
+                options.pop(STALE_DATA_TTL, None)
 
             return self._save_selected_inverter_options(options)
 
@@ -149,6 +178,20 @@ class OptionsHandler(FlowHandlerMixin, config_entries.OptionsFlow):
             None, vol.All(int, vol.Range(min=1))
         )
 
+        schema_parts[
+            vol.Optional("pipeline_window", description={"suggested_value": options.get(PIPELINE_WINDOW)})
+        ] = vol.Any(None, vol.All(int, vol.Range(min=1, max=_MAX_PIPELINE_WINDOW)))
+        schema_parts[vol.Required("auto_tune_reads", default=options.get(AUTO_TUNE_READS, False))] = selector(
+            {"boolean": {}}
+        )
+        schema_parts[vol.Required("learn_register_map", default=options.get(LEARN_REGISTER_MAP, False))] = selector(
+            {"boolean": {}}
+        )
+        schema_parts[vol.Required("poll_metrics", default=options.get(POLL_METRICS, False))] = selector({"boolean": {}})
+        schema_parts[
+            vol.Optional("stale_data_ttl", description={"suggested_value": options.get(STALE_DATA_TTL)})
+        ] = vol.Any(None, vol.All(int, vol.Range(min=1)))
+
         schema = vol.Schema(schema_parts)
 
         inverter_config = current_adapter.config.inverter_config(combined_config_options[MODBUS_TYPE])
@@ -157,6 +200,7 @@ class OptionsHandler(FlowHandlerMixin, config_entries.OptionsFlow):
             "inverter": self._create_label_for_inverter(combined_config_options),
             "default_poll_rate": f"{inverter_config[POLL_RATE]}",
             "default_max_read": f"{inverter_config[MAX_READ]}",
+            "default_pipeline_window": f"{inverter_config[PIPELINE_WINDOW]}",
         }
 
         return await self.with_default_form(
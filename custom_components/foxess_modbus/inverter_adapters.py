@@ -8,7 +8,10 @@ from typing import Any
 
 from .common.types import ConnectionType
 from .const import MAX_READ
+from .const import PIPELINE_WINDOW
 from .const import POLL_RATE
+from .const import READ_REGISTER_COST
+from .const import READ_ROUND_TRIP_COST
 from .const import RTU_OVER_TCP
 from .const import TCP
 from .const import UDP
@@ -26,6 +29,18 @@ class InverterAdapterType(str, Enum):
 _DEFAULT_POLL_RATE = 10
 _DEFAULT_MAX_READ = 20  # Be safe by default
 
+# Costs used by the read planner, in ms. These are rough: they only need to be about the right size relative to each
+# other. Each register is 2 bytes, which takes ~2ms at 9600 baud on RS485.
+_DEFAULT_ROUND_TRIP_COST = 50
+_DEFAULT_REGISTER_COST = 2
+# Talking straight to the inverter's LAN port, extra registers are almost free
+_DIRECT_REGISTER_COST = 0.1
+# The W610 has a very large round-trip time
+_W610_ROUND_TRIP_COST = 250
+
+# Sending multiple requests before waiting for responses is opt-in, as many adapters can't cope
+_DEFAULT_PIPELINE_WINDOW = 1
+
 
 class InverterAdapterConfigProvider(ABC):
     @abstractmethod
@@ -36,8 +51,20 @@ class InverterAdapterConfigProvider(ABC):
 
 
 class _DefaultConfig(InverterAdapterConfigProvider):
-    def __init__(self, max_read: int = _DEFAULT_MAX_READ, poll_rate: int = _DEFAULT_POLL_RATE) -> None:
-        self._config = {POLL_RATE: poll_rate, MAX_READ: max_read}
+    def __init__(
+        self,
+        max_read: int = _DEFAULT_MAX_READ,
+        poll_rate: int = _DEFAULT_POLL_RATE,
+        round_trip_cost: float = _DEFAULT_ROUND_TRIP_COST,
+        register_cost: float = _DEFAULT_REGISTER_COST,
+    ) -> None:
+        self._config = {
+            POLL_RATE: poll_rate,
+            MAX_READ: max_read,
+            READ_ROUND_TRIP_COST: round_trip_cost,
+            READ_REGISTER_COST: register_cost,
+            PIPELINE_WINDOW: _DEFAULT_PIPELINE_WINDOW,
+        }
 
     def inverter_config(self, _network_protocol: str) -> dict[str, Any]:
         return self._config
@@ -48,6 +75,9 @@ class _W610Config(InverterAdapterConfigProvider):
         return {
             POLL_RATE: 15 if network_protocol == TCP else 10,
             MAX_READ: 8,
+            READ_ROUND_TRIP_COST: _W610_ROUND_TRIP_COST,
+            READ_REGISTER_COST: _DEFAULT_REGISTER_COST,
+            PIPELINE_WINDOW: _DEFAULT_PIPELINE_WINDOW,
         }
 
 
@@ -132,7 +162,7 @@ ADAPTERS = {
         InverterAdapter.direct(
             "direct",
             "https://github.com/nathanmarlor/foxess_modbus/wiki/Direct-Ethernet-Connection-to-Inverter",
-            config=_DefaultConfig(max_read=100),
+            config=_DefaultConfig(max_read=100, register_cost=_DIRECT_REGISTER_COST),
         ),
         # Serial Adapters
         InverterAdapter.serial(
@@ -1,42 +1,59 @@
 """Modbus controller"""
 
+import asyncio
 import logging
 import re
-import threading
 import time
 from contextlib import contextmanager
-from dataclasses import dataclass
-from datetime import datetime
-from datetime import timedelta
 from enum import Enum
 from typing import Any
+from typing import Callable
 from typing import Iterable
 from typing import Iterator
+from typing import Sequence
+from typing import cast
 
 from homeassistant.components.logbook import async_log_entry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import issue_registry
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.issue_registry import IssueSeverity
+from homeassistant.util import slugify
 from pymodbus.exceptions import ConnectionException
+from pymodbus.pdu import ExceptionResponse
+from pymodbus.pdu import ModbusExceptions
 
 from .client.modbus_client import ModbusClient
 from .client.modbus_client import ModbusClientFailedError
 from .common.entity_controller import EntityController
 from .common.entity_controller import EntityRemoteControlManager
 from .common.entity_controller import ModbusControllerEntity
+from .common.entity_controller import RemoteControlMode
 from .common.exceptions import AutoconnectFailedError
 from .common.exceptions import UnsupportedInverterError
 from .common.types import RegisterPollType
 from .common.types import RegisterType
+from .common.types import RequestPriority
 from .common.unload_controller import UnloadController
+from .const import AUTO_TUNE_READS
 from .const import DOMAIN
 from .const import ENTITY_ID_PREFIX
 from .const import FRIENDLY_NAME
+from .const import HOST
 from .const import INVERTER_MODEL
+from .const import LEARN_REGISTER_MAP
 from .const import MAX_READ
+from .const import POLL_METRICS
+from .const import STALE_DATA_TTL
+from .derived_values import DerivedValues
 from .inverter_profiles import INVERTER_PROFILES
 from .inverter_profiles import InverterModelConnectionTypeProfile
+from .poll_metrics import PollMetrics
+from .read_planner import ReadCost
+from .read_planner import plan_read_ranges
+from .read_tuner import ReadTuner
+from .register_map import LearnedRegisterMap
+from .register_store import RegisterStore
 from .remote_control_manager import RemoteControlManager
 
 _LOGGER = logging.getLogger(__name__)
@@ -52,13 +69,14 @@ _UINT16_MAX = 65535
 
 _INVERTER_WRITE_DELAY_SECS = 5
 
+# If some ranges fail during a poll, how many times we retry them, and how long we wait before the first retry (this
+# doubles on each retry)
+_MAX_RANGE_RETRIES = 2
+_RANGE_RETRY_DELAY_SECS = 0.1
 
-@dataclass
-class RegisterValue:
-    poll_type: RegisterPollType
-    read_value: int | None = None
-    written_value: int | None = None
-    written_at: float | None = None  # From time.monotonic()
+# Roughly how often registers in the slower poll tiers are read. These are rounded to a multiple of the poll rate
+_MEDIUM_POLL_INTERVAL_SECS = 30
+_SLOW_POLL_INTERVAL_SECS = 120
 
 
 class ConnectionState(Enum):
@@ -67,16 +85,6 @@ class ConnectionState(Enum):
     CONNECTED = 2
 
 
-@contextmanager
-def _acquire_nonblocking(lock: threading.Lock) -> Iterator[bool]:
-    locked = lock.acquire(False)
-    try:
-        yield locked
-    finally:
-        if locked:
-            lock.release()
-
-
 class ModbusController(EntityController, UnloadController):
     """Class to manage forecast retrieval"""
 
@@ -89,18 +97,70 @@ class ModbusController(EntityController, UnloadController):
         slave: int,
         poll_rate: int,
         max_read: int,
+        read_cost: ReadCost,
+        config_entry_id: str,
     ) -> None:
         """Init"""
         self._hass = hass
         self._update_listeners: set[ModbusControllerEntity] = set()
-        self._data: dict[int, RegisterValue] = {}
+        # Index of address -> listeners interested in that address, so that we only wake the entities affected by an
+        # update
+        self._listeners_by_address: dict[int, set[ModbusControllerEntity]] = {}
+        # Listeners which have asked to hear about every update, regardless of address
+        self._every_update_listeners: set[ModbusControllerEntity] = set()
+        # Listeners which have asked to be notified periodically even if nothing's changed -> when they were last
+        # notified (from time.monotonic())
+        self._heartbeat_listeners: dict[ModbusControllerEntity, float] = {}
+        self._registers = RegisterStore()
+        # Values computed from other entities' values, and the listener which shows each one
+        self._derived_values = DerivedValues()
+        self._derived_value_listeners: dict[str, ModbusControllerEntity] = {}
         self._client = client
         self._connection_type_profile = connection_type_profile
         self._inverter_details = inverter_details
         self._slave = slave
         self._poll_rate = poll_rate
         self._max_read = max_read
-        self._refresh_lock = threading.Lock()
+        self._read_cost = read_cost
+        # Cache of (max_read, least frequent poll type to read) -> read ranges. Cleared whenever the set of addresses,
+        # or their poll types, change
+        self._read_ranges_cache: dict[tuple[int, RegisterPollType], list[tuple[int, int]]] = {}
+        # Number of successful polls, used to work out which poll tiers are due. A slow poll is always a medium poll
+        # as well, so that we only ever need to read all tiers at or above a given poll type.
+        self._poll_count = 0
+        self._medium_poll_every = max(round(_MEDIUM_POLL_INTERVAL_SECS / poll_rate), 1)
+        self._slow_poll_every = self._medium_poll_every * max(
+            round(_SLOW_POLL_INTERVAL_SECS / (poll_rate * self._medium_poll_every)), 1
+        )
+        # After a write, we read every tier until we've done a poll after the inverter's had a chance to settle. This
+        # makes sure that configuration registers don't show stale values once the written value stops being used.
+        self._read_all_tiers_until: float | None = None
+        # Addresses written since we last stopped using written values. Entities listening to these need telling once
+        # read() switches back to returning read values, as the value might not be what we wrote
+        self._written_addresses: set[int] = set()
+        # (start_address, num_registers, register_type) -> read in progress for read_registers
+        self._in_flight_reads: dict[tuple[int, int, RegisterType], asyncio.Task[Sequence[int]]] = {}
+        self._poll_metrics = PollMetrics() if inverter_details.get(POLL_METRICS, False) else None
+        self._read_tuner = (
+            ReadTuner(max_read, f"{client} {slave}") if inverter_details.get(AUTO_TUNE_READS, False) else None
+        )
+        # Several inverters can share a unique ID prefix (often empty), so the map is saved per connection and slave
+        self._register_map = (
+            LearnedRegisterMap(
+                hass,
+                slugify(f"{config_entry_id}_{inverter_details[HOST]}_{slave}"),
+                f"{inverter_details[INVERTER_MODEL]}/{connection_type_profile.register_type}",
+            )
+            if hass is not None and inverter_details.get(LEARN_REGISTER_MAP, False)
+            else None
+        )
+        # If set, entities become unavailable if their registers haven't been read for this long after they were due
+        self._stale_data_ttl: int | None = inverter_details.get(STALE_DATA_TTL)
+        # Listeners which were stale when we last checked
+        self._stale_listeners: set[ModbusControllerEntity] = set()
+        # While we're notifying listeners, the entities which have asked for their state to be written (in the order
+        # they asked). None otherwise
+        self._pending_state_writes: dict[Entity, None] | None = None
         self._num_failed_poll_attempts = 0
         # To start, we're neither connected nor disconnected
         self._connection_state = ConnectionState.INITIAL
@@ -120,15 +180,6 @@ class ModbusController(EntityController, UnloadController):
             RemoteControlManager(self, remote_control_config, poll_rate) if remote_control_config is not None else None
         )
 
-        if self._hass is not None:
-            refresh = async_track_time_interval(
-                self._hass,
-                self._refresh,
-                timedelta(seconds=self._poll_rate),
-            )
-
-            self._unload_listeners.append(refresh)
-
     @property
     def hass(self) -> HomeAssistant:
         return self._hass
@@ -138,10 +189,27 @@ class ModbusController(EntityController, UnloadController):
         # Only tell things we're not connected if we're actually disconnected
         return self._connection_state == ConnectionState.INITIAL or self._connection_state == ConnectionState.CONNECTED
 
+    @property
+    def slave(self) -> int:
+        return self._slave
+
+    @property
+    def poll_rate(self) -> int:
+        return self._poll_rate
+
     @property
     def current_connection_error(self) -> str | None:
         return self._current_connection_error
 
+    @property
+    def poll_metrics(self) -> PollMetrics | None:
+        return self._poll_metrics
+
+    @property
+    def modbus_entities(self) -> Iterable[ModbusControllerEntity]:
+        """The entities which have been registered with register_modbus_entity"""
+        return self._update_listeners
+
     @property
     def remote_control_manager(self) -> EntityRemoteControlManager | None:
         return self._remote_control_manager
@@ -158,31 +226,14 @@ class ModbusController(EntityController, UnloadController):
         # There can be a delay between writing a register, and actually reading that value back (presumably the delay
         # is on the inverter somewhere). If we've recently written a value, use that value, rather than the latest-read
         # value
-        now = time.monotonic()
-
-        def _read_value(address: int) -> int | None:
-            register_value = self._data.get(address)
-            if register_value is None:
-                return None
-
-            value: int | None
-            if (
-                register_value.written_value is not None
-                and register_value.written_at is not None
-                and now - register_value.written_at < _INVERTER_WRITE_DELAY_SECS
-            ):
-                value = register_value.written_value
-            else:
-                value = register_value.read_value
-
-            return value
+        written_since = time.monotonic() - _INVERTER_WRITE_DELAY_SECS
 
         if isinstance(address, int):
             address = [address]
 
         value = 0
         for i, a in enumerate(address):
-            val = _read_value(a)
+            val = self._registers.value(a, written_since)
             if val is None:
                 return None
             value |= (val & 0xFFFF) << (i * 16)
@@ -193,9 +244,151 @@ class ModbusController(EntityController, UnloadController):
 
         return value
 
-    async def read_registers(self, start_address: int, num_registers: int, register_type: RegisterType) -> list[int]:
-        """Read one of more registers, used by the read_registers_service"""
-        return await self._client.read_registers(start_address, num_registers, register_type, self._slave)
+    def derived_value(self, key: str) -> Any:
+        return self._derived_values.value(key)
+
+    def reader(self, address: int | list[int], *, signed: bool) -> Callable[[], int | None]:
+        read_registers = self._registers.reader([address] if isinstance(address, int) else address, signed=signed)
+        monotonic = time.monotonic
+
+        def read() -> int | None:
+            # See read()
+            return read_registers(monotonic() - _INVERTER_WRITE_DELAY_SECS)
+
+        return read
+
+    def data_age(self, addresses: list[int]) -> float | None:
+        oldest_read_at = time.monotonic()
+        for address in addresses:
+            read_at = self._registers.read_at(address)
+            if read_at is None:
+                return None
+            oldest_read_at = min(oldest_read_at, read_at)
+        return time.monotonic() - oldest_read_at
+
+    def is_stale(self, addresses: list[int]) -> bool:
+        if self._stale_data_ttl is None:
+            return False
+        now = time.monotonic()
+        for address in addresses:
+            read_at = self._registers.read_at(address)
+            poll_type = self._registers.poll_type(address)
+            # Registers which haven't been read yet don't have a value to be stale
+            if read_at is None or poll_type is None:
+                continue
+            poll_interval_secs = self._poll_interval_secs(poll_type)
+            if poll_interval_secs is not None and now - read_at > poll_interval_secs + self._stale_data_ttl:
+                return True
+        return False
+
+    def _poll_interval_secs(self, poll_type: RegisterPollType) -> float | None:
+        """How often registers with the given poll type are normally read, or None if they're only read on connection"""
+        if poll_type == RegisterPollType.ON_CONNECTION:
+            return None
+        polls = {
+            RegisterPollType.SLOW: self._slow_poll_every,
+            RegisterPollType.MEDIUM: self._medium_poll_every,
+            RegisterPollType.PERIODICALLY: 1,
+        }[poll_type]
+        if self._read_tuner is not None:
+            polls *= self._read_tuner.poll_every
+        return float(polls * self._poll_rate)
+
+    def _update_stale_listeners(self) -> None:
+        """Tells listeners whose registers have gone stale (or stopped being stale) that their availability's changed"""
+        if self._stale_data_ttl is None:
+            return
+        with self._batch_state_writes():
+            for listener in self._update_listeners:
+                is_stale = self.is_stale(listener.addresses)
+                if is_stale != (listener in self._stale_listeners):
+                    if is_stale:
+                        _LOGGER.debug("%s %s: %s has gone stale", self._client, self._slave, listener)
+                        self._stale_listeners.add(listener)
+                    else:
+                        self._stale_listeners.discard(listener)
+                    listener.is_connected_changed_callback()
+
+    def schedule_state_write(self, entity: Entity) -> None:
+        # Entities can't write their state until they've been added to HA
+        if entity.hass is None:
+            return
+        if self._pending_state_writes is None:
+            entity.schedule_update_ha_state()
+        else:
+            self._pending_state_writes[entity] = None
+
+    @contextmanager
+    def _batch_state_writes(self) -> Iterator[None]:
+        """
+        Collects the state writes which entities ask for while listeners are notified inside this block, and does them
+        all at the end, in one pass on the event loop. Scheduling each entity's write separately queues a job per
+        entity per poll, which adds up with hundreds of entities.
+        """
+        if self._pending_state_writes is not None:
+            # We're already inside a batch, which will do the writes
+            yield
+            return
+
+        pending_state_writes: dict[Entity, None] = {}
+        self._pending_state_writes = pending_state_writes
+        try:
+            yield
+        finally:
+            self._pending_state_writes = None
+
+        for entity in pending_state_writes:
+            # Don't let one bad entity stop the others from updating
+            try:
+                entity.async_write_ha_state()
+            except Exception:
+                _LOGGER.exception("%s %s: failed to write state of %s", self._client, self._slave, entity.entity_id)
+
+    async def read_registers(
+        self, start_address: int, num_registers: int, register_type: RegisterType, max_age: float | None = None
+    ) -> list[int]:
+        """
+        Read one of more registers, used by the read_registers_service.
+
+        If max_age (in seconds) is given, registers which we've polled more recently than that are taken from the store,
+        and only the rest are read from the inverter.
+        """
+        if max_age is None or register_type != self._connection_type_profile.register_type:
+            return await self._read_registers_coalesced(start_address, num_registers, register_type)
+
+        read_since = time.monotonic() - max_age
+        values = [self._registers.read_value(start_address + i, read_since) for i in range(num_registers)]
+
+        # Read each run of missing values from the inverter
+        i = 0
+        while i < num_registers:
+            if values[i] is not None:
+                i += 1
+                continue
+            end = i + 1
+            while end < num_registers and values[end] is None:
+                end += 1
+            values[i:end] = await self._read_registers_coalesced(start_address + i, end - i, register_type)
+            i = end
+
+        return cast(list[int], values)
+
+    async def _read_registers_coalesced(
+        self, start_address: int, num_registers: int, register_type: RegisterType
+    ) -> list[int]:
+        """Reads registers from the inverter, sharing the result with any identical read which is already in flight"""
+        key = (start_address, num_registers, register_type)
+        task = self._in_flight_reads.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._client.read_registers(
+                    start_address, num_registers, register_type, self._slave, priority=RequestPriority.DIAGNOSTIC
+                )
+            )
+            self._in_flight_reads[key] = task
+            task.add_done_callback(lambda _task: self._in_flight_reads.pop(key, None))
+        # Don't let one caller being cancelled cancel the read for everyone else
+        return list(await asyncio.shield(task))
 
     async def write_register(self, address: int, value: int) -> None:
         await self.write_registers(address, [value])
@@ -222,14 +415,14 @@ class ModbusController(EntityController, UnloadController):
             await self._client.write_registers(start_address, values, self._slave)
 
             changed_addresses = set()
+            written_at = time.monotonic()
             for i, value in enumerate(values):
                 address = start_address + i
                 # Only store the result of the write if it's a register we care about ourselves
-                register_value = self._data.get(address)
-                if register_value is not None:
-                    register_value.written_value = value
-                    register_value.written_at = time.monotonic()
+                if self._registers.set_written_value(address, value, written_at):
                     changed_addresses.add(address)
+            self._written_addresses.update(changed_addresses)
+            self._read_all_tiers_until = written_at + _INVERTER_WRITE_DELAY_SECS
             if len(changed_addresses) > 0:
                 self._notify_update(changed_addresses)
         except Exception as ex:
@@ -237,141 +430,250 @@ class ModbusController(EntityController, UnloadController):
             _LOGGER.error("Failed to write registers", exc_info=True)
             raise ex
 
-    async def _refresh(self, _time: datetime) -> None:
-        """Refresh modbus data"""
-        # Make sure that we don't do two refreshes at the same time, if one is too slow
-        with _acquire_nonblocking(self._refresh_lock) as acquired:
-            if not acquired:
-                _LOGGER.warning(
-                    "Aborting refresh of %s %s as a previous refresh is still in progress. Is your poll rate '%s' too "
-                    "high?",
-                    self._client,
-                    self._slave,
-                    self._poll_rate,
-                )
-                return
-
-            # List of (start address, [read values starting at that address])
-            read_values: list[tuple[int, list[int]]] = []
-            exception: Exception | None = None
-            try:
-                read_ranges = self._create_read_ranges(
-                    self._max_read, is_initial_connection=self._connection_state != ConnectionState.CONNECTED
-                )
-                for start_address, num_reads in read_ranges:
-                    _LOGGER.debug(
-                        "Reading addresses on %s %s: (%s, %s)",
-                        self._client,
-                        self._slave,
-                        start_address,
-                        num_reads,
-                    )
-                    reads = await self._client.read_registers(
-                        start_address,
-                        num_reads,
-                        self._connection_type_profile.register_type,
-                        self._slave,
+    async def refresh(self) -> None:
+        """Refresh modbus data. Called by the BusScheduler, which makes sure that polls don't overlap"""
+        if self._read_tuner is not None and not self._read_tuner.poll_due():
+            return
+
+        if self._register_map is not None and not self._register_map.loaded:
+            await self._register_map.async_load()
+            self._read_ranges_cache.clear()
+
+        exception: Exception | None = None
+        # Whether we managed to store any values, even if some ranges failed
+        partial_success = False
+        # Whether all of the values which remote control works from were stored
+        remote_control_values_stored = False
+        poll_started_at = time.monotonic()
+        min_poll_type = self._min_poll_type_due()
+        try:
+            max_read = self._read_tuner.max_read if self._read_tuner is not None else self._max_read
+            read_ranges = self._get_read_ranges(max_read, min_poll_type)
+            _LOGGER.debug(
+                "Reading addresses on %s %s: %s",
+                self._client,
+                self._slave,
+                read_ranges,
+            )
+            range_results = await self._read_ranges_with_retries(read_ranges)
+
+            # Store the ranges which were read. If a range failed, we don't store any values from other ranges
+            # which belong with values in that range (see _consistency_group_addresses), so that entities never see
+            # a mix of old and new values
+            # Only addresses whose values have changed are reported, so that entities don't do unnecessary work
+            failed_ranges = [
+                read_range
+                for read_range, (result, _read_at) in zip(read_ranges, range_results, strict=True)
+                if isinstance(result, ModbusClientFailedError)
+            ]
+            held_back_addresses = self._consistency_group_addresses(failed_ranges)
+            # Remote control is a listener of its own addresses, so they're held back if any of them failed
+            remote_control_values_stored = self._remote_control_manager is not None and held_back_addresses.isdisjoint(
+                self._remote_control_manager.addresses
+            )
+            changed_addresses: set[int] = set()
+            for (start_address, _num_reads), (result, read_at) in zip(read_ranges, range_results, strict=True):
+                if not isinstance(result, ModbusClientFailedError):
+                    partial_success = True
+                    changed_addresses.update(
+                        self._store_read_values(start_address, result, read_at, held_back_addresses)
                     )
-                    read_values.append((start_address, reads))
-
-                # If we made it to here, then all reads succeeded. Write them to _data and notify the sensors.
-                # This avoids recording reads if poll failed partway through (ensuring that we don't record potentially
-                # inconsistent data)
-                changed_addresses = set()
-                for start_address, reads in read_values:
-                    for i, value in enumerate(reads):
-                        address = start_address + i
-                        # We might be reading a register we don't care about (for efficiency). Discard it if so
-                        register_value = self._data.get(address)
-                        if register_value is not None:
-                            register_value.read_value = value
-                            changed_addresses.add(address)
 
+            if failed_ranges:
                 _LOGGER.debug(
-                    "Refresh of %s %s complete - notifying sensors: %s",
+                    "%s %s: %s of %s ranges failed, holding back %s addresses. Notifying sensors: %s",
                     self._client,
                     self._slave,
+                    len(failed_ranges),
+                    len(read_ranges),
+                    len(held_back_addresses),
                     changed_addresses,
                 )
                 self._notify_update(changed_addresses)
-            except ConnectionException as ex:
-                exception = ex
-                _LOGGER.debug(
-                    "Failed to connect to %s %s: %s",
-                    self._client,
-                    self._slave,
-                    ex,
+                # The first error is as good as any
+                first_error = next(
+                    result for result, _read_at in range_results if isinstance(result, ModbusClientFailedError)
                 )
-            except ModbusClientFailedError as ex:
-                exception = ex
-                _LOGGER.debug(
-                    "Modbus error when polling %s %s: %s",
+                raise first_error
+
+            if self._read_all_tiers_until is not None and poll_started_at > self._read_all_tiers_until:
+                # read() has stopped returning written values, and the value we've read back might not be what we
+                # wrote (even if it hasn't changed since the last poll)
+                changed_addresses.update(self._written_addresses)
+                self._written_addresses.clear()
+                self._read_all_tiers_until = None
+
+            poll_duration = time.monotonic() - poll_started_at
+            if self._read_tuner is not None:
+                # Polls which read the same tiers are comparable. Most polls only read the most frequent tier
+                self._read_tuner.record_success(
+                    poll_duration if min_poll_type == RegisterPollType.PERIODICALLY else None
+                )
+            if self._poll_metrics is not None:
+                self._poll_metrics.record_poll(
+                    poll_duration,
+                    registers_read=sum(num_reads for _start_address, num_reads in read_ranges),
+                    registers_used=len(self._registers.addresses(min_poll_type)),
+                )
+
+            _LOGGER.debug(
+                "Refresh of %s %s complete - notifying sensors: %s",
+                self._client,
+                self._slave,
+                changed_addresses,
+            )
+            self._notify_update(changed_addresses)
+        except ConnectionException as ex:
+            exception = ex
+            _LOGGER.debug(
+                "Failed to connect to %s %s: %s",
+                self._client,
+                self._slave,
+                ex,
+            )
+        except ModbusClientFailedError as ex:
+            exception = ex
+            _LOGGER.debug(
+                "Modbus error when polling %s %s: %s",
+                self._client,
+                self._slave,
+                ex.response,
+            )
+        except Exception as ex:
+            exception = ex
+            _LOGGER.warning(
+                "General exception when polling %s %s: %s",
+                self._client,
+                self._slave,
+                repr(ex),
+                exc_info=True,
+            )
+
+        if exception is not None and self._poll_metrics is not None:
+            self._poll_metrics.record_error(exception)
+        if exception is not None and self._read_tuner is not None:
+            # If we can't connect at all, or the inverter rejected a read, reading less at a time won't help
+            self._read_tuner.record_failure(
+                size_related=isinstance(exception, ModbusClientFailedError) and exception.is_size_related
+            )
+
+        # Do this after recording new values in the store. That way the sensors show the new values when they
+        # become available after a disconnection
+        if exception is None:
+            # If a poll fails, we'll try the same tiers again next time
+            self._poll_count += 1
+        # If we read anything, the inverter's clearly still there
+        if exception is None or partial_success:
+            self._num_failed_poll_attempts = 0
+            if self._connection_state == ConnectionState.INITIAL:
+                self._connection_state = ConnectionState.CONNECTED
+            elif self._connection_state == ConnectionState.DISCONNECTED:
+                _LOGGER.info(
+                    "%s %s - poll succeeded: now connected",
                     self._client,
                     self._slave,
-                    ex.response,
                 )
-            except Exception as ex:
-                exception = ex
+                self._connection_state = ConnectionState.CONNECTED
+                self._current_connection_error = None
+                self._log_message("Connection restored")
+                issue_registry.async_delete_issue(
+                    self._hass,
+                    domain=DOMAIN,
+                    issue_id=f"connection_error_{self.inverter_details[ENTITY_ID_PREFIX]}",
+                )
+                await self._notify_is_connected_changed(is_connected=True)
+        elif self._connection_state != ConnectionState.DISCONNECTED:
+            self._num_failed_poll_attempts += 1
+            if self._num_failed_poll_attempts >= _NUM_FAILED_POLLS_FOR_DISCONNECTION:
                 _LOGGER.warning(
-                    "General exception when polling %s %s: %s",
+                    "%s %s - %s failed poll attempts: now not connected. Last error: %s",
                     self._client,
                     self._slave,
-                    repr(ex),
-                    exc_info=True,
+                    self._num_failed_poll_attempts,
+                    exception,
+                )
+                self._connection_state = ConnectionState.DISCONNECTED
+                self._current_connection_error = str(exception)
+                self._log_message(f"Connection error: {exception}")
+                issue_registry.async_create_issue(
+                    self._hass,
+                    domain=DOMAIN,
+                    issue_id=f"connection_error_{self.inverter_details[ENTITY_ID_PREFIX]}",
+                    is_fixable=False,
+                    is_persistent=False,
+                    severity=IssueSeverity.ERROR,
+                    translation_key="connection_error",
+                    translation_placeholders={
+                        "friendly_name": self.inverter_details[FRIENDLY_NAME],
+                        "error": str(exception),
+                    },
                 )
+                await self._notify_is_connected_changed(is_connected=False)
 
-            # Do this after recording new values in _data. That way the sensors show the new values when they
-            # become available after a disconnection
-            if exception is None:
-                self._num_failed_poll_attempts = 0
-                if self._connection_state == ConnectionState.INITIAL:
-                    self._connection_state = ConnectionState.CONNECTED
-                elif self._connection_state == ConnectionState.DISCONNECTED:
-                    _LOGGER.info(
-                        "%s %s - poll succeeded: now connected",
-                        self._client,
-                        self._slave,
-                    )
-                    self._connection_state = ConnectionState.CONNECTED
-                    self._current_connection_error = None
-                    self._log_message("Connection restored")
-                    issue_registry.async_delete_issue(
-                        self._hass,
-                        domain=DOMAIN,
-                        issue_id=f"connection_error_{self.inverter_details[ENTITY_ID_PREFIX]}",
-                    )
-                    await self._notify_is_connected_changed(is_connected=True)
-            elif self._connection_state != ConnectionState.DISCONNECTED:
-                self._num_failed_poll_attempts += 1
-                if self._num_failed_poll_attempts >= _NUM_FAILED_POLLS_FOR_DISCONNECTION:
-                    _LOGGER.warning(
-                        "%s %s - %s failed poll attempts: now not connected. Last error: %s",
-                        self._client,
-                        self._slave,
-                        self._num_failed_poll_attempts,
-                        exception,
-                    )
-                    self._connection_state = ConnectionState.DISCONNECTED
-                    self._current_connection_error = str(exception)
-                    self._log_message(f"Connection error: {exception}")
-                    issue_registry.async_create_issue(
-                        self._hass,
-                        domain=DOMAIN,
-                        issue_id=f"connection_error_{self.inverter_details[ENTITY_ID_PREFIX]}",
-                        is_fixable=False,
-                        is_persistent=False,
-                        severity=IssueSeverity.ERROR,
-                        translation_key="connection_error",
-                        translation_placeholders={
-                            "friendly_name": self.inverter_details[FRIENDLY_NAME],
-                            "error": str(exception),
-                        },
-                    )
-                    await self._notify_is_connected_changed(is_connected=False)
+        self._update_stale_listeners()
 
-        if self._remote_control_manager is not None:
+        if exception is None and self._register_map is not None:
+            await self._probe_register_map(max_read)
+
+        # Remote control decides what to write from what we've just read, so only let it run on fresh data. That's
+        # still the case if other ranges failed
+        if remote_control_values_stored and self._remote_control_manager is not None:
             await self._remote_control_manager.poll_complete_callback()
 
+    async def _probe_register_map(self, max_read: int) -> None:
+        """Probes (at most) one span of individual-read registers, to see whether they can be read together"""
+        assert self._register_map is not None
+
+        # Let things settle after a write
+        if self._read_all_tiers_until is not None:
+            return
+
+        profile = self._connection_type_profile
+        span = self._register_map.next_probe(
+            self._get_read_ranges(max_read, RegisterPollType.ON_CONNECTION),
+            max_read,
+            profile.is_individual_read,
+            profile.overlaps_invalid_range,
+        )
+        if span is None:
+            return
+
+        start_address, end_address = span
+        try:
+            values = await self._client.read_registers(
+                start_address,
+                end_address - start_address + 1,
+                profile.register_type,
+                self._slave,
+                priority=RequestPriority.DIAGNOSTIC,
+            )
+        except ModbusClientFailedError as ex:
+            if isinstance(ex.response, ExceptionResponse) and ex.response.exception_code in (
+                ModbusExceptions.IllegalAddress,
+                ModbusExceptions.IllegalValue,
+            ):
+                self._register_map.record_unreadable(start_address, end_address)
+            else:
+                _LOGGER.debug("Probe of %s-%s failed: %s", start_address, end_address, ex)
+                self._register_map.record_inconclusive(start_address, end_address)
+            return
+        except Exception as ex:
+            _LOGGER.debug("Probe of %s-%s failed: %s", start_address, end_address, ex)
+            self._register_map.record_inconclusive(start_address, end_address)
+            return
+
+        # Some adapters return garbage rather than an error. Make sure that the values match what we read individually
+        # (those registers which change by themselves will mean we need a few attempts)
+        now = time.monotonic()
+        for address in range(start_address, end_address + 1):
+            if address in self._registers and self._registers.value(address, now) != values[address - start_address]:
+                _LOGGER.debug("Probe of %s-%s returned a different value for %s", start_address, end_address, address)
+                self._register_map.record_inconclusive(start_address, end_address)
+                return
+
+        self._register_map.record_readable(start_address, end_address)
+        self._read_ranges_cache.clear()
+
     def _log_message(self, message: str) -> None:
         friendly_name = self.inverter_details[FRIENDLY_NAME]
         if friendly_name:
@@ -380,95 +682,229 @@ class ModbusController(EntityController, UnloadController):
             name = "FoxESS - Modbus"
         async_log_entry(self._hass, name=name, message=message, domain=DOMAIN)
 
-    def _create_read_ranges(self, max_read: int, is_initial_connection: bool) -> Iterable[tuple[int, int]]:
+    async def _read_ranges_with_retries(
+        self, read_ranges: list[tuple[int, int]]
+    ) -> list[tuple[Sequence[int] | ModbusClientFailedError, float]]:
         """
-        Generates a set of read ranges to cover the addresses of all registers on this inverter,
-        respecting the maxumum number of registers to read at a time
+        Reads the given ranges, retrying any which the inverter rejected a few times, with a short backoff in between.
+        Timeouts and connection errors aren't retried: they're raised straight away, and abort the poll.
 
-        :returns: Sequence of tuples of (start_address, num_registers_to_read)
+        :returns: For each range, either the values read or the error it failed with, and when it was read
         """
+        register_type = self._connection_type_profile.register_type
+        range_results = await self._client.read_register_ranges(
+            read_ranges, register_type, self._slave, self._poll_metrics, self._poll_priority()
+        )
 
-        # The idea here is that read operations are expensive (there seems to be a large round-trip time at least
-        # with the W610), but reading additional unneeded registers is relatively cheap (probably < 1ms).
+        # If everything failed, the problem probably isn't with individual ranges
+        failed = [
+            i for i, (result, _read_at) in enumerate(range_results) if isinstance(result, ModbusClientFailedError)
+        ]
+        if len(failed) == len(read_ranges):
+            return range_results
+
+        delay_secs = _RANGE_RETRY_DELAY_SECS
+        for _attempt in range(_MAX_RANGE_RETRIES):
+            if not failed:
+                break
+            await asyncio.sleep(delay_secs)
+            delay_secs *= 2
+            _LOGGER.debug("%s %s: retrying ranges %s", self._client, self._slave, [read_ranges[i] for i in failed])
+            retried = await self._client.read_register_ranges(
+                [read_ranges[i] for i in failed], register_type, self._slave, self._poll_metrics, self._poll_priority()
+            )
+            for i, range_result in zip(failed, retried, strict=True):
+                range_results[i] = range_result
+            failed = [i for i in failed if isinstance(range_results[i][0], ModbusClientFailedError)]
 
-        # To give some intuition, here are some examples of the groupings we want to achieve, assuming max_read = 5
-        # 1,2 / 4,5 -> 1,2,3,4,5 (i.e. to read the registers 1, 2, 4 and 5, we'll do a single read spanning 1-5)
-        # 1,2 / 5,6,7,8 -> 1,2 / 5,6,7,8
-        # 1,2 / 5,6,7,8,9 -> 1,2 / 5,6,7,8,9
-        # 1,2 / 5,6,7,8,9,10 -> 1,2,3,4,5 / 6,7,8,9,10
-        # 1,2,3 / 5,6,7 / 9,10 -> 1,2,3,4,5 / 6,7,8,9,10
+        return range_results
 
-        # The problem as a whole looks like it's NP-hard (although I can't find a name for it).
-        # We're therefore going to use a fairly simple algorithm which just makes each read as large as it can be.
+    def _consistency_group_addresses(self, failed_ranges: list[tuple[int, int]]) -> set[int]:
+        """
+        Finds all addresses which belong with addresses in the given failed ranges, and so mustn't be stored.
 
-        start_address: int | None = None
-        read_size = 0
-        # TODO: Do we want to cache the result of this?
-        for address, register_value in sorted(self._data.items()):
-            if register_value.poll_type == RegisterPollType.ON_CONNECTION and not is_initial_connection:
-                continue
+        Each entity's addresses form a consistency group, which is stored all together or not at all. For example, the
+        registers which make up a 32-bit value, or the power flows which remote control works from.
+        """
+        held_back: set[int] = set()
+        for start_address, num_registers in failed_ranges:
+            for address in range(start_address, start_address + num_registers):
+                for listener in self._listeners_by_address.get(address, ()):
+                    held_back.update(listener.addresses)
+        return held_back
+
+    def _store_read_values(
+        self, start_address: int, values: Sequence[int], read_at: float, held_back_addresses: set[int]
+    ) -> list[int]:
+        """Stores the values read from start_address onwards, apart from any in held_back_addresses"""
+        if not held_back_addresses:
+            return self._registers.set_read_values(start_address, values, read_at)
+
+        changed_addresses: list[int] = []
+        run_start: int | None = None
+        for i in range(len(values) + 1):
+            if i < len(values) and start_address + i not in held_back_addresses:
+                if run_start is None:
+                    run_start = i
+            elif run_start is not None:
+                changed_addresses.extend(
+                    self._registers.set_read_values(start_address + run_start, values[run_start:i], read_at)
+                )
+                run_start = None
+        return changed_addresses
+
+    def _min_poll_type_due(self) -> RegisterPollType:
+        """Works out which poll tiers need reading on this poll: all tiers at or above the returned poll type"""
+        if self._connection_state != ConnectionState.CONNECTED:
+            return RegisterPollType.ON_CONNECTION
+        if self._read_all_tiers_until is not None or self._poll_count % self._slow_poll_every == 0:
+            return RegisterPollType.SLOW
+        if self._poll_count % self._medium_poll_every == 0:
+            return RegisterPollType.MEDIUM
+        return RegisterPollType.PERIODICALLY
+
+    def _poll_priority(self) -> RequestPriority:
+        """While remote control is active, it needs each poll's results to decide what to write next"""
+        if self._remote_control_manager is not None and self._remote_control_manager.mode != RemoteControlMode.DISABLE:
+            return RequestPriority.CONTROL_READ
+        return RequestPriority.POLL
+
+    def _get_read_ranges(self, max_read: int, min_poll_type: RegisterPollType) -> list[tuple[int, int]]:
+        """
+        Fetches the read ranges which cover the addresses of all registers on this inverter with a poll type of at
+        least min_poll_type, calculating them if necessary. These only change when entities are added or removed, so
+        they're cached.
 
-            # This register must be read in a single individual read. Yield any ranges we've found so far,
-            # and yield just this register on its own
-            if self._connection_type_profile.is_individual_read(address):
-                if start_address is not None:
-                    yield (start_address, read_size)
-                    start_address, read_size = None, 0
-                yield (address, 1)
-            elif start_address is None:
-                start_address, read_size = address, 1
-            # If we're just increasing the previous read size by 1, then don't test whether we're extending
-            # the read over an invalid range (as we assume that registers we're reading to read won't be
-            # inside invalid ranges, tested in __init__). This also assumes that read_size != max_read here.
-            elif address == start_address + 1 or (
-                address <= start_address + max_read - 1
-                and not self._connection_type_profile.overlaps_invalid_range(start_address, address - 1)
-            ):
-                # There's a previous read which we can extend
-                read_size = address - start_address + 1
-            else:
-                # There's a previous read, and we can't extend it to cover this address
-                yield (start_address, read_size)
-                start_address, read_size = address, 1
+        :returns: List of tuples of (start_address, num_registers_to_read)
+        """
+        key = (max_read, min_poll_type)
+        read_ranges = self._read_ranges_cache.get(key)
+        if read_ranges is None:
+            read_ranges = self._create_read_ranges(max_read, min_poll_type)
+            self._read_ranges_cache[key] = read_ranges
+        return read_ranges
+
+    def _create_read_ranges(self, max_read: int, min_poll_type: RegisterPollType) -> list[tuple[int, int]]:
+        """
+        Generates a set of read ranges to cover the addresses of all registers on this inverter with a poll type of at
+        least min_poll_type, respecting the maxumum number of registers to read at a time
 
-            if read_size == max_read:
-                # (can't get here if start_address is None, as read_size would be 0
-                yield (start_address, read_size)  # type: ignore
-                start_address, read_size = None, 0
+        :returns: List of tuples of (start_address, num_registers_to_read)
+        """
 
-        if start_address is not None:
-            yield (start_address, read_size)
+        return plan_read_ranges(
+            self._registers.addresses(min_poll_type),
+            max_read,
+            self._read_cost,
+            is_individual_read=self._connection_type_profile.is_individual_read,
+            overlaps_invalid_range=self._connection_type_profile.overlaps_invalid_range,
+            can_read_together=self._register_map.can_read_together if self._register_map is not None else None,
+        )
 
     def register_modbus_entity(self, listener: ModbusControllerEntity) -> None:
         self._update_listeners.add(listener)
+        if listener.notify_on_every_update:
+            self._every_update_listeners.add(listener)
+        if listener.heartbeat_interval is not None:
+            self._heartbeat_listeners[listener] = time.monotonic()
         for address in listener.addresses:
+            self._listeners_by_address.setdefault(address, set()).add(listener)
             assert not self._connection_type_profile.overlaps_invalid_range(address, address), (
                 f"Entity {listener} address {address} overlaps an invalid range in "
                 f"{self._connection_type_profile.special_registers.invalid_register_ranges}"
             )
-            if address not in self._data:
-                self._data[address] = RegisterValue(poll_type=listener.register_poll_type)
-            else:
-                # We could handle this (removing gets harder), but it shouldn't happen in practice anyway
-                assert self._data[address].poll_type == listener.register_poll_type
+            poll_type = self._registers.poll_type(address)
+            if poll_type is None:
+                self._registers.add(address, listener.register_poll_type)
+                self._read_ranges_cache.clear()
+            elif listener.register_poll_type > poll_type:
+                # If several entities are interested in an address, poll it as often as the most demanding one wants
+                self._registers.set_poll_type(address, listener.register_poll_type)
+                self._read_ranges_cache.clear()
+
+        value_source = listener.value_source
+        if value_source is not None:
+            self._notify_derived_values_changed(self._derived_values.add_source(value_source, listener.addresses))
+        derivation = listener.derivation
+        if derivation is not None:
+            self._derived_value_listeners[derivation.key] = listener
+            self._notify_derived_values_changed(self._derived_values.add_derived(derivation))
 
     def remove_modbus_entity(self, listener: ModbusControllerEntity) -> None:
         self._update_listeners.discard(listener)
-        # If this was the only entity listening on this address, remove it from self._data
-        other_addresses = {address for entity in self._update_listeners for address in entity.addresses}
+        self._every_update_listeners.discard(listener)
+        self._heartbeat_listeners.pop(listener, None)
+        self._stale_listeners.discard(listener)
+        value_source = listener.value_source
+        if value_source is not None:
+            self._notify_derived_values_changed(self._derived_values.remove_source(value_source.key))
+        derivation = listener.derivation
+        if derivation is not None:
+            del self._derived_value_listeners[derivation.key]
+            self._notify_derived_values_changed(self._derived_values.remove_derived(derivation.key))
+        # If this was the only entity listening on this address, remove it from the store. Otherwise, the remaining
+        # entities might want it polled less often
         for address in listener.addresses:
-            if address not in other_addresses and address in self._data:
-                del self._data[address]
+            other_listeners = self._listeners_by_address.get(address)
+            if other_listeners is not None:
+                other_listeners.discard(listener)
+                if not other_listeners:
+                    del self._listeners_by_address[address]
+
+            poll_type = self._registers.poll_type(address)
+            if poll_type is None:
+                continue
+            if not other_listeners:
+                self._registers.remove(address)
+                self._read_ranges_cache.clear()
+                continue
+            other_poll_type = max(other_listener.register_poll_type for other_listener in other_listeners)
+            if other_poll_type != poll_type:
+                self._registers.set_poll_type(address, other_poll_type)
+                self._read_ranges_cache.clear()
 
     def _notify_update(self, changed_addresses: set[int]) -> None:
-        """Notify listeners"""
-        for listener in self._update_listeners:
+        """Notify the listeners which are interested in any of the changed addresses, and any due heartbeats"""
+        with self._batch_state_writes():
+            self._notify_update_listeners(changed_addresses)
+
+    def _notify_update_listeners(self, changed_addresses: set[int]) -> None:
+        listeners = set(self._every_update_listeners)
+        for address in changed_addresses:
+            address_listeners = self._listeners_by_address.get(address)
+            if address_listeners is not None:
+                listeners.update(address_listeners)
+        # Work out derived values now, so that they're written along with the values they're derived from
+        for key in self._derived_values.update(changed_addresses):
+            listeners.add(self._derived_value_listeners[key])
+        for listener in listeners:
             listener.update_callback(changed_addresses)
 
+        if self._heartbeat_listeners:
+            now = time.monotonic()
+            for listener, last_notified in self._heartbeat_listeners.items():
+                if listener in listeners:
+                    self._heartbeat_listeners[listener] = now
+                    continue
+                heartbeat_interval = listener.heartbeat_interval
+                assert heartbeat_interval is not None
+                if now - last_notified >= heartbeat_interval.total_seconds():
+                    self._heartbeat_listeners[listener] = now
+                    listener.update_callback(changed_addresses | set(listener.addresses))
+
+    def _notify_derived_values_changed(self, keys: set[str]) -> None:
+        """Notify the listeners of the given derived values that their values have changed"""
+        if not keys:
+            return
+        with self._batch_state_writes():
+            for key in keys:
+                self._derived_value_listeners[key].update_callback(set())
+
     async def _notify_is_connected_changed(self, is_connected: bool) -> None:
         """Notify listeners that the availability states of the inverter changed"""
-        for listener in self._update_listeners:
-            listener.is_connected_changed_callback()
+        with self._batch_state_writes():
+            for listener in self._update_listeners:
+                listener.is_connected_changed_callback()
 
         if is_connected and self._remote_control_manager is not None:
             await self._remote_control_manager.became_connected_callback()
@@ -0,0 +1,158 @@
+"""Optional instrumentation of a ModbusController's polling, to help with tuning poll_rate and max_read"""
+
+from collections import Counter
+from typing import Any
+
+from pymodbus.pdu import ModbusRequest
+from pymodbus.register_read_message import ReadRegistersRequestBase
+
+# Upper bounds of the poll duration histogram buckets. Anything slower goes in a final overflow bucket
+_POLL_DURATION_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class _TimingStats:
+    """Running count, mean and max of a set of timings"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_secs = 0.0
+        self.max_secs = 0.0
+
+    def record(self, secs: float) -> None:
+        self.count += 1
+        self.total_secs += secs
+        self.max_secs = max(self.max_secs, secs)
+
+    @property
+    def mean_ms(self) -> float | None:
+        return round(self.total_secs * 1000 / self.count, 1) if self.count > 0 else None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"count": self.count, "mean_ms": self.mean_ms, "max_ms": round(self.max_secs * 1000, 1)}
+
+
+class PollMetrics:
+    """
+    Collects metrics about a ModbusController's polls.
+
+    The controller (and the ModbusClient it uses) only create and feed this if the user has turned metrics on, so this
+    costs nothing otherwise.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.last_poll_duration_secs: float | None = None
+        self._poll_durations = _TimingStats()
+        self._poll_duration_buckets = [0] * (len(_POLL_DURATION_BUCKETS_MS) + 1)
+        # (start_address, num_registers) -> round-trip times of reads of that range
+        self._read_latencies: dict[tuple[int, int], _TimingStats] = {}
+        self._all_read_latencies = _TimingStats()
+        self._wait_times = _TimingStats()
+        self.registers_read = 0
+        self.registers_used = 0
+        self.skipped_polls = 0
+        # How late polls started, compared to when they were due
+        self._lateness = _TimingStats()
+        self.errors: Counter[str] = Counter()
+        # Fractions of the bus's time used by this inverter, and by all inverters on the bus, set by the BusScheduler
+        self.bus_usage: float | None = None
+        self.total_bus_usage: float | None = None
+
+    def record_poll(self, duration_secs: float, registers_read: int, registers_used: int) -> None:
+        """Records a successful poll, which read registers_read registers to get registers_used useful ones"""
+        self.last_poll_duration_secs = duration_secs
+        self._poll_durations.record(duration_secs)
+        duration_ms = duration_secs * 1000
+        bucket = next(
+            (i for i, limit in enumerate(_POLL_DURATION_BUCKETS_MS) if duration_ms <= limit),
+            len(_POLL_DURATION_BUCKETS_MS),
+        )
+        self._poll_duration_buckets[bucket] += 1
+        self.registers_read += registers_read
+        self.registers_used += registers_used
+
+    def record_round_trip(self, requests: list[ModbusRequest], secs: float) -> None:
+        """
+        Records the time between sending some read requests and receiving all of their responses. If several were sent
+        at once, each is recorded as taking the whole time.
+        """
+        for request in requests:
+            assert isinstance(request, ReadRegistersRequestBase)
+            key = (request.address, request.count)
+            stats = self._read_latencies.get(key)
+            if stats is None:
+                stats = self._read_latencies[key] = _TimingStats()
+            stats.record(secs)
+            self._all_read_latencies.record(secs)
+
+    def record_wait(self, secs: float) -> None:
+        """Records how long requests waited for the bus (and for the executor, for serial connections)"""
+        self._wait_times.record(secs)
+
+    def record_skipped_poll(self, count: int = 1) -> None:
+        self.skipped_polls += count
+
+    def record_lateness(self, secs: float) -> None:
+        self._lateness.record(secs)
+
+    def record_error(self, ex: Exception) -> None:
+        # ModbusClientFailedError wraps the interesting bit
+        response = getattr(ex, "response", None)
+        name = type(ex).__name__ if response is None else f"{type(ex).__name__}: {type(response).__name__}"
+        self.errors[name] += 1
+
+    def record_bus_usage(self, usage: float, total_usage: float) -> None:
+        self.bus_usage = usage
+        self.total_bus_usage = total_usage
+
+    @property
+    def mean_read_latency_ms(self) -> float | None:
+        return self._all_read_latencies.mean_ms
+
+    @property
+    def mean_wait_ms(self) -> float | None:
+        return self._wait_times.mean_ms
+
+    @property
+    def read_efficiency(self) -> float | None:
+        """The percentage of registers read which were actually used"""
+        return round(self.registers_used * 100 / self.registers_read, 1) if self.registers_read > 0 else None
+
+    @property
+    def error_count(self) -> int:
+        return self.errors.total()
+
+    def poll_duration_histogram(self) -> dict[str, int]:
+        labels = [f"<={limit}ms" for limit in _POLL_DURATION_BUCKETS_MS] + [f">{_POLL_DURATION_BUCKETS_MS[-1]}ms"]
+        return dict(zip(labels, self._poll_duration_buckets, strict=True))
+
+    def read_latencies(self) -> dict[str, dict[str, Any]]:
+        return {
+            f"{start_address}+{num_registers}": stats.as_dict()
+            for (start_address, num_registers), stats in sorted(self._read_latencies.items())
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "polls": {
+                **self._poll_durations.as_dict(),
+                "last_ms": (
+                    round(self.last_poll_duration_secs * 1000, 1) if self.last_poll_duration_secs is not None else None
+                ),
+                "histogram": self.poll_duration_histogram(),
+            },
+            "skipped_polls": self.skipped_polls,
+            "lateness": self._lateness.as_dict(),
+            "reads": {**self._all_read_latencies.as_dict(), "ranges": self.read_latencies()},
+            "wait": self._wait_times.as_dict(),
+            "registers_read": self.registers_read,
+            "registers_used": self.registers_used,
+            "read_efficiency_percent": self.read_efficiency,
+            "errors": dict(self.errors),
+            "bus_usage_percent": round(self.bus_usage * 100, 1) if self.bus_usage is not None else None,
+            "total_bus_usage_percent": (
+                round(self.total_bus_usage * 100, 1) if self.total_bus_usage is not None else None
+            ),
+        }
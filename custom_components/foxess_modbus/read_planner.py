@@ -0,0 +1,100 @@
+"""Works out which reads to make in order to cover a set of register addresses"""
+
+import math
+from dataclasses import dataclass
+from typing import Callable
+from typing import Sequence
+
+
+@dataclass(frozen=True)
+class ReadCost:
+    """
+    Rough model of how expensive it is to read registers over a particular adapter.
+
+    Read operations are expensive (there's a large round-trip time, at least with the W610), but reading additional
+    unneeded registers is relatively cheap. The units don't matter, so long as they're the same (we use milliseconds).
+    """
+
+    round_trip: float
+    per_register: float
+
+    def cost(self, num_reads: int, num_registers: int) -> float:
+        return num_reads * self.round_trip + num_registers * self.per_register
+
+
+def plan_read_ranges(
+    addresses: Sequence[int],
+    max_read: int,
+    read_cost: ReadCost,
+    *,
+    is_individual_read: Callable[[int], bool],
+    overlaps_invalid_range: Callable[[int, int], bool],
+    can_read_together: Callable[[int, int], bool] | None = None,
+) -> list[tuple[int, int]]:
+    """
+    Generates the cheapest set of read ranges which covers the given addresses, respecting the maximum number of
+    registers to read at a time, the addresses which have to be read on their own, and the invalid address ranges which
+    mustn't be read at all.
+
+    To give some intuition, here are some examples of the groupings we want to achieve, assuming max_read = 5 and
+    unneeded registers are cheap to read:
+    1,2 / 4,5 -> 1,2,3,4,5 (i.e. to read the registers 1, 2, 4 and 5, we'll do a single read spanning 1-5)
+    1,2 / 5,6,7,8 -> 1,2 / 5,6,7,8
+    1,2 / 5,6,7,8,9 -> 1,2 / 5,6,7,8,9
+    1,2 / 5,6,7,8,9,10 -> 1,2,3,4,5 / 6,7,8,9,10
+    1,2,3 / 5,6,7 / 9,10 -> 1,2,3,4,5 / 6,7,8,9,10
+
+    This is interval covering along a line, so it can be solved exactly with dynamic programming. We only need to
+    consider reads which start and end on an address we're interested in. best[j] is the cheapest way of covering the
+    first j addresses, and is found by trying each possible final read which ends on address j - 1. A read can't be
+    wider than max_read, so there are at most max_read of these.
+
+    :param addresses: Sorted addresses to read
+    :param can_read_together: If given, individual-read addresses can still be read in a single read which starts and
+        ends at the given addresses, if this returns True. This must also return True for any smaller read within it.
+    :returns: List of tuples of (start_address, num_registers_to_read), in address order
+    """
+
+    num_addresses = len(addresses)
+    individual = [is_individual_read(address) for address in addresses]
+
+    # (cost, number of reads) of the cheapest plan covering addresses[:j]. Ties are broken on the number of reads.
+    best: list[tuple[float, int]] = [(0.0, 0)] + [(math.inf, 0)] * num_addresses
+    # The cheapest plan covering addresses[:j] ends with a read covering addresses[start_index[j]:j]
+    start_index = [0] * (num_addresses + 1)
+
+    for j in range(1, num_addresses + 1):
+        end_address = addresses[j - 1]
+        for i in range(j - 1, -1, -1):
+            start_address = addresses[i]
+            read_size = end_address - start_address + 1
+            if read_size > max_read:
+                break
+            # Making the read any larger can only include more individual-read addresses or more of an invalid range,
+            # so we can stop as soon as we hit one.
+            # We assume that the addresses we're asked to read aren't themselves in an invalid range (this is tested
+            # when they're registered), so a single-register read is always fine.
+            if i < j - 1 and (
+                overlaps_invalid_range(start_address, end_address)
+                or (
+                    (individual[i] or individual[j - 1])
+                    and (can_read_together is None or not can_read_together(start_address, end_address))
+                )
+            ):
+                break
+
+            prev_cost, prev_num_reads = best[i]
+            candidate = (prev_cost + read_cost.cost(1, read_size), prev_num_reads + 1)
+            if candidate < best[j]:
+                best[j] = candidate
+                start_index[j] = i
+
+    read_ranges: list[tuple[int, int]] = []
+    j = num_addresses
+    while j > 0:
+        i = start_index[j]
+        read_ranges.append((addresses[i], addresses[j - 1] - addresses[i] + 1))
+        j = i
+    read_ranges.reverse()
+
+    return read_ranges
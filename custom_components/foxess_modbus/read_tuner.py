@@ -0,0 +1,145 @@
+"""Tunes max_read and the poll rate from how polls are going"""
+
+import logging
+import math
+
+_LOGGER = logging.getLogger(__name__)
+
+# The most registers which can be read in a single Modbus request
+_MAX_READ_LIMIT = 125
+# How many successful polls at a size before trying a larger one
+_POLLS_BEFORE_PROBE = 20
+# How many comparable polls to measure at a larger size before deciding whether to keep it
+_TRIAL_POLLS = 5
+# A larger size is kept if polls are no more than this much slower than they were before
+_SLOWDOWN_TOLERANCE = 1.05
+# How many failed polls in a row before backing off
+_FAILURES_BEFORE_BACK_OFF = 3
+# We won't stretch the poll interval by more than this
+_MAX_POLL_EVERY = 8
+
+
+class ReadTuner:
+    """
+    Tunes max_read, and backs off the poll rate, based on the results of polls.
+
+    We start from the configured max_read, which we assume is safe. Once polls have been reliable for a while, we try a
+    larger max_read. If polls at the larger size all succeed and aren't slower, we keep it. If any fails, or they're
+    slower, we go back and don't try that size again.
+
+    If polls start failing at a size which was fine before, we halve max_read (but not below the configured value). If
+    they keep failing at the configured value, or we can't connect at all, we poll less often until things recover.
+    """
+
+    def __init__(self, max_read: int, name: str) -> None:
+        self._name = name
+        self._min_max_read = max_read
+        # The largest size which has been shown to work
+        self._good_max_read = max_read
+        # The smallest size which has been shown not to be worth it
+        self._max_read_ceiling = _MAX_READ_LIMIT + 1
+        self.max_read = max_read
+        # Mean duration of comparable polls at _good_max_read, if we've measured it
+        self._baseline_secs: float | None = None
+        self._durations: list[float] = []
+        self._successes = 0
+        self._failures = 0
+        # We poll on one timer tick in every _poll_every
+        self._poll_every = 1
+        self._ticks = 0
+
+    @property
+    def poll_every(self) -> int:
+        """How many multiples of the configured poll rate we're currently polling at"""
+        return self._poll_every
+
+    def poll_due(self) -> bool:
+        """Called on each tick of the poll timer, to find out whether we should poll this time"""
+        self._ticks += 1
+        return self._ticks % self._poll_every == 0
+
+    def record_success(self, duration_secs: float | None) -> None:
+        """
+        Records a successful poll. duration_secs is how long it took, if it's comparable to other polls which are
+        passed here (i.e. it read the same poll tiers), otherwise None
+        """
+        self._failures = 0
+        self._successes += 1
+        if self._poll_every > 1 and self._successes >= _POLLS_BEFORE_PROBE:
+            self._poll_every //= 2
+            self._successes = 0
+            _LOGGER.info("%s: polls recovered, now polling every %s poll intervals", self._name, self._poll_every)
+
+        if duration_secs is not None:
+            self._durations.append(duration_secs)
+
+        if self.max_read > self._good_max_read:
+            self._judge_trial()
+        elif len(self._durations) >= _TRIAL_POLLS:
+            self._baseline_secs = sum(self._durations) / len(self._durations)
+            self._durations.clear()
+            if self._successes >= _POLLS_BEFORE_PROBE and self._poll_every == 1:
+                self._start_trial()
+
+    def record_failure(self, size_related: bool) -> None:
+        """
+        Records a failed poll. size_related is False if the failure can't have been caused by the size of the reads
+        (e.g. we couldn't connect)
+        """
+        self._successes = 0
+        self._durations.clear()
+        if self.max_read > self._good_max_read:
+            _LOGGER.info(
+                "%s: poll failed while trying max_read %s, staying at %s",
+                self._name,
+                self.max_read,
+                self._good_max_read,
+            )
+            if size_related:
+                self._max_read_ceiling = self.max_read
+            self.max_read = self._good_max_read
+            return
+
+        self._failures += 1
+        if self._failures < _FAILURES_BEFORE_BACK_OFF:
+            return
+        self._failures = 0
+
+        if size_related and self._good_max_read > self._min_max_read:
+            self._max_read_ceiling = self._good_max_read
+            self._good_max_read = max(self._good_max_read // 2, self._min_max_read)
+            self.max_read = self._good_max_read
+            self._baseline_secs = None
+            _LOGGER.warning("%s: polls are failing, reducing max_read to %s", self._name, self.max_read)
+        elif self._poll_every < _MAX_POLL_EVERY:
+            self._poll_every *= 2
+            _LOGGER.warning("%s: polls are failing, now polling every %s poll intervals", self._name, self._poll_every)
+
+    def _start_trial(self) -> None:
+        candidate = min(math.ceil(self._good_max_read * 1.5), self._max_read_ceiling - 1)
+        if candidate > self._good_max_read:
+            _LOGGER.debug("%s: trying max_read %s", self._name, candidate)
+            self.max_read = candidate
+            self._successes = 0
+
+    def _judge_trial(self) -> None:
+        if len(self._durations) < _TRIAL_POLLS:
+            return
+        trial_secs = sum(self._durations) / len(self._durations)
+        self._durations.clear()
+        self._successes = 0
+        if self._baseline_secs is None or trial_secs <= self._baseline_secs * _SLOWDOWN_TOLERANCE:
+            _LOGGER.info(
+                "%s: increasing max_read from %s to %s (poll time %.0fms -> %.0fms)",
+                self._name,
+                self._good_max_read,
+                self.max_read,
+                (self._baseline_secs or 0) * 1000,
+                trial_secs * 1000,
+            )
+            self._good_max_read = self.max_read
+            self._baseline_secs = trial_secs
+        else:
+            _LOGGER.debug("%s: max_read %s is slower, staying at %s", self._name, self.max_read, self._good_max_read)
+            self._max_read_ceiling = self.max_read
+            self.max_read = self._good_max_read
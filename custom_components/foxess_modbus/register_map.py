@@ -0,0 +1,130 @@
+"""Learns which individual-read registers can actually be read together, and remembers it across restarts"""
+
+import logging
+from typing import Any
+from typing import Callable
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+_STORAGE_VERSION = 1
+_SAVE_DELAY_SECS = 30
+# If a probe fails this many times without a clear answer from the inverter (e.g. timeouts), give up on that span
+_MAX_INCONCLUSIVE_PROBES = 3
+
+
+class LearnedRegisterMap:
+    """
+    Spans of registers which have been probed to see whether they can be read in a single request.
+
+    Some inverters have ranges of registers which we're told have to be read one at a time. Often only a few of the
+    registers in these ranges are actually a problem. We find the others by probing: we try reading a span which covers
+    several individual reads, and if it fails with an exception response we try each half in turn. Spans which read
+    correctly are fed back into the read planner.
+
+    The results are saved per inverter, and thrown away if the inverter model or register type changes.
+    """
+
+    def __init__(self, hass: HomeAssistant, inverter_id: str, signature: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, _STORAGE_VERSION, f"{DOMAIN}.register_map.{inverter_id}")
+        self._signature = signature
+        self._readable: list[tuple[int, int]] = []
+        self._unreadable: set[tuple[int, int]] = set()
+        self._inconclusive_probes: dict[tuple[int, int], int] = {}
+        self.loaded = False
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load()
+        self.loaded = True
+        if data is None or data.get("signature") != self._signature:
+            return
+        self._readable = [(start, end) for start, end in data["readable"]]
+        self._unreadable = {(start, end) for start, end in data["unreadable"]}
+        _LOGGER.debug("Loaded learned register map: %s readable spans", len(self._readable))
+
+    def can_read_together(self, start_address: int, end_address: int) -> bool:
+        """Returns whether start_address to end_address (inclusive) are known to be readable in a single read"""
+        return any(start <= start_address and end_address <= end for start, end in self._readable)
+
+    def next_probe(
+        self,
+        read_ranges: list[tuple[int, int]],
+        max_read: int,
+        is_individual_read: Callable[[int], bool],
+        overlaps_invalid_range: Callable[[int, int], bool],
+    ) -> tuple[int, int] | None:
+        """
+        Given the current read plan, finds the next span (start_address, end_address) which is worth probing, if any.
+
+        We look at runs of consecutive reads of individual-read registers which could be combined into a single read. If
+        a run is known not to work, we try each half of it instead.
+        """
+        runs: list[list[tuple[int, int]]] = []
+        for read_range in read_ranges:
+            start_address, num_registers = read_range
+            if not is_individual_read(start_address):
+                runs.append([])
+                continue
+            end_address = start_address + num_registers - 1
+            if (
+                runs
+                and runs[-1]
+                and end_address - runs[-1][0][0] + 1 <= max_read
+                and not overlaps_invalid_range(runs[-1][0][0], end_address)
+            ):
+                runs[-1].append(read_range)
+            else:
+                runs.append([read_range])
+
+        for run in runs:
+            probe = self._probe_within(run)
+            if probe is not None:
+                return probe
+        return None
+
+    def _probe_within(self, run: list[tuple[int, int]]) -> tuple[int, int] | None:
+        if len(run) < 2:
+            return None
+        span = (run[0][0], run[-1][0] + run[-1][1] - 1)
+        if self.can_read_together(*span):
+            # The planner's decided that it's cheaper not to combine these
+            return None
+        if span not in self._unreadable:
+            return span
+        mid = len(run) // 2
+        return self._probe_within(run[:mid]) or self._probe_within(run[mid:])
+
+    def record_readable(self, start_address: int, end_address: int) -> None:
+        _LOGGER.info("Registers %s-%s can be read together", start_address, end_address)
+        self._readable = [
+            (start, end) for start, end in self._readable if not (start_address <= start and end <= end_address)
+        ]
+        self._readable.append((start_address, end_address))
+        self._readable.sort()
+        self._save()
+
+    def record_unreadable(self, start_address: int, end_address: int) -> None:
+        _LOGGER.debug("Registers %s-%s can't be read together", start_address, end_address)
+        self._unreadable.add((start_address, end_address))
+        self._save()
+
+    def record_inconclusive(self, start_address: int, end_address: int) -> None:
+        """Records a probe which failed without telling us whether the span can be read, e.g. a timeout"""
+        span = (start_address, end_address)
+        self._inconclusive_probes[span] = self._inconclusive_probes.get(span, 0) + 1
+        if self._inconclusive_probes[span] >= _MAX_INCONCLUSIVE_PROBES:
+            self.record_unreadable(start_address, end_address)
+
+    def _save(self) -> None:
+        self._store.async_delay_save(
+            lambda: {
+                "signature": self._signature,
+                "readable": self._readable,
+                "unreadable": sorted(self._unreadable),
+            },
+            _SAVE_DELAY_SECS,
+        )
@@ -0,0 +1,228 @@
+"""Compact storage for the registers which a ModbusController knows about"""
+
+from array import array
+from bisect import bisect_left
+from operator import itemgetter
+from typing import Callable
+from typing import Sequence
+
+from .common.types import RegisterPollType
+
+# Register values are unsigned 16-bit, so this can't clash with a real value
+_NO_VALUE = -1
+
+_ValuesGetter = Callable[[Sequence[int]], Sequence[int]]
+# Takes written_since (see RegisterStore.value), and returns the value of one or more registers
+RegisterReader = Callable[[float], int | None]
+
+
+def _values_getter(offsets: list[int]) -> _ValuesGetter:
+    """Creates a function which picks the values at the given offsets out of a read response"""
+    if len(offsets) == 1:
+        offset = offsets[0]
+        return lambda values: (values[offset],)
+    return itemgetter(*offsets)
+
+
+class RegisterStore:
+    """
+    Holds the latest read value and latest written value of each register which we're interested in.
+
+    Registers are held in address order in a set of parallel arrays, and looked up through an address -> slot index.
+    Slots are reassigned whenever a register is added or removed (which only happens when entities are added or
+    removed), so nothing outside this class deals with slots.
+    """
+
+    def __init__(self) -> None:
+        self._addresses = array("H")
+        self._slots: dict[int, int] = {}
+        self._poll_types = array("b")
+        self._read_values = array("i")
+        self._read_at = array("d")  # From time.monotonic()
+        self._written_values = array("i")
+        self._written_at = array("d")  # From time.monotonic()
+        # (start_address, num_registers) -> (first slot, last slot + 1, getter for the values in those slots)
+        self._read_range_cache: dict[tuple[int, int], tuple[int, int, _ValuesGetter]] = {}
+
+    def __contains__(self, address: int) -> bool:
+        return address in self._slots
+
+    def __len__(self) -> int:
+        return len(self._addresses)
+
+    def poll_type(self, address: int) -> RegisterPollType | None:
+        slot = self._slots.get(address)
+        return RegisterPollType(self._poll_types[slot]) if slot is not None else None
+
+    def add(self, address: int, poll_type: RegisterPollType) -> None:
+        """Starts tracking the given address, which must not already be tracked"""
+        assert address not in self._slots, f"Address {address} already added"
+        slot = bisect_left(self._addresses, address)
+        self._addresses.insert(slot, address)
+        self._poll_types.insert(slot, poll_type)
+        self._read_values.insert(slot, _NO_VALUE)
+        self._read_at.insert(slot, 0.0)
+        self._written_values.insert(slot, _NO_VALUE)
+        self._written_at.insert(slot, 0.0)
+        self._reindex()
+
+    def remove(self, address: int) -> None:
+        """Stops tracking the given address, which must be tracked"""
+        slot = self._slots[address]
+        del self._addresses[slot]
+        del self._poll_types[slot]
+        del self._read_values[slot]
+        del self._read_at[slot]
+        del self._written_values[slot]
+        del self._written_at[slot]
+        self._reindex()
+
+    def set_poll_type(self, address: int, poll_type: RegisterPollType) -> None:
+        self._poll_types[self._slots[address]] = poll_type
+
+    def addresses(self, min_poll_type: RegisterPollType) -> list[int]:
+        """Returns the tracked addresses with a poll type of at least min_poll_type, in order"""
+        return [
+            address
+            for address, poll_type in zip(self._addresses, self._poll_types, strict=True)
+            if poll_type >= min_poll_type
+        ]
+
+    def value(self, address: int, written_since: float) -> int | None:
+        """
+        Fetches the value of the given register: the written value if it was written after written_since, otherwise
+        the latest read value. Returns None if the address isn't tracked, or hasn't been read yet.
+        """
+        slot = self._slots.get(address)
+        if slot is None:
+            return None
+        written_value = self._written_values[slot]
+        if written_value != _NO_VALUE and self._written_at[slot] > written_since:
+            return written_value
+        read_value = self._read_values[slot]
+        return read_value if read_value != _NO_VALUE else None
+
+    def read_at(self, address: int) -> float | None:
+        """Fetches when the given register was last read (from time.monotonic()), or None if it hasn't been read"""
+        slot = self._slots.get(address)
+        if slot is None or self._read_values[slot] == _NO_VALUE:
+            return None
+        return self._read_at[slot]
+
+    def read_value(self, address: int, read_since: float) -> int | None:
+        """
+        Fetches the latest read value of the given register, ignoring written values. Returns None if the address isn't
+        tracked, or wasn't read after read_since.
+        """
+        slot = self._slots.get(address)
+        if slot is None or self._read_at[slot] < read_since:
+            return None
+        read_value = self._read_values[slot]
+        return read_value if read_value != _NO_VALUE else None
+
+    def set_read_values(self, start_address: int, values: Sequence[int], read_at: float) -> list[int]:
+        """
+        Records the values read from start_address onwards at time read_at, discarding any for addresses we aren't
+        tracking (which we might have read for efficiency).
+
+        :returns: The tracked addresses whose values changed
+        """
+        key = (start_address, len(values))
+        cached = self._read_range_cache.get(key)
+        if cached is None:
+            first_slot = bisect_left(self._addresses, start_address)
+            end_slot = bisect_left(self._addresses, start_address + len(values))
+            offsets = [address - start_address for address in self._addresses[first_slot:end_slot]]
+            getter = _values_getter(offsets) if offsets else lambda _values: ()
+            cached = (first_slot, end_slot, getter)
+            self._read_range_cache[key] = cached
+
+        first_slot, end_slot, getter = cached
+        self._read_at[first_slot:end_slot] = array("d", (read_at,)) * (end_slot - first_slot)
+        new_values = array("i", getter(values))
+        old_values = self._read_values[first_slot:end_slot]
+        # Most registers don't change from one poll to the next, and comparing arrays is cheap
+        if new_values == old_values:
+            return []
+        self._read_values[first_slot:end_slot] = new_values
+        return [
+            address
+            for address, old_value, new_value in zip(
+                self._addresses[first_slot:end_slot], old_values, new_values, strict=True
+            )
+            if old_value != new_value
+        ]
+
+    def reader(self, addresses: list[int], *, signed: bool) -> RegisterReader:
+        """
+        Creates a function which returns the value of the given registers (from lowest-order to highest-order) as a
+        single integer, or None if any of them doesn't have a value. Each register's value is picked as in value().
+
+        This is specialised for the common cases of one and two registers, as it's called whenever an entity's value
+        is recalculated.
+        """
+        value = self.value
+
+        if len(addresses) == 1:
+            (address,) = addresses
+            if signed:
+
+                def read_int16(written_since: float) -> int | None:
+                    val = value(address, written_since)
+                    if val is None:
+                        return None
+                    val &= 0xFFFF
+                    return val - 0x10000 if val & 0x8000 else val
+
+                return read_int16
+
+            def read_uint16(written_since: float) -> int | None:
+                val = value(address, written_since)
+                return val & 0xFFFF if val is not None else None
+
+            return read_uint16
+
+        if len(addresses) == 2:
+            low_address, high_address = addresses
+
+            def read_32(written_since: float) -> int | None:
+                low = value(low_address, written_since)
+                if low is None:
+                    return None
+                high = value(high_address, written_since)
+                if high is None:
+                    return None
+                val = ((high & 0xFFFF) << 16) | (low & 0xFFFF)
+                if signed and val & 0x80000000:
+                    val -= 0x100000000
+                return val
+
+            return read_32
+
+        sign_bit = 1 << (len(addresses) * 16 - 1)
+
+        def read_many(written_since: float) -> int | None:
+            result = 0
+            for i, address in enumerate(addresses):
+                val = value(address, written_since)
+                if val is None:
+                    return None
+                result |= (val & 0xFFFF) << (i * 16)
+            if signed:
+                result = (result & (sign_bit - 1)) - (result & sign_bit)
+            return result
+
+        return read_many
+
+    def set_written_value(self, address: int, value: int, written_at: float) -> bool:
+        """Records a value which we wrote. Returns False if we aren't tracking the given address"""
+        slot = self._slots.get(address)
+        if slot is None:
+            return False
+        self._written_values[slot] = value
+        self._written_at[slot] = written_at
+        return True
+
+    def _reindex(self) -> None:
+        self._slots = {address: slot for slot, address in enumerate(self._addresses)}
+        self._read_range_cache.clear()
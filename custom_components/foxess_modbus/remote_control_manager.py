@@ -108,7 +108,7 @@ class RemoteControlManager(EntityRemoteControlManager, ModbusControllerEntity):
                 return True
         return False
 
-    async def _write_active_power(self, export_power: int) -> None:
+    def _active_power_write(self, export_power: int) -> tuple[int, list[int]]:
         values = []
         for i in range(len(self._addresses.active_power)):
             # If there are multiple registers, they must be contiguous and descending
@@ -118,7 +118,12 @@ class RemoteControlManager(EntityRemoteControlManager, ModbusControllerEntity):
             values.append((export_power >> (i * 16)) & 0xFFFF)
         # Last register is the lowest address
         values.reverse()
-        await self._controller.write_registers(self._addresses.active_power[-1], values)
+        return (self._addresses.active_power[-1], values)
+
+    async def _write_registers(self, writes: list[tuple[int, list[int]]]) -> None:
+        """Makes the given (start_address, values) writes in order. If one fails, the later ones aren't sent"""
+        for start_address, values in writes:
+            await self._controller.write_registers(start_address, values)
 
     async def _update_charge(self) -> None:
         # The inverter doesn't respect Max Soc. Therefore if the SoC >= Max SoC, turn off remote control.
@@ -178,8 +183,7 @@ class RemoteControlManager(EntityRemoteControlManager, ModbusControllerEntity):
         if not self._has_any_pv_voltage():
             _LOGGER.debug("Remote control: no sun (or PV unavailable), defaulting to %sW", max_import_power)
             # If remote control stops, we want to be in Back-up
-            await self._enable_remote_control(WorkMode.BACK_UP)
-            await self._write_active_power(-max_import_power)
+            await self._enable_remote_control(WorkMode.BACK_UP, -max_import_power)
             return
 
         # These are both negative
@@ -191,8 +195,7 @@ class RemoteControlManager(EntityRemoteControlManager, ModbusControllerEntity):
                 "Remote control: max or current battery charge power unavailable, defaulting to %sW",
                 max_import_power,
             )
-            await self._enable_remote_control(WorkMode.BACK_UP)
-            await self._write_active_power(-max_import_power)
+            await self._enable_remote_control(WorkMode.BACK_UP, -max_import_power)
             return
 
         max_battery_charge_power = -max_battery_charge_power_negative
@@ -251,8 +254,7 @@ class RemoteControlManager(EntityRemoteControlManager, ModbusControllerEntity):
             )
 
         # If remote control stops, we want to be in Back-up, charging as much as we can
-        await self._enable_remote_control(WorkMode.BACK_UP)
-        await self._write_active_power(-self._current_import_power)
+        await self._enable_remote_control(WorkMode.BACK_UP, -self._current_import_power)
 
     async def _update_discharge(self) -> None:
         # For force discharge, normally we can just leave it, and it will do the right thing: respect Min SoC and the
@@ -265,11 +267,12 @@ class RemoteControlManager(EntityRemoteControlManager, ModbusControllerEntity):
             export_power = inverter_capacity
 
         # If remote control stops, we still want to feed in as much as possible
-        await self._enable_remote_control(WorkMode.FEED_IN_FIRST)
         # Positive values = discharge
-        await self._write_active_power(export_power)
+        await self._enable_remote_control(WorkMode.FEED_IN_FIRST, export_power)
+
+    async def _enable_remote_control(self, fallback_work_mode: WorkMode, export_power: int) -> None:
+        writes: list[tuple[int, list[int]]] = []
 
-    async def _enable_remote_control(self, fallback_work_mode: WorkMode) -> None:
         # We set a fallback work mode so that the inverter still does "roughly" the right thing if we disconnect
         # (This might not be available, e.g. on H1 LAN)
         if (
@@ -280,25 +283,29 @@ class RemoteControlManager(EntityRemoteControlManager, ModbusControllerEntity):
             fallback_work_mode_value = self._addresses.work_mode_map[fallback_work_mode]
             current_work_mode = self._read(self._addresses.work_mode, signed=False)
             if current_work_mode != fallback_work_mode_value:
-                await self._controller.write_register(self._addresses.work_mode, fallback_work_mode_value)
+                writes.append((self._addresses.work_mode, [fallback_work_mode_value]))
 
         if not self._remote_control_enabled:
             self._remote_control_enabled = True
             timeout = self._poll_rate * 2
 
             # We can't do multi-register writes to these registers
-            await self._controller.write_register(self._addresses.timeout_set, timeout)
-            await self._controller.write_register(self._addresses.remote_enable, 1)
+            writes.append((self._addresses.timeout_set, [timeout]))
+            writes.append((self._addresses.remote_enable, [1]))
+
+        writes.append(self._active_power_write(export_power))
+        await self._write_registers(writes)
 
     async def _disable_remote_control(self, work_mode: WorkMode | None = None) -> None:
         # The strategy periods feature of the foxess app use the remote control register internally. If we disable
         # remote control when a strategy period is active, we'll end up disabling it.
         # We therefore need to be a bit careful, and only disable remote control if we previously enabled it.
         # If we did have it enabled, but then restarted, then we just need to let the watchdog catch it.
+        writes: list[tuple[int, list[int]]] = []
 
         if self._remote_control_enabled:
             self._remote_control_enabled = False
-            await self._controller.write_register(self._addresses.remote_enable, 0)
+            writes.append((self._addresses.remote_enable, [0]))
 
         # This might not be available, e.g. on H1 LAN
         if (
@@ -309,7 +316,10 @@ class RemoteControlManager(EntityRemoteControlManager, ModbusControllerEntity):
             current_work_mode = self._read(self._addresses.work_mode, signed=False)
             work_mode_value = self._addresses.work_mode_map[work_mode]
             if current_work_mode != work_mode_value:
-                await self._controller.write_register(self._addresses.work_mode, work_mode_value)
+                writes.append((self._addresses.work_mode, [work_mode_value]))
+
+        if writes:
+            await self._write_registers(writes)
 
     def _read(self, address: list[int] | int | None, signed: bool) -> int | None:
         if address is None:
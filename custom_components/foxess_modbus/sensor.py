@@ -10,6 +10,8 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .common.types import HassData
 from .const import DOMAIN
 from .entities.connection_status_sensor import ConnectionStatusSensor
+from .entities.poll_metrics_sensor import POLL_METRICS
+from .entities.poll_metrics_sensor import PollMetricsSensor
 from .inverter_profiles import create_entities
 
 _LOGGER = logging.getLogger(__package__)
@@ -23,4 +25,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_d
 
     for controller in controllers:
         async_add_devices([ConnectionStatusSensor(controller)])
+        if controller.poll_metrics is not None:
+            async_add_devices([PollMetricsSensor(controller, metric) for metric in POLL_METRICS])
         async_add_devices(create_entities(SensorEntity, controller))
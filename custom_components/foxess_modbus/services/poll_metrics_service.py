@@ -0,0 +1,68 @@
+"""Defines the service to fetch poll metrics"""
+
+import logging
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant
+from homeassistant.core import ServiceCall
+from homeassistant.core import ServiceResponse
+from homeassistant.core import SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+
+from ..const import DOMAIN
+from ..entities.modbus_entity_mixin import ModbusEntityMixin
+from ..modbus_controller import ModbusController
+from .utils import get_controller_from_friendly_name_or_device_id
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+_POLL_METRICS_SCHEMA = vol.Schema(
+    {
+        # Let the value to this be omitted, instead of forcing them to specify ''
+        vol.Required("inverter", description="Inverter"): vol.Any(cv.string, None),
+        vol.Optional("reset", description="Reset", default=False): cv.boolean,
+    }
+)
+
+
+def register(hass: HomeAssistant, controllers: list[ModbusController]) -> None:
+    """Register the service with hass"""
+
+    async def _callback(service_data: ServiceCall) -> ServiceResponse:
+        return _get_poll_metrics(controllers, service_data, hass)
+
+    hass.services.async_register(
+        DOMAIN,
+        "get_poll_metrics",
+        _callback,
+        _POLL_METRICS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def _get_poll_metrics(
+    controllers: list[ModbusController],
+    service_data: ServiceCall,
+    hass: HomeAssistant,
+) -> ServiceResponse:
+    controller = get_controller_from_friendly_name_or_device_id(service_data.data.get("inverter"), controllers, hass)
+
+    metrics = controller.poll_metrics
+    if metrics is None:
+        raise HomeAssistantError("Poll metrics are turned off for this inverter. Turn them on in its advanced options")
+
+    response = metrics.as_dict()
+    # How long ago each entity's registers were read. This changes all the time, so isn't an entity attribute (which
+    # would be recorded each time it changed)
+    data_ages = {
+        entity.entity_id: entity.data_age
+        for entity in controller.modbus_entities
+        if isinstance(entity, ModbusEntityMixin) and entity.addresses
+    }
+    response["data_age_secs"] = {
+        entity_id: round(age, 1) if age is not None else None for entity_id, age in sorted(data_ages.items())
+    }
+    if service_data.data["reset"]:
+        metrics.reset()
+    return response
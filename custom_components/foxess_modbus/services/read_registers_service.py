@@ -23,6 +23,7 @@ _READ_SCHEMA = vol.Schema(
             vol.Required("start_address", description="Start Address"): cv.positive_int,
             vol.Required("count", description="Values"): cv.positive_int,
             vol.Required("type", description="Type of register to read"): vol.In(["input", "holding"]),
+            vol.Optional("max_age", description="Maximum age"): vol.All(vol.Coerce(float), vol.Range(min=0)),
         },
     )
 )
@@ -63,7 +64,9 @@ async def _read_service(
         num_registers = service_data.data["count"]
         types = {"input": RegisterType.INPUT, "holding": RegisterType.HOLDING}
         register_type = types[service_data.data["type"]]
-        values = await controller.read_registers(start_address, num_registers, register_type)
+        values = await controller.read_registers(
+            start_address, num_registers, register_type, service_data.data.get("max_age")
+        )
         response_values = {}
         for i in range(num_registers):
             response_values[start_address + i] = values[i]
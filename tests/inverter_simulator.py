@@ -0,0 +1,409 @@
+"""
+A simulated inverter, which serves Modbus TCP or RTU over TCP on localhost.
+
+Its registers come from the entity descriptions: it has every register which the integration reads or writes for the
+given model and connection type. Its SpecialRegisterConfig is enforced in the same way as a real inverter: reads which
+touch an invalid range, or which read an individual-read register along with others, get an exception response.
+
+Faults can be injected, to see how the integration copes with a poor connection or a busy adapter.
+"""
+
+import asyncio
+import random
+import re
+import struct
+from collections import Counter
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any
+from typing import Iterable
+from unittest.mock import MagicMock
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.components.number import NumberEntity
+from homeassistant.components.select import SelectEntity
+from homeassistant.components.sensor import SensorEntity
+from pymodbus.utilities import checkCRC
+from pymodbus.utilities import computeCRC
+
+from custom_components.foxess_modbus.common.types import ConnectionType
+from custom_components.foxess_modbus.common.types import RegisterType
+from custom_components.foxess_modbus.const import ENTITY_ID_PREFIX
+from custom_components.foxess_modbus.const import UNIQUE_ID_PREFIX
+from custom_components.foxess_modbus.entities.modbus_fault_sensor import ModbusFaultSensor
+from custom_components.foxess_modbus.inverter_profiles import INVERTER_PROFILES
+from custom_components.foxess_modbus.inverter_profiles import InverterModelConnectionTypeProfile
+
+# Where autodetect looks for the model name, one character per register
+_MODEL_START_ADDRESS = 30000
+_MODEL_LENGTH = 16
+
+# The most registers which the spec allows to be read or written in one request
+_MAX_READ = 125
+_MAX_WRITE = 123
+
+_MAX_RANDOM_VALUE = 60
+
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+SLAVE_DEVICE_FAILURE = 0x04
+
+_EXCEPTION_MASK = 0x80
+_READ_REGISTER_TYPES = {0x03: RegisterType.HOLDING, 0x04: RegisterType.INPUT}
+# When a response is crossed with one meant for another client, it's of a different type to the one we asked for
+_WRONG_FUNCTION_CODES = {0x03: 0x04, 0x04: 0x03, 0x06: 0x10, 0x10: 0x06}
+
+# Transaction ID, protocol ID, length of the rest of the frame (including the unit ID), unit ID
+_MBAP_HEADER = struct.Struct(">HHHB")
+# Address, count (reads and multiple writes) or value (single writes)
+_ADDRESS_AND_COUNT = struct.Struct(">HH")
+_CRC = struct.Struct(">H")
+
+
+def _profile_addresses(profile: InverterModelConnectionTypeProfile) -> tuple[set[int], set[int]]:
+    """
+    Finds every address which the integration uses for the given inverter model and connection type
+
+    :returns: Tuple of (all addresses, addresses of fault registers)
+    """
+    controller = MagicMock()
+    controller.inverter_details = {ENTITY_ID_PREFIX: "", UNIQUE_ID_PREFIX: ""}
+
+    addresses: set[int] = set()
+    fault_addresses: set[int] = set()
+    for entity_type in [SensorEntity, BinarySensorEntity, SelectEntity, NumberEntity]:
+        for entity in profile.create_entities(entity_type, controller):
+            addresses.update(getattr(entity, "addresses", []))
+            if isinstance(entity, ModbusFaultSensor):
+                fault_addresses.update(entity.addresses)
+
+    for charge_period in profile.create_charge_periods(controller):
+        addresses.update(
+            [
+                charge_period.addresses.period_start_address,
+                charge_period.addresses.period_end_address,
+                charge_period.addresses.enable_charge_from_grid_address,
+            ]
+        )
+
+    remote_control = profile.create_remote_control_config(controller)
+    if remote_control is not None:
+        addresses.update([remote_control.remote_enable, remote_control.timeout_set, *remote_control.active_power])
+        if remote_control.work_mode is not None:
+            addresses.add(remote_control.work_mode)
+
+    return addresses, fault_addresses
+
+
+class SimulatedInverter:
+    """
+    The registers of a single simulated inverter.
+
+    Registers start off with random (but repeatable) values, apart from fault registers, which are 0. Registers which
+    the integration doesn't know about also read as 0, as they do on a real inverter.
+    """
+
+    def __init__(self, full_model: str, connection_type: ConnectionType, seed: int = 0) -> None:
+        model_profile = next(
+            (profile for profile in INVERTER_PROFILES.values() if re.match(profile.model_pattern, full_model)), None
+        )
+        assert model_profile is not None, f"No inverter profile matches '{full_model}'"
+        self.profile = model_profile.connection_types[connection_type]
+
+        self._random = random.Random(seed)
+        addresses, fault_addresses = _profile_addresses(self.profile)
+        # The inverter isn't faulted
+        self._data_addresses = sorted(addresses - fault_addresses)
+        self.registers = {address: 0 for address in fault_addresses}
+        for address in self._data_addresses:
+            self.registers[address] = self._random_value()
+
+        self._model_addresses = range(_MODEL_START_ADDRESS, _MODEL_START_ADDRESS + _MODEL_LENGTH)
+        for address, char in zip(self._model_addresses, full_model.ljust(_MODEL_LENGTH), strict=False):
+            self.registers[address] = ord(char)
+
+        # Requests which have been made, as (start_address, count) for reads and (start_address, values) for writes
+        self.reads: list[tuple[int, int]] = []
+        self.writes: list[tuple[int, list[int]]] = []
+        # Real inverters often let most of their individual-read registers be read together after all
+        self.enforce_individual_reads = True
+        self._read_failures: dict[int, _ReadFailure] = {}
+
+    @property
+    def data_addresses(self) -> list[int]:
+        """The addresses used by the integration (apart from fault registers), in order"""
+        return self._data_addresses
+
+    def churn(self, fraction: float) -> None:
+        """Gives the given fraction of registers new values, as if the inverter had moved on since the last poll"""
+        for address in self._random.sample(self._data_addresses, round(len(self._data_addresses) * fraction)):
+            self.registers[address] = self._random_value()
+
+    def fail_reads(
+        self, addresses: Iterable[int], exception_code: int | None = SLAVE_DEVICE_FAILURE, times: int | None = None
+    ) -> None:
+        """
+        Makes reads which include any of the given addresses fail with the given exception code, or go unanswered if
+        it's None. If times is given, this stops after that many reads have failed.
+        """
+        failure = _ReadFailure(exception_code, times)
+        for address in addresses:
+            self._read_failures[address] = failure
+
+    def stop_failing_reads(self) -> None:
+        self._read_failures.clear()
+
+    def _random_value(self) -> int:
+        # Small enough to pass validation of most registers (percentages, times, etc.)
+        return self._random.randrange(_MAX_RANDOM_VALUE)
+
+    def read(self, register_type: RegisterType, start_address: int, count: int) -> list[int] | int | None:
+        """Returns the values of the given registers, or an exception code, or None if the read isn't answered"""
+        self.reads.append((start_address, count))
+        if not 1 <= count <= _MAX_READ:
+            return ILLEGAL_DATA_VALUE
+        end_address = start_address + count - 1
+
+        failure = next(
+            (
+                self._read_failures[address]
+                for address in range(start_address, end_address + 1)
+                if address in self._read_failures
+            ),
+            None,
+        )
+        if failure is not None:
+            if failure.remaining is not None:
+                failure.remaining -= 1
+                if failure.remaining <= 0:
+                    self._read_failures = {
+                        address: other for address, other in self._read_failures.items() if other is not failure
+                    }
+            return failure.exception_code
+
+        # Only the model can be read using the other register type
+        if register_type != self.profile.register_type:
+            if start_address in self._model_addresses and end_address in self._model_addresses:
+                return [self.registers[address] for address in range(start_address, end_address + 1)]
+            return ILLEGAL_DATA_ADDRESS
+
+        if self.profile.overlaps_invalid_range(start_address, end_address):
+            return ILLEGAL_DATA_ADDRESS
+        if (
+            count > 1
+            and self.enforce_individual_reads
+            and any(self.profile.is_individual_read(address) for address in range(start_address, end_address + 1))
+        ):
+            return ILLEGAL_DATA_ADDRESS
+        return [self.registers.get(address, 0) for address in range(start_address, end_address + 1)]
+
+    def write(self, start_address: int, values: list[int]) -> int | None:
+        """Writes the given registers, returning an exception code if the write is rejected"""
+        if not 1 <= len(values) <= _MAX_WRITE:
+            return ILLEGAL_DATA_VALUE
+        self.writes.append((start_address, values))
+        if self.profile.overlaps_invalid_range(start_address, start_address + len(values) - 1):
+            return ILLEGAL_DATA_ADDRESS
+        for address, value in enumerate(values, start_address):
+            self.registers[address] = value
+        return None
+
+
+@dataclass
+class _ReadFailure:
+    exception_code: int | None
+    remaining: int | None
+
+
+@dataclass
+class Faults:
+    """Faults to inject. Rates are the chance of any given request being affected"""
+
+    latency: float = 0.0
+    """Seconds taken to answer each request"""
+    jitter: float = 0.0
+    """Up to this many extra seconds are added to each request's latency"""
+    packet_loss: float = 0.0
+    """Requests which aren't answered"""
+    exception_rate: float = 0.0
+    """Requests which are answered with a 'slave device failure' exception response"""
+    wrong_response_rate: float = 0.0
+    """Requests which are answered with a response of the wrong type, as if it was meant for another client"""
+    short_response_rate: float = 0.0
+    """Reads which are answered with one register fewer than was asked for"""
+    wrong_transaction_id_rate: float = 0.0
+    """Requests which are answered with the wrong transaction ID (Modbus TCP only)"""
+    split_delay: float = 0.0
+    """If set, responses are sent one byte at a time, this many seconds apart"""
+
+
+class InverterSimulator:
+    """
+    Serves one or more simulated inverters (by slave ID) on localhost.
+
+    As on RS485, only one request is handled at a time, across all connections. Requests to slaves which don't exist
+    aren't answered. Use as an async context manager, then connect to host and port.
+    """
+
+    host = "127.0.0.1"
+
+    def __init__(
+        self,
+        inverters: dict[int, SimulatedInverter],
+        *,
+        rtu: bool = False,
+        faults: Faults | None = None,
+        seed: int = 0,
+    ) -> None:
+        self.inverters = inverters
+        self.faults = faults if faults is not None else Faults()
+        # Number of requests, dropped requests, injected exceptions, etc.
+        self.counts: Counter[str] = Counter()
+        self._rtu = rtu
+        self._random = random.Random(seed)
+        self._bus = asyncio.Lock()
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self.port = 0
+
+    async def __aenter__(self) -> "InverterSimulator":
+        self._server = await asyncio.start_server(self._serve, self.host, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        assert self._server is not None
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    def drop_connections(self) -> None:
+        """Closes every client connection, as if the adapter had restarted"""
+        for writer in self._writers:
+            writer.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                if self._rtu:
+                    transaction_id = 0
+                    slave, pdu = await self._read_rtu_request(reader)
+                else:
+                    transaction_id, slave, pdu = await self._read_mbap_request(reader)
+                if pdu is None:
+                    continue
+
+                response = await self._handle(slave, pdu)
+                if response is None or writer.is_closing():
+                    continue
+                if self._rtu:
+                    frame = bytes((slave,)) + response
+                    frame += _CRC.pack(computeCRC(frame))
+                else:
+                    if self._random.random() < self.faults.wrong_transaction_id_rate:
+                        self.counts["wrong_transaction_ids"] += 1
+                        transaction_id = (transaction_id + 1) & 0xFFFF
+                    frame = _MBAP_HEADER.pack(transaction_id, 0, len(response) + 1, slave) + response
+                await self._send(writer, frame)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _send(self, writer: asyncio.StreamWriter, frame: bytes) -> None:
+        split_delay = self.faults.split_delay
+        if split_delay <= 0:
+            writer.write(frame)
+            return
+        for i in range(len(frame)):
+            if i > 0:
+                await asyncio.sleep(split_delay)
+            writer.write(frame[i : i + 1])
+            await writer.drain()
+
+    async def _read_mbap_request(self, reader: asyncio.StreamReader) -> tuple[int, int, bytes]:
+        transaction_id, _protocol_id, length, slave = _MBAP_HEADER.unpack(await reader.readexactly(_MBAP_HEADER.size))
+        return transaction_id, slave, await reader.readexactly(length - 1)
+
+    async def _read_rtu_request(self, reader: asyncio.StreamReader) -> tuple[int, bytes | None]:
+        # RTU frames don't say how long they are, so we have to work it out from the function code
+        frame = await reader.readexactly(2)
+        slave, function_code = frame
+        if function_code in (0x03, 0x04, 0x06):
+            frame += await reader.readexactly(_ADDRESS_AND_COUNT.size + _CRC.size)
+        elif function_code == 0x10:
+            frame += await reader.readexactly(_ADDRESS_AND_COUNT.size + 1)
+            frame += await reader.readexactly(frame[-1] + _CRC.size)
+        else:
+            # We can't tell where the frame ends, so give up on the connection
+            raise ConnectionError(f"Unexpected function code {function_code} in RTU request")
+
+        (crc,) = _CRC.unpack_from(frame, len(frame) - _CRC.size)
+        if not checkCRC(frame[: -_CRC.size], crc):
+            # A real inverter ignores frames with a bad CRC
+            self.counts["bad_crc"] += 1
+            return slave, None
+        return slave, frame[1 : -_CRC.size]
+
+    async def _handle(self, slave: int, pdu: bytes) -> bytes | None:
+        """Works out the response PDU to the given request PDU, or None if it isn't answered"""
+        async with self._bus:
+            self.counts["requests"] += 1
+            faults = self.faults
+            delay = faults.latency + self._random.uniform(0, faults.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            inverter = self.inverters.get(slave)
+            if inverter is None or self._random.random() < faults.packet_loss:
+                self.counts["dropped"] += 1
+                return None
+
+            function_code = pdu[0]
+            if self._random.random() < faults.exception_rate:
+                self.counts["injected_exceptions"] += 1
+                return bytes((function_code | _EXCEPTION_MASK, SLAVE_DEVICE_FAILURE))
+
+            response = self._respond(inverter, pdu)
+            if response is None:
+                self.counts["dropped"] += 1
+                return None
+            if response[0] & _EXCEPTION_MASK:
+                self.counts["exceptions"] += 1
+            elif self._random.random() < faults.wrong_response_rate:
+                self.counts["wrong_responses"] += 1
+                response = bytes((_WRONG_FUNCTION_CODES[function_code],)) + response[1:]
+            elif function_code in _READ_REGISTER_TYPES and self._random.random() < faults.short_response_rate:
+                self.counts["short_responses"] += 1
+                response = bytes((function_code, response[1] - 2)) + response[2:-2]
+            return response
+
+    def _respond(self, inverter: SimulatedInverter, pdu: bytes) -> bytes | None:
+        function_code = pdu[0]
+        result: Any
+        if function_code in _READ_REGISTER_TYPES:
+            start_address, count = _ADDRESS_AND_COUNT.unpack_from(pdu, 1)
+            result = inverter.read(_READ_REGISTER_TYPES[function_code], start_address, count)
+            if result is None:
+                return None
+            if isinstance(result, list):
+                return struct.pack(f">BB{count}H", function_code, count * 2, *result)
+        elif function_code == 0x06:
+            address, value = _ADDRESS_AND_COUNT.unpack_from(pdu, 1)
+            result = inverter.write(address, [value])
+            if result is None:
+                return pdu[: 1 + _ADDRESS_AND_COUNT.size]
+        elif function_code == 0x10:
+            start_address, count = _ADDRESS_AND_COUNT.unpack_from(pdu, 1)
+            values = list(struct.unpack_from(f">{count}H", pdu, 1 + _ADDRESS_AND_COUNT.size + 1))
+            result = inverter.write(start_address, values)
+            if result is None:
+                return pdu[: 1 + _ADDRESS_AND_COUNT.size]
+        else:
+            result = ILLEGAL_FUNCTION
+        return bytes((function_code | _EXCEPTION_MASK, result))
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+from pymodbus.exceptions import ConnectionException
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.register_read_message import ReadHoldingRegistersRequest
+from pymodbus.register_read_message import ReadHoldingRegistersResponse
+
+from custom_components.foxess_modbus.client.async_modbus_client import AsyncModbusClient
+from custom_components.foxess_modbus.client.async_modbus_client import ResponseMismatchError
+from custom_components.foxess_modbus.client.modbus_framing import MbapFramer
+from custom_components.foxess_modbus.client.modbus_framing import ModbusFramer
+from custom_components.foxess_modbus.client.modbus_framing import RtuFramer
+from custom_components.foxess_modbus.common.types import ConnectionType
+from tests.inverter_simulator import Faults
+from tests.inverter_simulator import InverterSimulator
+from tests.inverter_simulator import SimulatedInverter
+
+# The simulator listens on localhost
+pytestmark = pytest.mark.usefixtures("socket_enabled")
+
+# "H1" is the start of the model name
+_MODEL = [ord("H"), ord("1")]
+
+
+def _inverter() -> SimulatedInverter:
+    return SimulatedInverter("H1-5.0-E", ConnectionType.AUX)
+
+
+def _read_model() -> ReadHoldingRegistersRequest:
+    return ReadHoldingRegistersRequest(30000, 2, slave=1)
+
+
+async def _read(client: AsyncModbusClient) -> list[int]:
+    (response,) = await client.execute([_read_model()])
+    assert isinstance(response, ReadHoldingRegistersResponse)
+    return list(response.registers)
+
+
+@pytest.mark.parametrize(("framer", "rtu"), [(MbapFramer, False), (RtuFramer, True)])
+async def test_reconnects_after_connection_is_lost(framer: type[ModbusFramer], rtu: bool) -> None:
+    async with InverterSimulator({1: _inverter()}, rtu=rtu, faults=Faults(latency=0.2)) as simulator:
+        client = AsyncModbusClient(simulator.host, simulator.port, framer, timeout=1)
+        await client.connect()
+        assert client.connected
+        assert await _read(client) == _MODEL
+
+        # Requests which are in flight when the connection drops fail straight away, rather than timing out
+        read = asyncio.create_task(_read(client))
+        await asyncio.sleep(0.05)
+        simulator.drop_connections()
+        with pytest.raises(ConnectionException):
+            await read
+        assert not client.connected
+
+        await client.connect()
+        assert await _read(client) == _MODEL
+        client.close()
+
+
+async def test_fails_to_connect_when_nothing_is_listening() -> None:
+    async with InverterSimulator({1: _inverter()}) as simulator:
+        port = simulator.port
+    client = AsyncModbusClient(InverterSimulator.host, port, MbapFramer, timeout=1)
+    with pytest.raises(ConnectionException):
+        await client.connect()
+    assert not client.connected
+
+
+async def test_times_out_and_closes_connection() -> None:
+    async with InverterSimulator({1: _inverter()}, faults=Faults(packet_loss=1)) as simulator:
+        client = AsyncModbusClient(simulator.host, simulator.port, MbapFramer, timeout=0.2)
+        await client.connect()
+        with pytest.raises(ModbusIOException, match="No response"):
+            await _read(client)
+        # We can't tell whether the response will still turn up, so the connection has to go
+        assert not client.connected
+
+        simulator.faults = Faults()
+        await client.connect()
+        assert await _read(client) == _MODEL
+        client.close()
+
+
+async def test_rejects_unknown_transaction_id() -> None:
+    async with InverterSimulator({1: _inverter()}, faults=Faults(wrong_transaction_id_rate=1)) as simulator:
+        client = AsyncModbusClient(simulator.host, simulator.port, MbapFramer, timeout=1)
+        await client.connect()
+        with pytest.raises(ResponseMismatchError, match="unknown transaction ID"):
+            await _read(client)
+        assert simulator.counts["wrong_transaction_ids"] == 1
+        assert not client.connected
+
+
+@pytest.mark.parametrize(("framer", "rtu"), [(MbapFramer, False), (RtuFramer, True)])
+async def test_reassembles_responses_split_across_reads(framer: type[ModbusFramer], rtu: bool) -> None:
+    async with InverterSimulator({1: _inverter()}, rtu=rtu, faults=Faults(split_delay=0.01)) as simulator:
+        client = AsyncModbusClient(simulator.host, simulator.port, framer, timeout=2)
+        await client.connect()
+        # Pipelined over Modbus TCP, so the second response arrives while the first is still being assembled
+        responses = await client.execute([_read_model(), ReadHoldingRegistersRequest(30002, 1, slave=1)])
+        assert [list(response.registers) for response in responses] == [_MODEL, [ord("-")]]
+        client.close()
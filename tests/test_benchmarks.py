@@ -0,0 +1,215 @@
+"""
+Benchmarks of the poll hot path, for every inverter model and connection type, against a simulated inverter.
+
+These are skipped unless FOXESS_MODBUS_BENCHMARK names a file to write the results to as JSON, e.g.:
+
+    FOXESS_MODBUS_BENCHMARK=before.json pytest tests/test_benchmarks.py
+
+Run them before and after a change, and compare the files. The register values are seeded, so each run sees the same
+data.
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+from array import array
+from pathlib import Path
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Iterator
+
+import pytest
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.components.number import NumberEntity
+from homeassistant.components.select import SelectEntity
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.core import HomeAssistant
+
+from custom_components.foxess_modbus.client.modbus_client import ModbusClient
+from custom_components.foxess_modbus.common.types import ConnectionType
+from custom_components.foxess_modbus.common.types import InverterModel
+from custom_components.foxess_modbus.common.types import RegisterPollType
+from custom_components.foxess_modbus.const import ENTITY_ID_PREFIX
+from custom_components.foxess_modbus.const import FRIENDLY_NAME
+from custom_components.foxess_modbus.const import INVERTER_BASE
+from custom_components.foxess_modbus.const import INVERTER_CONN
+from custom_components.foxess_modbus.const import INVERTER_MODEL
+from custom_components.foxess_modbus.const import TCP
+from custom_components.foxess_modbus.const import UNIQUE_ID_PREFIX
+from custom_components.foxess_modbus.entities.modbus_entity_mixin import ModbusEntityMixin
+from custom_components.foxess_modbus.entities.modbus_sensor import ModbusSensor
+from custom_components.foxess_modbus.inverter_adapters import ADAPTERS
+from custom_components.foxess_modbus.inverter_profiles import INVERTER_PROFILES
+from custom_components.foxess_modbus.modbus_controller import ModbusController
+from custom_components.foxess_modbus.read_planner import ReadCost
+from tests.inverter_simulator import InverterSimulator
+from tests.inverter_simulator import SimulatedInverter
+
+_OUTPUT = os.environ.get("FOXESS_MODBUS_BENCHMARK")
+
+pytestmark = [
+    pytest.mark.skipif(_OUTPUT is None, reason="Set FOXESS_MODBUS_BENCHMARK to run benchmarks"),
+    # The simulator listens on localhost
+    pytest.mark.usefixtures("socket_enabled"),
+]
+
+# An example of each model's full name, as read by autodetect
+_FULL_MODELS = {
+    InverterModel.H1_G2: "H1-5.0-E-G2",
+    InverterModel.H1_G1: "H1-5.0-E",
+    InverterModel.AC1: "AC1-5.0-E",
+    InverterModel.AIO_H1: "AIO-H1-5.0",
+    InverterModel.AIO_AC1: "AIO-AC1-5.0",
+    InverterModel.KH: "KH10.5",
+    InverterModel.H3: "H3-10.0-E",
+    InverterModel.AC3: "AC3-10.0-E",
+    InverterModel.AIO_H3: "AIO-H3-10.0",
+    InverterModel.KUARA_H3: "Kuara 10.0-3-H",
+    InverterModel.SK_HWR: "SK-HWR-10",
+    InverterModel.STAR_H3: "STAR-H3-10.0",
+    InverterModel.SOLAVITA_SP: "SP R10KH3",
+    InverterModel.H3_PRO: "H3-Pro-20.0",
+}
+
+_MAX_READ = 100
+# The fraction of registers which change between polls
+_CHURN = 0.3
+_NUM_POLLS = 20
+
+
+def _timings(samples: list[float]) -> dict[str, float]:
+    return {"min_secs": min(samples), "median_secs": statistics.median(samples), "runs": len(samples)}
+
+
+def _time(func: Callable[[], Any], runs: int) -> dict[str, float]:
+    samples = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started_at)
+    return _timings(samples)
+
+
+async def _time_async(func: Callable[[], Awaitable[Any]], runs: int) -> dict[str, float]:
+    samples = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - started_at)
+    return _timings(samples)
+
+
+@pytest.fixture(scope="module")
+def results() -> Iterator[dict[str, Any]]:
+    results: dict[str, Any] = {}
+    yield results
+    assert _OUTPUT is not None
+    Path(_OUTPUT).write_text(
+        json.dumps({"python": platform.python_version(), "results": results}, indent=2, sort_keys=True)
+    )
+
+
+@pytest.mark.parametrize(
+    ("model", "connection_type"),
+    [
+        (model, connection_type)
+        for model, profile in INVERTER_PROFILES.items()
+        for connection_type in profile.connection_types
+    ],
+)
+async def test_poll_hot_path(
+    hass: HomeAssistant, results: dict[str, Any], model: InverterModel, connection_type: ConnectionType
+) -> None:
+    full_model = _FULL_MODELS[model]
+    profile = INVERTER_PROFILES[model].connection_types[connection_type]
+    inverter = SimulatedInverter(full_model, connection_type)
+    assert inverter.profile is profile
+
+    async with InverterSimulator({1: inverter}) as simulator:
+        client = ModbusClient(hass, TCP, ADAPTERS["network_other"], {"host": simulator.host, "port": simulator.port})
+        inverter_details = {
+            INVERTER_BASE: model,
+            INVERTER_CONN: connection_type,
+            INVERTER_MODEL: full_model,
+            ENTITY_ID_PREFIX: "",
+            UNIQUE_ID_PREFIX: "",
+            FRIENDLY_NAME: "",
+        }
+        controller = ModbusController(
+            hass, client, profile, inverter_details, 1, 10, _MAX_READ, ReadCost(round_trip=50, per_register=2), "test"
+        )
+
+        # Register entities as if they'd been added to hass, without going through the entity platforms
+        entities: list[ModbusEntityMixin] = []
+        for entity_type in [SensorEntity, BinarySensorEntity, SelectEntity, NumberEntity]:
+            for entity in profile.create_entities(entity_type, controller):
+                if isinstance(entity, ModbusEntityMixin):
+                    entity.hass = hass
+                    controller.register_modbus_entity(entity)
+                    entities.append(entity)
+        addresses = {address for entity in entities for address in entity.addresses}
+        result: dict[str, Any] = {"entities": len(entities), "registers": len(addresses)}
+
+        # Planning the read ranges for a poll of every tier
+        read_ranges = controller._create_read_ranges(_MAX_READ, RegisterPollType.ON_CONNECTION)  # noqa: SLF001
+        result["plan_read_ranges"] = {
+            **_time(
+                lambda: controller._create_read_ranges(_MAX_READ, RegisterPollType.ON_CONNECTION),  # noqa: SLF001
+                200,
+            ),
+            "requests": len(read_ranges),
+            "registers_read": sum(num_registers for _start_address, num_registers in read_ranges),
+        }
+
+        # Storing the results of a poll, alternating between two sets of values so that each run sees changes
+        datasets: list[list[tuple[int, array[int]]]] = []
+        for _ in range(2):
+            inverter.churn(_CHURN)
+            dataset = []
+            for start_address, num_registers in read_ranges:
+                values = inverter.read(profile.register_type, start_address, num_registers)
+                assert isinstance(values, list)
+                dataset.append((start_address, array("H", values)))
+            datasets.append(dataset)
+        runs = iter(range(1_000_000))
+
+        def commit() -> None:
+            read_at = time.monotonic()
+            for start_address, values in datasets[next(runs) % 2]:
+                controller._store_read_values(start_address, values, read_at, set())  # noqa: SLF001
+
+        result["commit"] = _time(commit, 200)
+
+        # Telling every entity that its registers have changed, and waiting for their states to be written
+        async def notify() -> None:
+            controller._notify_update(addresses)  # noqa: SLF001
+            await hass.async_block_till_done()
+
+        result["notify_update"] = await _time_async(notify, 20)
+
+        # Decoding the value of every sensor
+        sensors = [entity for entity in entities if isinstance(entity, ModbusSensor)]
+        decoders = [sensor._calculate_native_value for sensor in sensors]  # noqa: SLF001
+        result["decode"] = {**_time(lambda: [decoder() for decoder in decoders], 200), "sensors": len(decoders)}
+
+        # Complete polls, over TCP to the simulator
+        await controller.refresh()
+        requests_before = simulator.counts["requests"]
+
+        async def poll() -> None:
+            inverter.churn(_CHURN)
+            await controller.refresh()
+            await hass.async_block_till_done()
+
+        result["poll"] = {
+            **await _time_async(poll, _NUM_POLLS),
+            "requests_per_poll": (simulator.counts["requests"] - requests_before) / _NUM_POLLS,
+        }
+
+        assert controller.is_connected
+        await client.close()
+
+    results[f"{model}/{connection_type}"] = result
@@ -0,0 +1,101 @@
+import asyncio
+import heapq
+import itertools
+from typing import Any
+from typing import cast
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.foxess_modbus.bus_scheduler import BusScheduler
+from custom_components.foxess_modbus.modbus_controller import ModbusController
+from custom_components.foxess_modbus.poll_metrics import PollMetrics
+
+
+class _Clock:
+    """Stands in for time.monotonic and asyncio.sleep, so that time only moves on when the test says so"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self._sleepers: list[tuple[float, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, secs: float) -> None:
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + secs, next(self._order), future))
+        await future
+
+    async def advance_to(self, until: float) -> None:
+        """Wakes each sleeper in turn, in time order, until the given time"""
+        await _run_ready_tasks()
+        while self._sleepers and self._sleepers[0][0] <= until:
+            wake_at, _order, future = heapq.heappop(self._sleepers)
+            self.now = wake_at
+            future.set_result(None)
+            await _run_ready_tasks()
+        self.now = until
+
+
+async def _run_ready_tasks() -> None:
+    # Let everything which has been woken up run until it next sleeps
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr("custom_components.foxess_modbus.bus_scheduler._monotonic", clock.monotonic)
+    monkeypatch.setattr("custom_components.foxess_modbus.bus_scheduler._sleep", clock.sleep)
+    return clock
+
+
+class _Client:
+    def take_bus_time(self) -> dict[int, float]:
+        return {}
+
+
+class _Controller:
+    def __init__(self, clock: _Clock, slave: int, poll_rate: float, poll_secs: float = 0.0) -> None:
+        self.slave = slave
+        self.poll_rate = poll_rate
+        self.poll_metrics = PollMetrics()
+        self.poll_started_at: list[float] = []
+        self._clock = clock
+        self._poll_secs = poll_secs
+
+    async def refresh(self) -> None:
+        self.poll_started_at.append(self._clock.now)
+        await self._clock.sleep(self._poll_secs)
+
+
+async def _run(hass: HomeAssistant, clock: _Clock, controllers: list[_Controller], secs: float) -> None:
+    scheduler = BusScheduler(hass, cast(Any, _Client()))
+    for controller in controllers:
+        scheduler.add_controller(cast(ModbusController, controller))
+    scheduler.start()
+    await clock.advance_to(secs)
+    scheduler.unload()
+
+
+async def test_staggers_polls_of_controllers_on_same_bus(hass: HomeAssistant, clock: _Clock) -> None:
+    controllers = [_Controller(clock, 1, 2), _Controller(clock, 2, 2)]
+    await _run(hass, clock, controllers, 7.5)
+
+    # Each polls every 2s, half a poll interval apart
+    slave_1, slave_2 = (controller.poll_started_at for controller in controllers)
+    assert slave_1 == pytest.approx([2, 4, 6])
+    assert slave_2 == pytest.approx([3, 5, 7])
+
+
+async def test_skips_polls_which_were_due_during_slow_poll(hass: HomeAssistant, clock: _Clock) -> None:
+    controller = _Controller(clock, 1, 1, poll_secs=2.5)
+    await _run(hass, clock, [controller], 7)
+
+    # Each poll starts as soon as the previous one finishes, rather than on the next 1s boundary, and the polls which
+    # were due in the meantime are skipped
+    assert controller.poll_started_at == pytest.approx([1, 3.5, 6])
+    assert controller.poll_metrics.skipped_polls == 3
@@ -0,0 +1,73 @@
+from graphlib import CycleError
+
+import pytest
+
+from custom_components.foxess_modbus.derived_values import Derivation
+from custom_components.foxess_modbus.derived_values import DerivedValues
+from custom_components.foxess_modbus.derived_values import ValueSource
+
+
+class _Registers:
+    def __init__(self) -> None:
+        self.values: dict[int, int | None] = {}
+        self.decoded: list[int] = []
+
+    def source(self, key: str, address: int) -> ValueSource:
+        def decode() -> int | None:
+            self.decoded.append(address)
+            return self.values.get(address)
+
+        return ValueSource(key, decode)
+
+
+def test_recomputes_only_what_depends_on_changed_addresses() -> None:
+    registers = _Registers()
+    registers.values = {1: 1, 2: 2, 3: 3}
+    values = DerivedValues()
+    # Added out of order: "total" depends on "pv", which is added after it
+    values.add_derived(Derivation("total", ["pv", "battery"], sum))
+    values.add_derived(Derivation("pv", ["pv1", "pv2"], sum))
+    for key, address in [("pv1", 1), ("pv2", 2), ("battery", 3), ("unused", 4)]:
+        values.add_source(registers.source(key, address), [address])
+    assert values.value("pv") == 3
+    assert values.value("total") == 6
+
+    registers.decoded.clear()
+    registers.values[1] = 10
+    registers.values[4] = 10
+    assert values.update({1, 4}) == {"pv", "total"}
+    assert values.value("total") == 15
+    # Sources which nothing uses aren't decoded
+    assert registers.decoded == [1]
+
+    # No change to a source means nothing to recompute
+    assert values.update({3}) == set()
+
+
+def test_missing_sources_and_missing_values_propagate() -> None:
+    registers = _Registers()
+    registers.values = {1: 1, 2: 2}
+    values = DerivedValues()
+    values.add_derived(Derivation("pv", ["pv1", "pv2"], sum))
+    # A source which hasn't been added means that we don't know the total, rather than that it's 0
+    values.add_source(registers.source("pv1", 1), [1])
+    assert values.value("pv") is None
+    assert values.add_source(registers.source("pv2", 2), [2]) == {"pv"}
+    assert values.value("pv") == 3
+
+    registers.values[2] = None
+    assert values.update({2}) == {"pv"}
+    assert values.value("pv") is None
+
+    registers.values[2] = 2
+    assert values.update({2}) == {"pv"}
+    assert values.remove_source("pv2") == {"pv"}
+    assert values.value("pv") is None
+
+
+def test_rejects_cycles() -> None:
+    values = DerivedValues()
+    values.add_derived(Derivation("a", ["b"], sum))
+    with pytest.raises(CycleError):
+        values.add_derived(Derivation("b", ["a"], sum))
+    assert values.value("b") is None
@@ -0,0 +1,99 @@
+from typing import Any
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.foxess_modbus.client.async_modbus_client import ResponseMismatchError
+from custom_components.foxess_modbus.client.modbus_client import ModbusClient
+from custom_components.foxess_modbus.client.modbus_client import ModbusClientFailedError
+from custom_components.foxess_modbus.common.types import ConnectionType
+from custom_components.foxess_modbus.common.types import RegisterType
+from custom_components.foxess_modbus.const import MAX_READ
+from custom_components.foxess_modbus.const import RTU_OVER_TCP
+from custom_components.foxess_modbus.const import TCP
+from custom_components.foxess_modbus.inverter_adapters import ADAPTERS
+from custom_components.foxess_modbus.modbus_controller import ModbusController
+from tests.inverter_simulator import Faults
+from tests.inverter_simulator import InverterSimulator
+from tests.inverter_simulator import SimulatedInverter
+
+# The simulator listens on localhost
+pytestmark = pytest.mark.usefixtures("socket_enabled")
+
+
+def _client(hass: HomeAssistant, simulator: InverterSimulator, protocol: str, **config: Any) -> ModbusClient:
+    return ModbusClient(
+        hass, protocol, ADAPTERS["network_other"], {"host": simulator.host, "port": simulator.port, **config}
+    )
+
+
+@pytest.mark.parametrize("protocol", [TCP, RTU_OVER_TCP])
+async def test_autodetects_simulated_inverter(hass: HomeAssistant, protocol: str) -> None:
+    inverter = SimulatedInverter("H1-5.0-E", ConnectionType.AUX)
+    async with InverterSimulator({1: inverter}, rtu=protocol == RTU_OVER_TCP) as simulator:
+        client = _client(hass, simulator, protocol)
+        assert await ModbusController.autodetect(client, 1, {MAX_READ: 8}) == ("H1", "H1-5.0-E")
+
+        address = inverter.data_addresses[0]
+        assert list(await client.read_registers(address, 1, RegisterType.INPUT, 1)) == [inverter.registers[address]]
+        await client.write_registers(41001, [1, 2], 1)
+        assert [inverter.registers[41001], inverter.registers[41002]] == [1, 2]
+        await client.close()
+
+
+async def test_enforces_special_register_config(hass: HomeAssistant) -> None:
+    inverter = SimulatedInverter("H3-10.0-E", ConnectionType.AUX)
+    async with InverterSimulator({1: inverter}) as simulator:
+        client = _client(hass, simulator, TCP)
+        # 41001 is invalid, and 41000 onwards have to be read one at a time
+        results = [
+            result
+            for result, _received_at in await client.read_register_ranges(
+                [(41000, 1), (41001, 1), (41007, 2)], RegisterType.HOLDING, 1
+            )
+        ]
+        assert not isinstance(results[0], ModbusClientFailedError)
+        assert list(results[0]) == [inverter.registers.get(41000, 0)]
+        assert isinstance(results[1], ModbusClientFailedError)
+        assert isinstance(results[2], ModbusClientFailedError)
+        assert simulator.counts["exceptions"] == 2
+        await client.close()
+
+
+@pytest.mark.parametrize("pipeline_window", [1, 3])
+async def test_gives_up_on_remaining_ranges_when_inverter_stops_answering(
+    hass: HomeAssistant, pipeline_window: int
+) -> None:
+    inverter = SimulatedInverter("H3-10.0-E", ConnectionType.AUX)
+    async with InverterSimulator({1: inverter}, faults=Faults(packet_loss=1)) as simulator:
+        client = ModbusClient(
+            hass,
+            TCP,
+            ADAPTERS["network_other"],
+            {"host": simulator.host, "port": simulator.port, "timeout": 0.2},
+            pipeline_window=pipeline_window,
+        )
+        with pytest.raises(ModbusClientFailedError, match="No response"):
+            await client.read_register_ranges([(31000, 1), (31002, 1), (31004, 1)], RegisterType.HOLDING, 1)
+        # Only the first request (or window of requests) was sent
+        assert simulator.counts["requests"] == min(pipeline_window, 3)
+        await client.close()
+
+
+async def test_injects_faults(hass: HomeAssistant) -> None:
+    inverter = SimulatedInverter("H3-10.0-E", ConnectionType.AUX)
+    async with InverterSimulator({1: inverter}, faults=Faults(wrong_response_rate=1)) as simulator:
+        client = _client(hass, simulator, TCP, timeout=0.2)
+        with pytest.raises(ModbusClientFailedError) as ex:
+            await client.read_registers(31000, 1, RegisterType.HOLDING, 1)
+        assert isinstance(ex.value.response, ResponseMismatchError)
+
+        simulator.faults = Faults(short_response_rate=1)
+        with pytest.raises(ModbusClientFailedError, match="Received 1 registers"):
+            await client.read_registers(31000, 2, RegisterType.HOLDING, 1)
+
+        simulator.faults = Faults(packet_loss=1)
+        with pytest.raises(ModbusClientFailedError, match="No response"):
+            await client.read_registers(31000, 1, RegisterType.HOLDING, 1)
+        assert simulator.counts["dropped"] == 1
+        await client.close()
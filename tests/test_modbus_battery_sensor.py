@@ -0,0 +1,57 @@
+from typing import Any
+from typing import Callable
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.foxess_modbus.const import ENTITY_ID_PREFIX
+from custom_components.foxess_modbus.const import UNIQUE_ID_PREFIX
+from custom_components.foxess_modbus.derived_values import Derivation
+from custom_components.foxess_modbus.derived_values import DerivedValues
+from custom_components.foxess_modbus.entities.entity_descriptions import ENTITIES
+from custom_components.foxess_modbus.entities.modbus_battery_sensor import ModbusBatterySensor
+from custom_components.foxess_modbus.entities.modbus_battery_sensor import ModbusBatterySensorDescription
+
+_VALUE_ADDRESS = 1
+_BMS_CONNECT_STATE_ADDRESS = 2
+
+
+def _sensor(hass: HomeAssistant, registers: dict[int, int | None]) -> ModbusBatterySensor:
+    def reader(addresses: list[int], **_kwargs: Any) -> Callable[[], int | None]:
+        (address,) = addresses
+        return lambda: registers[address]
+
+    controller = MagicMock()
+    controller.hass = hass
+    controller.inverter_details = {ENTITY_ID_PREFIX: "", UNIQUE_ID_PREFIX: ""}
+    controller.reader = reader
+    controller.read = lambda address, **_kwargs: registers[address]
+    # Scaled by 0.1
+    description = next(
+        entity
+        for entity in ENTITIES
+        if isinstance(entity, ModbusBatterySensorDescription) and entity.key == "bms_charge_rate"
+    )
+    return ModbusBatterySensor(controller, description, [_VALUE_ADDRESS], _BMS_CONNECT_STATE_ADDRESS)
+
+
+async def test_value_source_is_unknown_while_bms_is_disconnected(hass: HomeAssistant) -> None:
+    registers: dict[int, int | None] = {_VALUE_ADDRESS: 500, _BMS_CONNECT_STATE_ADDRESS: 2}
+    sensor = _sensor(hass, registers)
+    values = DerivedValues()
+    values.add_derived(Derivation("doubled", ["bms_charge_rate"], lambda inputs: inputs[0] * 2))
+    values.add_source(sensor.value_source, sensor.addresses)
+
+    # Derived values mustn't see the registers while the sensor itself is unknown
+    assert sensor.native_value is None
+    assert sensor.value_source.decode() is None
+    assert values.value("doubled") is None
+
+    registers[_BMS_CONNECT_STATE_ADDRESS] = 1
+    assert values.update({_BMS_CONNECT_STATE_ADDRESS}) == {"doubled"}
+    assert sensor.value_source.decode() == 50.0
+    assert values.value("doubled") == 100.0
+
+    registers[_BMS_CONNECT_STATE_ADDRESS] = 0
+    assert values.update({_BMS_CONNECT_STATE_ADDRESS}) == {"doubled"}
+    assert values.value("doubled") is None
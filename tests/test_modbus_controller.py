@@ -0,0 +1,695 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Any
+from typing import AsyncIterator
+from unittest.mock import ANY
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.const import STATE_UNKNOWN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry
+from homeassistant.helpers.entity import Entity
+from pymodbus.pdu import ModbusExceptions
+from pytest_homeassistant_custom_component.common import MockEntityPlatform  # type: ignore[import]
+
+from custom_components.foxess_modbus.client.modbus_client import ModbusClient
+from custom_components.foxess_modbus.common.entity_controller import ModbusControllerEntity
+from custom_components.foxess_modbus.common.entity_controller import RemoteControlMode
+from custom_components.foxess_modbus.common.types import ConnectionType
+from custom_components.foxess_modbus.common.types import InverterModel
+from custom_components.foxess_modbus.common.types import RegisterPollType
+from custom_components.foxess_modbus.common.types import RegisterType
+from custom_components.foxess_modbus.const import AUTO_TUNE_READS
+from custom_components.foxess_modbus.const import DOMAIN
+from custom_components.foxess_modbus.const import ENTITY_ID_PREFIX
+from custom_components.foxess_modbus.const import FRIENDLY_NAME
+from custom_components.foxess_modbus.const import HOST
+from custom_components.foxess_modbus.const import INVERTER_BASE
+from custom_components.foxess_modbus.const import INVERTER_CONN
+from custom_components.foxess_modbus.const import INVERTER_MODEL
+from custom_components.foxess_modbus.const import LEARN_REGISTER_MAP
+from custom_components.foxess_modbus.const import STALE_DATA_TTL
+from custom_components.foxess_modbus.const import TCP
+from custom_components.foxess_modbus.const import UNIQUE_ID_PREFIX
+from custom_components.foxess_modbus.derived_values import Derivation
+from custom_components.foxess_modbus.derived_values import ValueSource
+from custom_components.foxess_modbus.entities.modbus_entity_mixin import ModbusEntityMixin
+from custom_components.foxess_modbus.inverter_adapters import ADAPTERS
+from custom_components.foxess_modbus.inverter_profiles import INVERTER_PROFILES
+from custom_components.foxess_modbus.modbus_controller import ModbusController
+from custom_components.foxess_modbus.read_planner import ReadCost
+from custom_components.foxess_modbus.read_tuner import ReadTuner
+from tests.inverter_simulator import Faults
+from tests.inverter_simulator import InverterSimulator
+from tests.inverter_simulator import SimulatedInverter
+
+# The simulator listens on localhost
+pytestmark = pytest.mark.usefixtures("socket_enabled")
+
+# Holding registers, with a range of individual-read registers (41000-41999) and remote control
+_MODEL = "H1-5.0-E-G2"
+_PROFILE = INVERTER_PROFILES[InverterModel.H1_G2].connection_types[ConnectionType.AUX]
+_POLL_RATE = 10
+_MAX_READ = 50
+
+
+class _Listener(ModbusControllerEntity):
+    """Stands in for an entity, and records what the controller tells it"""
+
+    def __init__(
+        self,
+        addresses: list[int],
+        poll_type: RegisterPollType = RegisterPollType.PERIODICALLY,
+        *,
+        heartbeat_interval: timedelta | None = None,
+        value_source: ValueSource | None = None,
+        derivation: Derivation | None = None,
+    ) -> None:
+        self._addresses = addresses
+        self._poll_type = poll_type
+        self._heartbeat_interval = heartbeat_interval
+        self._value_source = value_source
+        self._derivation = derivation
+        self.updates: list[set[int]] = []
+        self.connected_changes = 0
+
+    @property
+    def addresses(self) -> list[int]:
+        return self._addresses
+
+    @property
+    def register_poll_type(self) -> RegisterPollType:
+        return self._poll_type
+
+    @property
+    def heartbeat_interval(self) -> timedelta | None:
+        return self._heartbeat_interval
+
+    @property
+    def value_source(self) -> ValueSource | None:
+        return self._value_source
+
+    @property
+    def derivation(self) -> Derivation | None:
+        return self._derivation
+
+    def update_callback(self, changed_addresses: set[int]) -> None:
+        self.updates.append(changed_addresses)
+
+    def is_connected_changed_callback(self) -> None:
+        self.connected_changes += 1
+
+
+class _StateListener(_Listener, Entity):
+    """A listener which asks for its state to be written when its addresses change, like the real entities do"""
+
+    def __init__(self, controller: ModbusController, addresses: list[int]) -> None:
+        super().__init__(addresses)
+        self._controller = controller
+        self.state_writes = 0
+        self.unbatched_state_writes = 0
+
+    def update_callback(self, changed_addresses: set[int]) -> None:
+        super().update_callback(changed_addresses)
+        if not changed_addresses.isdisjoint(self.addresses):
+            self._controller.schedule_state_write(self)
+
+    def async_write_ha_state(self) -> None:
+        self.state_writes += 1
+
+    def schedule_update_ha_state(self, force_refresh: bool = False) -> None:  # noqa: ARG002
+        self.unbatched_state_writes += 1
+
+
+@asynccontextmanager
+async def _controller(
+    hass: HomeAssistant,
+    options: dict[str, Any] | None = None,
+    faults: Faults | None = None,
+    poll_rate: int = _POLL_RATE,
+) -> AsyncIterator[tuple[ModbusController, SimulatedInverter]]:
+    """Creates a ModbusController talking to a simulated inverter. Options are added to the inverter details"""
+    inverter = SimulatedInverter(_MODEL, ConnectionType.AUX)
+    async with InverterSimulator({1: inverter}, faults=faults) as simulator:
+        client = ModbusClient(
+            hass,
+            TCP,
+            ADAPTERS["network_other"],
+            # Timeouts happen on purpose in some tests
+            {"host": simulator.host, "port": simulator.port, "timeout": 0.5},
+        )
+        inverter_details: dict[str, Any] = {
+            INVERTER_BASE: InverterModel.H1_G2,
+            INVERTER_CONN: ConnectionType.AUX,
+            INVERTER_MODEL: _MODEL,
+            ENTITY_ID_PREFIX: "",
+            UNIQUE_ID_PREFIX: "",
+            FRIENDLY_NAME: "",
+            HOST: "inverter",
+            **(options or {}),
+        }
+        controller = ModbusController(
+            hass,
+            client,
+            _PROFILE,
+            inverter_details,
+            1,
+            poll_rate,
+            _MAX_READ,
+            ReadCost(round_trip=50, per_register=2),
+            "entry",
+        )
+        try:
+            yield controller, inverter
+        finally:
+            await client.close()
+
+
+async def _poll(controller: ModbusController, inverter: SimulatedInverter) -> list[tuple[int, int]]:
+    """Refreshes the controller, and returns the reads which it made"""
+    inverter.reads.clear()
+    await controller.refresh()
+    return list(inverter.reads)
+
+
+def _store_key(controller: ModbusController) -> str:
+    assert controller._register_map is not None  # noqa: SLF001
+    return str(controller._register_map._store.key)  # noqa: SLF001
+
+
+async def test_register_map_is_saved_per_connection_and_slave(hass: HomeAssistant) -> None:
+    # Both have an empty unique ID prefix
+    async with (
+        _controller(hass, {HOST: "192.168.1.10:502", LEARN_REGISTER_MAP: True}) as (first, _inverter),
+        _controller(hass, {HOST: "192.168.1.11:502", LEARN_REGISTER_MAP: True}) as (second, _inverter),
+    ):
+        assert _store_key(first) != _store_key(second)
+
+
+# The remote control manager reads 41000 and 41010, and these fill in the gap: between them they make a run of
+# individual reads which can be probed as a single span. 41004-41009 are only read by a probe
+_PROBE_LISTENER_ADDRESSES = [41001, 41002, 41003]
+_PROBE_SPAN = (41000, 11)
+_PROBE_ONLY_ADDRESSES = range(41004, 41010)
+
+
+@pytest.mark.parametrize(
+    ("exception_code", "next_probe"),
+    [
+        # The inverter says the registers can't be read together: try the first half of the run next
+        (ModbusExceptions.IllegalAddress, (41000, 2)),
+        # These don't tell us anything about the registers: try the whole span again
+        (ModbusExceptions.SlaveFailure, _PROBE_SPAN),
+        (None, _PROBE_SPAN),
+    ],
+    ids=["exception response", "other exception response", "timeout"],
+)
+async def test_failed_probe_is_classified(
+    hass: HomeAssistant, exception_code: int | None, next_probe: tuple[int, int]
+) -> None:
+    async with _controller(hass, {LEARN_REGISTER_MAP: True}) as (controller, inverter):
+        controller.register_modbus_entity(_Listener(_PROBE_LISTENER_ADDRESSES))
+        inverter.fail_reads(_PROBE_ONLY_ADDRESSES, exception_code, times=1)
+
+        assert _PROBE_SPAN in await _poll(controller, inverter)
+        reads = await _poll(controller, inverter)
+        assert reads[-1] == next_probe
+        # The poll itself still reads the registers individually
+        assert (41001, 1) in reads
+
+
+async def test_successful_probe_combines_reads(hass: HomeAssistant) -> None:
+    async with _controller(hass, {LEARN_REGISTER_MAP: True}) as (controller, inverter):
+        controller.register_modbus_entity(_Listener(_PROBE_LISTENER_ADDRESSES))
+        inverter.enforce_individual_reads = False
+
+        assert _PROBE_SPAN in await _poll(controller, inverter)
+        reads = await _poll(controller, inverter)
+        assert _PROBE_SPAN in reads
+        assert (41001, 1) not in reads
+
+
+# These are read in separate ranges: (31500, 1), (31600, 2) and (31700, 2). One listener's addresses straddle the last
+# two ranges
+_RANGE_LISTENER_ADDRESSES = {"a": [31500], "b": [31600], "straddling": [31601, 31700], "d": [31701]}
+
+
+def _range_listeners(controller: ModbusController, inverter: SimulatedInverter) -> dict[str, _Listener]:
+    listeners = {name: _Listener(addresses) for name, addresses in _RANGE_LISTENER_ADDRESSES.items()}
+    for listener in listeners.values():
+        controller.register_modbus_entity(listener)
+        for address in listener.addresses:
+            inverter.registers[address] = address - 31000
+    return listeners
+
+
+async def test_failed_range_holds_back_its_consistency_groups(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, inverter):
+        listeners = _range_listeners(controller, inverter)
+        inverter.fail_reads([31600])
+
+        reads = await _poll(controller, inverter)
+        # It was retried, but nothing else was
+        assert reads.count((31600, 2)) == 3
+        assert reads.count((31500, 1)) == 1
+
+        # The other ranges were stored, apart from the part of the straddling listener's group which was read
+        assert controller.read(31500, signed=False) == 500
+        assert controller.read(31701, signed=False) == 701
+        assert controller.read(31700, signed=False) is None
+        assert {name: len(listener.updates) for name, listener in listeners.items()} == {
+            "a": 1,
+            "b": 0,
+            "straddling": 0,
+            "d": 1,
+        }
+        # Having read something, we're still connected
+        assert controller.is_connected
+
+
+async def test_retried_range_is_stored(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, inverter):
+        listeners = _range_listeners(controller, inverter)
+        inverter.fail_reads([31600], times=1)
+
+        reads = await _poll(controller, inverter)
+        assert reads.count((31600, 2)) == 2
+        assert all(len(listener.updates) == 1 for listener in listeners.values())
+        assert controller.read(31600, signed=False) == 600
+        assert controller.read(31700, signed=False) == 700
+        assert controller.is_connected
+
+
+async def test_each_range_is_stored_with_when_it_was_read(hass: HomeAssistant) -> None:
+    async with _controller(hass, faults=Faults(latency=0.1)) as (controller, inverter):
+        _range_listeners(controller, inverter)
+
+        await controller.refresh()
+        # The ranges were read one after the other, so the last range's values are newer than the first's
+        first_age = controller.data_age([31500])
+        last_age = controller.data_age([31701])
+        assert first_age is not None
+        assert last_age is not None
+        assert first_age - last_age > 0.15
+
+
+@pytest.mark.parametrize(
+    ("faults", "exception_code", "size_related"),
+    [
+        (Faults(), ModbusExceptions.IllegalAddress, False),
+        (Faults(exception_rate=1), None, False),
+        (Faults(packet_loss=1), None, True),
+        (Faults(short_response_rate=1), None, True),
+    ],
+    ids=["illegal address", "slave failure", "timeout", "short response"],
+)
+async def test_read_tuner_only_blames_read_size_for_failures_which_it_could_cause(
+    hass: HomeAssistant, faults: Faults, exception_code: int | None, size_related: bool
+) -> None:
+    async with _controller(hass, {AUTO_TUNE_READS: True}, faults) as (controller, inverter):
+        _range_listeners(controller, inverter)
+        if exception_code is not None:
+            inverter.fail_reads([31600], exception_code)
+
+        with patch.object(ReadTuner, "record_failure", autospec=True) as record_failure:
+            await controller.refresh()
+        record_failure.assert_called_once_with(ANY, size_related=size_related)
+
+
+@pytest.mark.parametrize(
+    ("failed_address", "remote_control_runs"),
+    [
+        # Remote control only needs its own registers
+        (31600, True),
+        # Battery SoC
+        (31024, False),
+    ],
+)
+async def test_remote_control_runs_after_partial_poll_if_its_values_were_read(
+    hass: HomeAssistant, failed_address: int, remote_control_runs: bool
+) -> None:
+    async with _controller(hass) as (controller, inverter):
+        _range_listeners(controller, inverter)
+        remote_control_manager = controller.remote_control_manager
+        assert remote_control_manager is not None
+        await controller.refresh()
+        await remote_control_manager.set_mode(RemoteControlMode.FORCE_DISCHARGE)
+
+        inverter.writes.clear()
+        inverter.fail_reads([failed_address])
+        await controller.refresh()
+        # Force discharge sets the active power after every poll
+        assert bool(inverter.writes) == remote_control_runs
+
+
+# With a 10s poll rate, medium registers are read every 3rd poll, and slow registers every 12th
+_TIER_ADDRESSES = {
+    RegisterPollType.PERIODICALLY: 31500,
+    RegisterPollType.MEDIUM: 31600,
+    RegisterPollType.SLOW: 31700,
+    RegisterPollType.ON_CONNECTION: 31800,
+}
+
+
+def _tier_listeners(controller: ModbusController) -> None:
+    for poll_type, address in _TIER_ADDRESSES.items():
+        controller.register_modbus_entity(_Listener([address], poll_type))
+
+
+def _tiers_read(reads: list[tuple[int, int]]) -> set[RegisterPollType]:
+    return {
+        poll_type
+        for poll_type, address in _TIER_ADDRESSES.items()
+        if any(start <= address < start + count for start, count in reads)
+    }
+
+
+def _expected_tiers(poll_count: int) -> set[RegisterPollType]:
+    if poll_count == 0:
+        return set(RegisterPollType)
+    tiers = {RegisterPollType.PERIODICALLY}
+    if poll_count % 3 == 0:
+        tiers.add(RegisterPollType.MEDIUM)
+    if poll_count % 12 == 0:
+        tiers.add(RegisterPollType.SLOW)
+    return tiers
+
+
+async def test_poll_tiers_are_read_at_their_cadence(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, inverter):
+        _tier_listeners(controller)
+
+        for poll_count in range(25):
+            tiers = _tiers_read(await _poll(controller, inverter))
+            assert tiers == _expected_tiers(poll_count), f"Poll {poll_count}"
+
+
+async def test_failed_poll_is_retried_with_the_same_tiers(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, inverter):
+        _tier_listeners(controller)
+        for _ in range(3):
+            await _poll(controller, inverter)
+
+        # The 4th poll is due to read medium registers, but fails
+        inverter.fail_reads([_TIER_ADDRESSES[RegisterPollType.PERIODICALLY]])
+        assert _tiers_read(await _poll(controller, inverter)) == _expected_tiers(3)
+        inverter.stop_failing_reads()
+        assert _tiers_read(await _poll(controller, inverter)) == _expected_tiers(3)
+        assert _tiers_read(await _poll(controller, inverter)) == _expected_tiers(4)
+
+
+async def test_all_tiers_are_read_after_reconnecting(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, inverter):
+        _tier_listeners(controller)
+        for _ in range(2):
+            await _poll(controller, inverter)
+
+        # Every range fails
+        inverter.fail_reads(range(31000, 45000))
+        while controller.is_connected:
+            await _poll(controller, inverter)
+
+        inverter.stop_failing_reads()
+        assert _tiers_read(await _poll(controller, inverter)) == set(RegisterPollType)
+        assert controller.is_connected
+        # Then the cadence carries on from the polls which succeeded
+        assert _tiers_read(await _poll(controller, inverter)) == _expected_tiers(3)
+        assert _tiers_read(await _poll(controller, inverter)) == _expected_tiers(4)
+
+
+async def test_listener_is_only_notified_of_changes_to_its_addresses(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, inverter):
+        listeners = _range_listeners(controller, inverter)
+        await controller.refresh()
+        assert all(len(listener.updates) == 1 for listener in listeners.values())
+
+        inverter.registers[31701] += 1
+        await controller.refresh()
+        assert {name: len(listener.updates) for name, listener in listeners.items()} == {
+            "a": 1,
+            "b": 1,
+            "straddling": 1,
+            "d": 2,
+        }
+        assert listeners["d"].updates[-1] == {31701}
+
+
+async def test_removed_listener_is_removed_from_address_index(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, inverter):
+        removed = _Listener([31500, 31501])
+        remaining = _Listener([31500])
+        controller.register_modbus_entity(removed)
+        controller.register_modbus_entity(remaining)
+        await controller.refresh()
+
+        controller.remove_modbus_entity(removed)
+        listeners_by_address = controller._listeners_by_address  # noqa: SLF001
+        assert listeners_by_address[31500] == {remaining}
+        assert 31501 not in listeners_by_address
+
+        inverter.registers[31500] = 1
+        inverter.registers[31501] = 1
+        reads = await _poll(controller, inverter)
+        assert (31500, 1) in reads
+        assert remaining.updates[-1] == {31500}
+        assert len(removed.updates) == 1
+
+
+async def test_unchanged_values_only_notify_heartbeat_listeners(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, inverter):
+        inverter.registers[31500] = 1
+        listener = _Listener([31500])
+        heartbeat_listener = _Listener([31500], heartbeat_interval=timedelta(seconds=0.5))
+        controller.register_modbus_entity(listener)
+        controller.register_modbus_entity(heartbeat_listener)
+        await controller.refresh()
+        assert len(listener.updates) == len(heartbeat_listener.updates) == 1
+
+        # Nothing's changed, and the heartbeat isn't due
+        await controller.refresh()
+        assert len(listener.updates) == len(heartbeat_listener.updates) == 1
+
+        await asyncio.sleep(0.5)
+        await controller.refresh()
+        assert len(listener.updates) == 1
+        assert heartbeat_listener.updates[-1] == {31500}
+        assert len(heartbeat_listener.updates) == 2
+
+
+async def test_listeners_go_stale_while_their_ranges_fail(hass: HomeAssistant) -> None:
+    # Registers go stale if they haven't been read for more than a second
+    async with _controller(hass, {STALE_DATA_TTL: 0}, poll_rate=1) as (controller, inverter):
+        listeners = _range_listeners(controller, inverter)
+        await controller.refresh()
+
+        # Each failing poll also spends 0.3s retrying
+        inverter.fail_reads([31600])
+        await asyncio.sleep(0.2)
+        await controller.refresh()
+        assert not controller.is_stale(listeners["b"].addresses)
+        await asyncio.sleep(0.8)
+        await controller.refresh()
+        assert controller.is_stale(listeners["b"].addresses)
+        assert controller.is_stale(listeners["straddling"].addresses)
+        assert not controller.is_stale(listeners["a"].addresses)
+        assert {name: listener.connected_changes for name, listener in listeners.items()} == {
+            "a": 0,
+            "b": 1,
+            "straddling": 1,
+            "d": 0,
+        }
+
+        inverter.stop_failing_reads()
+        await controller.refresh()
+        assert not controller.is_stale(listeners["b"].addresses)
+        assert not controller.is_stale(listeners["straddling"].addresses)
+        assert listeners["b"].connected_changes == listeners["straddling"].connected_changes == 2
+
+
+async def test_poll_writes_state_of_each_changed_entity_once(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, inverter):
+        entities = [
+            _StateListener(controller, [31500, 31501]),
+            _StateListener(controller, [31600]),
+            _StateListener(controller, [31700]),
+        ]
+        for entity in entities:
+            entity.hass = hass
+            controller.register_modbus_entity(entity)
+        await controller.refresh()
+        assert [entity.state_writes for entity in entities] == [1, 1, 1]
+
+        inverter.registers[31500] = 1
+        inverter.registers[31501] = 1
+        inverter.registers[31600] = 1
+        await controller.refresh()
+        assert [entity.state_writes for entity in entities] == [2, 2, 1]
+        assert all(entity.unbatched_state_writes == 0 for entity in entities)
+
+
+async def test_nested_batches_write_state_once_at_the_end(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, _inverter):
+        entity = _StateListener(controller, [31500])
+        entity.hass = hass
+        not_added = _StateListener(controller, [31500])
+
+        with controller._batch_state_writes():  # noqa: SLF001
+            with controller._batch_state_writes():  # noqa: SLF001
+                controller.schedule_state_write(entity)
+                controller.schedule_state_write(not_added)
+            controller.schedule_state_write(entity)
+            assert entity.state_writes == 0
+        assert entity.state_writes == 1
+        assert entity.unbatched_state_writes == 0
+
+        # Entities which haven't been added to HA yet can't write their state
+        controller.schedule_state_write(not_added)
+        assert not_added.state_writes == not_added.unbatched_state_writes == 0
+
+
+def _sensor(controller: ModbusController, key: str) -> ModbusEntityMixin:
+    (sensor,) = (
+        entity
+        for entity in _PROFILE.create_entities(SensorEntity, controller)
+        if isinstance(entity, ModbusEntityMixin) and entity.entity_description.key == key
+    )
+    return sensor
+
+
+@pytest.mark.parametrize("disable", [False, True], ids=["removed", "disabled"])
+async def test_lambda_sensor_is_unknown_once_a_source_goes(hass: HomeAssistant, disable: bool) -> None:
+    async with _controller(hass) as (controller, _inverter):
+        platform = MockEntityPlatform(hass, domain="sensor", platform_name=DOMAIN)
+        pv1, pv2 = _sensor(controller, "pv1_power"), _sensor(controller, "pv2_power")
+        # The lambda sensor looks its sources up in the entity registry
+        await platform.async_add_entities([pv1, pv2])
+        pv_power = _sensor(controller, "pv_power_now")
+        await platform.async_add_entities([pv_power])
+        await controller.refresh()
+        await hass.async_block_till_done()
+        assert isinstance(pv1, SensorEntity)
+        assert isinstance(pv2, SensorEntity)
+        assert isinstance(pv_power, SensorEntity)
+        assert isinstance(pv1.native_value, float)
+        assert isinstance(pv2.native_value, float)
+        assert pv_power.native_value == pytest.approx(pv1.native_value + pv2.native_value)
+
+        if disable:
+            entity_registry.async_get(hass).async_update_entity(
+                pv2.entity_id, disabled_by=entity_registry.RegistryEntryDisabler.USER
+            )
+        else:
+            await platform.async_remove_entity(pv2.entity_id)
+        await hass.async_block_till_done()
+        assert pv_power.native_value is None
+        state = hass.states.get(pv_power.entity_id)
+        assert state is not None
+        assert state.state == STATE_UNKNOWN
+
+
+async def test_derived_value_is_unknown_while_bms_is_disconnected(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, inverter):
+        battery_soc = _sensor(controller, "battery_soc")
+        soc_address, bms_connect_state_address = battery_soc.addresses
+        inverter.registers[soc_address] = 50
+        inverter.registers[bms_connect_state_address] = 0
+        controller.register_modbus_entity(battery_soc)
+        listener = _Listener([], derivation=Derivation("soc_doubled", ["battery_soc"], lambda inputs: inputs[0] * 2))
+        controller.register_modbus_entity(listener)
+
+        await controller.refresh()
+        assert controller.derived_value("soc_doubled") is None
+
+        inverter.registers[bms_connect_state_address] = 1
+        await controller.refresh()
+        assert controller.derived_value("soc_doubled") == 100
+        assert len(listener.updates) == 1
+
+        inverter.registers[bms_connect_state_address] = 0
+        await controller.refresh()
+        assert controller.derived_value("soc_doubled") is None
+        assert len(listener.updates) == 2
+
+
+async def test_only_derived_values_downstream_of_a_change_are_recomputed(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, inverter):
+        decoded: list[str] = []
+
+        def source(key: str, address: int) -> _Listener:
+            def decode() -> int | None:
+                decoded.append(key)
+                return controller.read(address, signed=False)
+
+            return _Listener([address], value_source=ValueSource(key, decode))
+
+        computed: list[str] = []
+
+        def derived(key: str, sources: list[str]) -> _Listener:
+            def method(inputs: list[float]) -> float:
+                computed.append(key)
+                return sum(inputs)
+
+            return _Listener([], derivation=Derivation(key, sources, method))
+
+        total = derived("total", ["x_doubled", "y_doubled"])
+        x_doubled = derived("x_doubled", ["x", "x"])
+        y_doubled = derived("y_doubled", ["y", "y"])
+        for listener in [source("x", 31500), source("y", 31600), x_doubled, y_doubled, total]:
+            controller.register_modbus_entity(listener)
+        inverter.registers[31500] = 1
+        inverter.registers[31600] = 2
+        await controller.refresh()
+        assert controller.derived_value("total") == 6
+
+        decoded.clear()
+        computed.clear()
+        inverter.registers[31500] = 3
+        await controller.refresh()
+        assert controller.derived_value("total") == 10
+        assert decoded == ["x"]
+        assert computed == ["x_doubled", "total"]
+        assert len(x_doubled.updates) == len(total.updates) == 2
+        assert len(y_doubled.updates) == 1
+
+
+async def test_read_registers_takes_fresh_values_from_the_store(hass: HomeAssistant) -> None:
+    async with _controller(hass) as (controller, inverter):
+        # 31501 isn't polled
+        controller.register_modbus_entity(_Listener([31500, 31502]))
+        for address in range(31500, 31503):
+            inverter.registers[address] = address - 31000
+        await controller.refresh()
+        expected = [500, 501, 502]
+
+        inverter.reads.clear()
+        assert await controller.read_registers(31500, 3, RegisterType.HOLDING, max_age=60) == expected
+        assert inverter.reads == [(31501, 1)]
+
+        inverter.reads.clear()
+        assert await controller.read_registers(31500, 1, RegisterType.HOLDING, max_age=60) == expected[:1]
+        assert inverter.reads == []
+
+        # Nothing's that fresh
+        await asyncio.sleep(0.01)
+        inverter.reads.clear()
+        assert await controller.read_registers(31500, 3, RegisterType.HOLDING, max_age=0) == expected
+        assert inverter.reads == [(31500, 3)]
+
+
+async def test_concurrent_identical_reads_share_a_request(hass: HomeAssistant) -> None:
+    async with _controller(hass, faults=Faults(latency=0.05)) as (controller, inverter):
+        inverter.registers[31500] = 1
+        results = await asyncio.gather(
+            controller.read_registers(31500, 2, RegisterType.HOLDING),
+            controller.read_registers(31500, 2, RegisterType.HOLDING),
+            controller.read_registers(31500, 1, RegisterType.HOLDING),
+        )
+        assert list(results) == [[1, 0], [1, 0], [1]]
+        assert sorted(inverter.reads) == [(31500, 1), (31500, 2)]
+
+        # Once it's finished, the next read goes to the inverter again
+        await controller.read_registers(31500, 2, RegisterType.HOLDING)
+        assert len(inverter.reads) == 3
@@ -0,0 +1,110 @@
+import pytest
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse
+from pymodbus.register_read_message import ReadHoldingRegistersRequest
+from pymodbus.register_read_message import ReadHoldingRegistersResponse
+from pymodbus.register_read_message import ReadInputRegistersResponse
+from pymodbus.register_write_message import WriteMultipleRegistersResponse
+from pymodbus.register_write_message import WriteSingleRegisterResponse
+
+from custom_components.foxess_modbus.client.modbus_framing import MbapFramer
+from custom_components.foxess_modbus.client.modbus_framing import RtuFramer
+from custom_components.foxess_modbus.client.modbus_framing import decode_response_pdu
+
+
+def test_mbap_builds_read_request() -> None:
+    frame = MbapFramer().build_frame(0x1234, ReadHoldingRegistersRequest(30000, 16, slave=247))
+    assert frame == bytes.fromhex("1234 0000 0006 f7 03 7530 0010")
+
+
+def test_mbap_splits_frames_across_reads() -> None:
+    framer = MbapFramer()
+    buffer = bytearray(bytes.fromhex("0001 0000 0007 01 03 04 0001"))
+    assert framer.next_frame(buffer) is None
+
+    buffer.extend(bytes.fromhex("0002 0002 0000 0003 01 83 02"))
+    frame = framer.next_frame(buffer)
+    assert frame is not None
+    assert (frame.transaction_id, frame.slave) == (1, 1)
+    response = decode_response_pdu(frame.pdu)
+    assert isinstance(response, ReadHoldingRegistersResponse)
+    assert list(response.registers) == [1, 2]
+
+    frame = framer.next_frame(buffer)
+    assert frame is not None
+    assert frame.transaction_id == 2
+    assert frame.pdu == bytes.fromhex("83 02")
+    assert buffer == b""
+
+
+def test_mbap_rejects_invalid_header() -> None:
+    with pytest.raises(ModbusIOException):
+        MbapFramer().next_frame(bytearray(bytes.fromhex("0001 0001 0003 01 83 02")))
+
+
+def test_rtu_round_trip() -> None:
+    framer = RtuFramer()
+    assert framer.build_frame(0, ReadHoldingRegistersRequest(0, 1, slave=1)) == bytes.fromhex("01 03 0000 0001 840a")
+
+    buffer = bytearray(bytes.fromhex("01 03 02 00"))
+    assert framer.next_frame(buffer) is None
+    buffer.extend(bytes.fromhex("2a 399b"))
+    frame = framer.next_frame(buffer)
+    assert frame is not None
+    assert frame.slave == 1
+    assert frame.pdu == bytes.fromhex("03 02 002a")
+
+
+def test_rtu_rejects_bad_crc() -> None:
+    with pytest.raises(ModbusIOException):
+        RtuFramer().next_frame(bytearray(bytes.fromhex("01 03 02 002a 0000")))
+
+
+@pytest.mark.parametrize(
+    ("function_code", "response_type"), [(0x03, ReadHoldingRegistersResponse), (0x04, ReadInputRegistersResponse)]
+)
+def test_decodes_read_responses(function_code: int, response_type: type) -> None:
+    response = decode_response_pdu(bytes([function_code, 6, 0x00, 0x01, 0xFF, 0xFE, 0x12, 0x34]))
+    assert isinstance(response, response_type)
+    assert isinstance(response, ReadHoldingRegistersResponse | ReadInputRegistersResponse)
+    assert list(response.registers) == [1, 0xFFFE, 0x1234]
+
+
+@pytest.mark.parametrize(
+    "pdu",
+    [
+        # Odd byte count
+        "03 03 0001 02",
+        # Byte count says there's more data than there is
+        "03 04 0001",
+        # No byte count
+        "03",
+    ],
+)
+def test_malformed_read_responses_are_not_decoded(pdu: str) -> None:
+    # These fall back to pymodbus, which can't make sense of them either
+    assert decode_response_pdu(bytes.fromhex(pdu)) is None
+
+
+def test_read_response_with_trailing_data_falls_back_to_pymodbus() -> None:
+    response = decode_response_pdu(bytes.fromhex("03 02 0001 0002"))
+    assert isinstance(response, ReadHoldingRegistersResponse)
+    # pymodbus goes by the byte count, and ModbusClient checks that it's the number of registers which were asked for
+    assert list(response.registers) == [1]
+
+
+def test_decodes_write_responses() -> None:
+    single = decode_response_pdu(bytes([0x06, 0xA0, 0x01, 0x00, 0x05]))
+    assert isinstance(single, WriteSingleRegisterResponse)
+    assert (single.address, single.value) == (0xA001, 5)
+
+    multiple = decode_response_pdu(bytes([0x10, 0xA0, 0x01, 0x00, 0x02]))
+    assert isinstance(multiple, WriteMultipleRegistersResponse)
+    assert (multiple.address, multiple.count) == (0xA001, 2)
+
+
+def test_decodes_exception_responses() -> None:
+    response = decode_response_pdu(bytes([0x83, 0x02]))
+    assert isinstance(response, ExceptionResponse)
+    assert response.isError()
+    assert (response.function_code, response.exception_code) == (0x83, 0x02)
@@ -0,0 +1,23 @@
+from pymodbus.register_read_message import ReadInputRegistersRequest
+
+from custom_components.foxess_modbus.poll_metrics import PollMetrics
+
+
+def test_poll_metrics_summary() -> None:
+    metrics = PollMetrics()
+    metrics.record_poll(0.2, registers_read=100, registers_used=80)
+    metrics.record_poll(20, registers_read=100, registers_used=80)
+    metrics.record_round_trip([ReadInputRegistersRequest(31000, 50, slave=1)], 0.1)
+    metrics.record_round_trip([ReadInputRegistersRequest(31000, 50, slave=1)], 0.3)
+    metrics.record_error(ConnectionError())
+
+    summary = metrics.as_dict()
+    assert summary["polls"]["histogram"]["<=250ms"] == 1
+    assert summary["polls"]["histogram"][">10000ms"] == 1
+    assert summary["polls"]["last_ms"] == 20000
+    assert summary["reads"]["ranges"] == {"31000+50": {"count": 2, "mean_ms": 200.0, "max_ms": 300.0}}
+    assert summary["read_efficiency_percent"] == 80
+    assert summary["errors"] == {"ConnectionError": 1}
+
+    metrics.reset()
+    assert metrics.as_dict()["reads"]["count"] == 0
@@ -0,0 +1,68 @@
+from typing import Any
+
+import pytest
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.core import HomeAssistant
+
+from custom_components.foxess_modbus.client.modbus_client import ModbusClient
+from custom_components.foxess_modbus.common.types import ConnectionType
+from custom_components.foxess_modbus.common.types import InverterModel
+from custom_components.foxess_modbus.const import DOMAIN
+from custom_components.foxess_modbus.const import ENTITY_ID_PREFIX
+from custom_components.foxess_modbus.const import FRIENDLY_NAME
+from custom_components.foxess_modbus.const import INVERTER_BASE
+from custom_components.foxess_modbus.const import INVERTER_CONN
+from custom_components.foxess_modbus.const import INVERTER_MODEL
+from custom_components.foxess_modbus.const import POLL_METRICS
+from custom_components.foxess_modbus.const import TCP
+from custom_components.foxess_modbus.const import UNIQUE_ID_PREFIX
+from custom_components.foxess_modbus.entities.modbus_sensor import ModbusSensor
+from custom_components.foxess_modbus.inverter_adapters import ADAPTERS
+from custom_components.foxess_modbus.inverter_profiles import INVERTER_PROFILES
+from custom_components.foxess_modbus.modbus_controller import ModbusController
+from custom_components.foxess_modbus.read_planner import ReadCost
+from custom_components.foxess_modbus.services import poll_metrics_service
+from tests.inverter_simulator import InverterSimulator
+from tests.inverter_simulator import SimulatedInverter
+
+# The simulator listens on localhost
+pytestmark = pytest.mark.usefixtures("socket_enabled")
+
+
+async def test_reports_data_age_of_each_entity(hass: HomeAssistant) -> None:
+    profile = INVERTER_PROFILES[InverterModel.H1_G1].connection_types[ConnectionType.AUX]
+    async with InverterSimulator({1: SimulatedInverter("H1-5.0-E", ConnectionType.AUX)}) as simulator:
+        client = ModbusClient(hass, TCP, ADAPTERS["network_other"], {"host": simulator.host, "port": simulator.port})
+        inverter_details: dict[str, Any] = {
+            INVERTER_BASE: InverterModel.H1_G1,
+            INVERTER_CONN: ConnectionType.AUX,
+            INVERTER_MODEL: "H1-5.0-E",
+            ENTITY_ID_PREFIX: "",
+            UNIQUE_ID_PREFIX: "",
+            FRIENDLY_NAME: "",
+            POLL_METRICS: True,
+        }
+        controller = ModbusController(
+            hass, client, profile, inverter_details, 1, 10, 100, ReadCost(round_trip=50, per_register=2), "test"
+        )
+        sensor = next(
+            entity for entity in profile.create_entities(SensorEntity, controller) if isinstance(entity, ModbusSensor)
+        )
+        sensor.hass = hass
+        controller.register_modbus_entity(sensor)
+        poll_metrics_service.register(hass, [controller])
+
+        async def data_ages() -> Any:
+            response = await hass.services.async_call(
+                DOMAIN, "get_poll_metrics", {"inverter": ""}, blocking=True, return_response=True
+            )
+            assert response is not None
+            return response["data_age_secs"]
+
+        # Nothing's been read yet
+        assert await data_ages() == {sensor.entity_id: None}
+
+        await controller.refresh()
+        (age,) = (await data_ages()).values()
+        assert 0 <= age < 5
+        await client.close()
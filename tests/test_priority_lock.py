@@ -0,0 +1,44 @@
+import asyncio
+
+from custom_components.foxess_modbus.client.priority_lock import PriorityLock
+from custom_components.foxess_modbus.common.types import RequestPriority
+
+
+async def test_most_urgent_waiter_goes_first() -> None:
+    lock = PriorityLock()
+    order: list[str] = []
+
+    async def request(name: str, priority: RequestPriority) -> None:
+        async with lock.hold(priority):
+            order.append(name)
+
+    await lock.acquire(RequestPriority.POLL)
+    tasks = [
+        asyncio.create_task(request("diagnostic", RequestPriority.DIAGNOSTIC)),
+        asyncio.create_task(request("poll 1", RequestPriority.POLL)),
+        asyncio.create_task(request("write", RequestPriority.WRITE)),
+        asyncio.create_task(request("poll 2", RequestPriority.POLL)),
+    ]
+    await asyncio.sleep(0)
+    lock.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["write", "poll 1", "poll 2", "diagnostic"]
+    assert not lock.locked()
+
+
+async def test_cancelled_waiters_are_skipped() -> None:
+    lock = PriorityLock()
+
+    await lock.acquire(RequestPriority.POLL)
+    cancelled = asyncio.create_task(lock.acquire(RequestPriority.WRITE))
+    waiting = asyncio.create_task(lock.acquire(RequestPriority.POLL))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    lock.release()
+    await waiting
+
+    assert cancelled.cancelled()
+    assert lock.locked()
+    lock.release()
+    assert not lock.locked()
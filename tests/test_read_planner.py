@@ -0,0 +1,67 @@
+import pytest
+
+from custom_components.foxess_modbus.read_planner import ReadCost
+from custom_components.foxess_modbus.read_planner import plan_read_ranges
+
+# Reads are expensive, extra registers are cheap
+_COST = ReadCost(round_trip=50, per_register=2)
+
+
+def _plan(
+    addresses: list[int],
+    max_read: int,
+    read_cost: ReadCost = _COST,
+    individual_read_ranges: list[tuple[int, int]] | None = None,
+    invalid_ranges: list[tuple[int, int]] | None = None,
+) -> list[tuple[int, int]]:
+    individual_reads = individual_read_ranges or []
+    invalid = invalid_ranges or []
+    return plan_read_ranges(
+        addresses,
+        max_read,
+        read_cost,
+        is_individual_read=lambda a: any(r[0] <= a <= r[1] for r in individual_reads),
+        overlaps_invalid_range=lambda s, e: any(r[0] <= e and s <= r[1] for r in invalid),
+    )
+
+
+@pytest.mark.parametrize(
+    ("addresses", "expected"),
+    [
+        ([1, 2, 4, 5], [(1, 5)]),
+        ([1, 2, 5, 6, 7, 8], [(1, 2), (5, 4)]),
+        ([1, 2, 5, 6, 7, 8, 9], [(1, 2), (5, 5)]),
+        ([1, 2, 5, 6, 7, 8, 9, 10], [(1, 5), (6, 5)]),
+        ([1, 2, 3, 5, 6, 7, 9, 10], [(1, 5), (6, 5)]),
+        ([], []),
+    ],
+)
+def test_groups_reads(addresses: list[int], expected: list[tuple[int, int]]) -> None:
+    assert _plan(addresses, max_read=5) == expected
+
+
+def test_splits_read_when_gap_is_expensive() -> None:
+    # Reading the 60-register gap costs more than an extra round trip
+    assert _plan([1, 62], max_read=100) == [(1, 1), (62, 1)]
+    # ... but a high round-trip time makes it worth it
+    assert _plan([1, 62], max_read=100, read_cost=ReadCost(round_trip=250, per_register=2)) == [(1, 62)]
+
+
+def test_does_not_read_over_invalid_ranges() -> None:
+    assert _plan([1, 2, 5, 6], max_read=10, invalid_ranges=[(3, 3)]) == [(1, 2), (5, 2)]
+
+
+def test_reads_individual_registers_on_their_own() -> None:
+    assert _plan([1, 2, 3, 4, 5], max_read=10, individual_read_ranges=[(3, 4)]) == [(1, 2), (3, 1), (4, 1), (5, 1)]
+
+
+def test_individual_reads_can_be_combined_where_known_to_work() -> None:
+    addresses = [41000, 41001, 41002, 41003, 41004]
+    assert plan_read_ranges(
+        addresses,
+        10,
+        _COST,
+        is_individual_read=lambda a: 41000 <= a <= 41999,
+        overlaps_invalid_range=lambda _s, _e: False,
+        can_read_together=lambda s, e: s >= 41000 and e <= 41002,
+    ) == [(41000, 3), (41003, 1), (41004, 1)]
@@ -0,0 +1,47 @@
+from custom_components.foxess_modbus.read_tuner import ReadTuner
+
+
+def _succeed(tuner: ReadTuner, polls: int, duration_secs: float = 1.0) -> None:
+    for _ in range(polls):
+        tuner.record_success(duration_secs)
+
+
+def test_keeps_larger_reads_which_are_reliable_and_faster() -> None:
+    tuner = ReadTuner(20, "test")
+    _succeed(tuner, 20)
+    assert tuner.max_read == 30
+
+    _succeed(tuner, 5, duration_secs=0.8)
+    assert tuner.max_read == 30
+    _succeed(tuner, 20, duration_secs=0.8)
+    assert tuner.max_read == 45
+
+
+def test_reverts_and_stops_probing_if_larger_read_fails() -> None:
+    tuner = ReadTuner(20, "test")
+    _succeed(tuner, 20)
+    assert tuner.max_read == 30
+
+    tuner.record_failure(size_related=True)
+    assert tuner.max_read == 20
+    _succeed(tuner, 20)
+    assert tuner.max_read == 29
+
+
+def test_reverts_if_larger_read_is_slower() -> None:
+    tuner = ReadTuner(20, "test")
+    _succeed(tuner, 20)
+    _succeed(tuner, 5, duration_secs=2.0)
+    assert tuner.max_read == 20
+
+
+def test_backs_off_poll_rate_when_failing() -> None:
+    tuner = ReadTuner(20, "test")
+    for _ in range(6):
+        tuner.record_failure(size_related=False)
+    assert tuner.poll_every == 4
+    assert [tuner.poll_due() for _ in range(4)] == [False, False, False, True]
+    assert tuner.max_read == 20
+
+    _succeed(tuner, 20)
+    assert tuner.poll_every == 2
@@ -0,0 +1,34 @@
+from unittest.mock import MagicMock
+
+from custom_components.foxess_modbus.register_map import LearnedRegisterMap
+
+
+def _next_probe(register_map: LearnedRegisterMap, read_ranges: list[tuple[int, int]]) -> tuple[int, int] | None:
+    return register_map.next_probe(
+        read_ranges,
+        max_read=10,
+        is_individual_read=lambda a: 41000 <= a <= 41999,
+        overlaps_invalid_range=lambda s, e: s <= 41005 <= e,
+    )
+
+
+def test_probes_runs_of_individual_reads_and_bisects_failures() -> None:
+    register_map = LearnedRegisterMap(MagicMock(), "test", "H1")
+    register_map._store = MagicMock()  # noqa: SLF001
+    read_ranges = [(30000, 5), (41000, 1), (41001, 1), (41002, 1), (41003, 1), (41006, 1), (41007, 1)]
+
+    # 41005 is invalid, so 41000-41003 and 41006-41007 are separate runs
+    assert _next_probe(register_map, read_ranges) == (41000, 41003)
+    register_map.record_unreadable(41000, 41003)
+    assert _next_probe(register_map, read_ranges) == (41000, 41001)
+    register_map.record_readable(41000, 41001)
+    assert register_map.can_read_together(41000, 41001)
+    assert not register_map.can_read_together(41000, 41002)
+
+    read_ranges = [(30000, 5), (41000, 2), (41002, 1), (41003, 1), (41006, 1), (41007, 1)]
+    assert _next_probe(register_map, read_ranges) == (41002, 41003)
+    register_map.record_unreadable(41002, 41003)
+    assert _next_probe(register_map, read_ranges) == (41006, 41007)
+    for _ in range(3):
+        register_map.record_inconclusive(41006, 41007)
+    assert _next_probe(register_map, read_ranges) is None
@@ -0,0 +1,103 @@
+import pytest
+
+from custom_components.foxess_modbus.common.types import RegisterPollType
+from custom_components.foxess_modbus.register_store import RegisterStore
+
+
+def _store(*addresses: int) -> RegisterStore:
+    store = RegisterStore()
+    for address in addresses:
+        store.add(address, RegisterPollType.PERIODICALLY)
+    return store
+
+
+def test_set_read_values_discards_untracked_addresses() -> None:
+    store = _store(12, 10, 14)
+    assert store.set_read_values(10, [1, 2, 3, 4, 5], read_at=1.0) == [10, 12, 14]
+    assert [store.value(a, 0) for a in (10, 11, 12, 13, 14)] == [1, None, 3, None, 5]
+
+    assert store.set_read_values(11, [9], read_at=1.0) == []
+    assert store.set_read_values(12, [7], read_at=1.0) == [12]
+    assert store.value(12, 0) == 7
+
+
+def test_written_value_overrides_read_value_until_stale() -> None:
+    store = _store(10)
+    store.set_read_values(10, [1], read_at=1.0)
+    assert store.set_written_value(10, 2, written_at=100.0)
+    assert not store.set_written_value(11, 2, written_at=100.0)
+
+    assert store.value(10, written_since=99.0) == 2
+    assert store.value(10, written_since=101.0) == 1
+
+
+def test_remove_keeps_other_values() -> None:
+    store = _store(10, 11, 12)
+    store.set_read_values(10, [1, 2, 3], read_at=1.0)
+    store.remove(11)
+    assert 11 not in store
+    assert store.set_read_values(10, [4, 5, 6], read_at=1.0) == [10, 12]
+    assert (store.value(10, 0), store.value(12, 0)) == (4, 6)
+
+
+def test_addresses_filters_by_poll_type() -> None:
+    store = RegisterStore()
+    store.add(3, RegisterPollType.SLOW)
+    store.add(1, RegisterPollType.PERIODICALLY)
+    store.add(2, RegisterPollType.ON_CONNECTION)
+    assert store.addresses(RegisterPollType.ON_CONNECTION) == [1, 2, 3]
+    assert store.addresses(RegisterPollType.MEDIUM) == [1]
+
+    store.set_poll_type(3, RegisterPollType.PERIODICALLY)
+    assert store.addresses(RegisterPollType.MEDIUM) == [1, 3]
+
+
+def test_set_read_values_only_reports_changes() -> None:
+    store = _store(10, 11, 12)
+    assert store.set_read_values(10, [0, 0, 0], read_at=1.0) == [10, 11, 12]
+    assert store.set_read_values(10, [0, 0, 0], read_at=1.0) == []
+    assert store.set_read_values(10, [0, 5, 0], read_at=1.0) == [11]
+    assert store.value(11, 0) == 5
+
+
+def test_read_value_respects_freshness() -> None:
+    store = _store(10, 11)
+    store.set_read_values(10, [1, 2], read_at=100.0)
+    store.set_written_value(10, 5, written_at=101.0)
+    assert store.read_value(10, read_since=100.0) == 1
+    assert store.read_value(10, read_since=100.5) is None
+    assert store.read_value(12, read_since=0) is None
+
+
+def test_read_at_tracks_each_register() -> None:
+    store = _store(10, 11, 20)
+    store.set_read_values(10, [1, 2], read_at=100.0)
+    store.set_read_values(20, [3], read_at=105.0)
+    store.set_read_values(11, [4], read_at=110.0)
+    assert store.read_at(10) == 100.0
+    assert store.read_at(11) == 110.0
+    assert store.read_at(20) == 105.0
+    assert store.read_at(12) is None
+
+
+def test_read_at_is_none_until_read() -> None:
+    store = _store(10)
+    store.set_written_value(10, 5, written_at=101.0)
+    assert store.read_at(10) is None
+
+
+@pytest.mark.parametrize("num_registers", [1, 2, 3])
+@pytest.mark.parametrize("signed", [True, False])
+def test_reader_combines_registers(num_registers: int, signed: bool) -> None:
+    addresses = list(range(10, 10 + num_registers))
+    store = _store(*addresses)
+    read = store.reader(addresses, signed=signed)
+    assert read(0.0) is None
+
+    for values in ([0] * num_registers, [0xFFFF] * num_registers, [0x1234, 0x8001, 0x7FFF][:num_registers]):
+        store.set_read_values(10, values, read_at=1.0)
+        expected = sum(value << (i * 16) for i, value in enumerate(values))
+        sign_bit = 1 << (num_registers * 16 - 1)
+        if signed and expected & sign_bit:
+            expected -= sign_bit * 2
+        assert read(0.0) == expected
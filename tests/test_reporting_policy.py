@@ -0,0 +1,219 @@
+from datetime import timedelta
+from typing import Any
+from typing import Callable
+from unittest.mock import MagicMock
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import EntityDescription
+from pytest_homeassistant_custom_component.common import MockEntityPlatform  # type: ignore[import]
+
+from custom_components.foxess_modbus.common.types import Inv
+from custom_components.foxess_modbus.common.types import RegisterType
+from custom_components.foxess_modbus.const import DOMAIN
+from custom_components.foxess_modbus.const import ENTITY_ID_PREFIX
+from custom_components.foxess_modbus.const import FRIENDLY_NAME
+from custom_components.foxess_modbus.const import INVERTER_CONN
+from custom_components.foxess_modbus.const import INVERTER_MODEL
+from custom_components.foxess_modbus.const import ROUND_SENSOR_VALUES
+from custom_components.foxess_modbus.const import UNIQUE_ID_PREFIX
+from custom_components.foxess_modbus.entities.entity_descriptions import ENTITIES
+from custom_components.foxess_modbus.entities.modbus_integration_sensor import ModbusIntegrationSensorDescription
+from custom_components.foxess_modbus.entities.modbus_lambda_sensor import ModbusLambdaSensorDescription
+from custom_components.foxess_modbus.entities.modbus_sensor import ModbusSensor
+from custom_components.foxess_modbus.entities.modbus_sensor import ModbusSensorDescription
+from custom_components.foxess_modbus.entities.reporting_policy import ReportingFilter
+from custom_components.foxess_modbus.entities.reporting_policy import ReportingPolicy
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr("custom_components.foxess_modbus.entities.reporting_policy.time.monotonic", clock)
+    return clock
+
+
+def _report(reporting_filter: ReportingFilter, value: float | None) -> bool:
+    if not reporting_filter.should_report(value):
+        return False
+    reporting_filter.reported(value)
+    return True
+
+
+def test_no_policy_reports_every_change(clock: _Clock) -> None:  # noqa: ARG001
+    reporting_filter = ReportingFilter(None)
+    assert _report(reporting_filter, 1.0)
+    assert not _report(reporting_filter, 1.0)
+    assert _report(reporting_filter, 1.1)
+    assert reporting_filter.heartbeat_interval is None
+
+
+def test_deadband_uses_larger_of_absolute_and_percentage(clock: _Clock) -> None:  # noqa: ARG001
+    reporting_filter = ReportingFilter(ReportingPolicy(deadband=1.0, deadband_percent=10))
+    assert _report(reporting_filter, 100.0)
+    assert not _report(reporting_filter, 109.0)
+    assert _report(reporting_filter, 110.0)
+    assert _report(reporting_filter, None)
+    assert _report(reporting_filter, 5.0)
+    assert not _report(reporting_filter, 5.5)
+    assert _report(reporting_filter, 6.0)
+
+
+def test_min_interval_and_max_silence(clock: _Clock) -> None:
+    reporting_filter = ReportingFilter(
+        ReportingPolicy(deadband=10, min_interval=timedelta(seconds=5), max_silence=timedelta(seconds=60))
+    )
+    assert reporting_filter.heartbeat_interval == timedelta(seconds=5)
+    assert _report(reporting_filter, 0.0)
+
+    clock.now = 1
+    assert not _report(reporting_filter, 50.0)
+    clock.now = 5
+    assert _report(reporting_filter, 50.0)
+
+    clock.now = 30
+    assert not _report(reporting_filter, 51.0)
+    clock.now = 65
+    assert _report(reporting_filter, 51.0)
+
+
+def _integration_sources() -> set[str]:
+    return {
+        description.source_entity
+        for description in ENTITIES
+        if isinstance(description, ModbusIntegrationSensorDescription)
+    }
+
+
+def test_power_voltage_and_current_sensors_have_policies() -> None:
+    integration_sources = _integration_sources()
+    for description in ENTITIES:
+        if (
+            isinstance(description, ModbusSensorDescription | ModbusLambdaSensorDescription)
+            and description.device_class
+            in (SensorDeviceClass.POWER, SensorDeviceClass.CURRENT, SensorDeviceClass.VOLTAGE)
+            # Cell voltages differ by a few mV, which the voltage policy would hide
+            and description.native_unit_of_measurement != "mV"
+            and description.key not in integration_sources
+        ):
+            assert description.reporting_policy is not None, description.key
+
+
+def test_integration_sources_have_no_policies() -> None:
+    integration_sources = _integration_sources()
+    for description in ENTITIES:
+        if isinstance(description, EntityDescription) and description.key in integration_sources:
+            assert getattr(description, "reporting_policy", None) is None, description.key
+
+
+def _controller(hass: HomeAssistant, registers: dict[int, int], *, round_sensor_values: bool = True) -> MagicMock:
+    def reader(addresses: list[int], **_kwargs: Any) -> Callable[[], int | None]:
+        (address,) = addresses
+        return lambda: registers.get(address)
+
+    controller = MagicMock()
+    controller.hass = hass
+    controller.inverter_details = {
+        ENTITY_ID_PREFIX: "",
+        UNIQUE_ID_PREFIX: "",
+        FRIENDLY_NAME: "",
+        INVERTER_MODEL: "H1-5.0-E",
+        INVERTER_CONN: "AUX",
+        ROUND_SENSOR_VALUES: round_sensor_values,
+    }
+    controller.reader = reader
+    controller.is_connected = True
+    controller.is_stale.return_value = False
+    return controller
+
+
+def _create_entity(controller: MagicMock, key: str) -> Any:
+    for description in ENTITIES:
+        if isinstance(description, EntityDescription) and description.key == key:
+            return description.create_entity_if_supported(controller, Inv.H1_G1, RegisterType.INPUT)
+    raise AssertionError(f"No entity '{key}'")
+
+
+@pytest.mark.parametrize("round_sensor_values", [True, False])
+async def test_policy_only_applies_when_sensor_values_are_rounded(
+    hass: HomeAssistant, clock: _Clock, round_sensor_values: bool  # noqa: ARG001
+) -> None:
+    registers: dict[int, int] = {}
+    controller = _controller(hass, registers, round_sensor_values=round_sensor_values)
+    sensor: ModbusSensor = _create_entity(controller, "invbatpower")
+    (address,) = sensor.addresses
+
+    registers[address] = 30000
+    sensor.update_callback({address})
+    controller.schedule_state_write.reset_mock()
+
+    # 30.2kW is within the 1% deadband, but a big enough change to get past rounding
+    registers[address] = 30200
+    sensor.update_callback({address})
+    assert controller.schedule_state_write.called == (not round_sensor_values)
+
+
+async def test_held_back_change_is_kept_and_reported_on_heartbeat(hass: HomeAssistant, clock: _Clock) -> None:
+    registers: dict[int, int] = {}
+    controller = _controller(hass, registers)
+    sensor: ModbusSensor = _create_entity(controller, "invbatpower")
+    (address,) = sensor.addresses
+    assert sensor.heartbeat_interval == timedelta(minutes=5)
+
+    registers[address] = 30000
+    sensor.update_callback({address})
+    controller.schedule_state_write.assert_called_once_with(sensor)
+    controller.schedule_state_write.reset_mock()
+
+    clock.now = 10
+    registers[address] = 30200
+    sensor.update_callback({address})
+    controller.schedule_state_write.assert_not_called()
+    # Anything which asks for our value gets the latest one, even though it hasn't been written to HA
+    assert sensor.native_value == pytest.approx(30.2)
+
+    # The controller calls us as if our addresses changed on each heartbeat
+    clock.now = 200
+    sensor.update_callback({address})
+    controller.schedule_state_write.assert_not_called()
+    clock.now = 310
+    sensor.update_callback({address})
+    controller.schedule_state_write.assert_called_once_with(sensor)
+    assert sensor.native_value == pytest.approx(30.2)
+
+
+async def test_integration_of_power_sensor_is_exact_when_sensor_values_are_rounded(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    registers: dict[int, int] = {}
+    controller = _controller(hass, registers)
+    controller.schedule_state_write.side_effect = lambda entity: entity.async_write_ha_state()
+    platform = MockEntityPlatform(hass, domain="sensor", platform_name=DOMAIN)
+    power: ModbusSensor = _create_entity(controller, "pv1_power")
+    await platform.async_add_entities([power])
+    # The integration looks up its source in the entity registry
+    energy = _create_entity(controller, "pv1_energy_total")
+    await platform.async_add_entities([energy])
+    (address,) = power.addresses
+
+    # Each change is within the power reporting policy's 1% deadband and max_silence, so would be held back if the
+    # policy applied
+    for value in [20000, 20100, 20000, 0]:
+        registers[address] = value
+        power.update_callback({address})
+        await hass.async_block_till_done()
+        freezer.tick(timedelta(minutes=4))
+
+    state = hass.states.get(energy.entity_id)
+    assert state is not None
+    assert float(state.state) == pytest.approx((20.0 + 20.1 + 20.0) * 4 / 60, abs=0.001)